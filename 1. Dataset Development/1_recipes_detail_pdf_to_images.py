@@ -1,5 +1,6 @@
 import os
-from pdf2image import convert_from_path
+import argparse
+from pdf_rasterizer import rasterize_pdf
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,50 +12,42 @@ OUTPUT_FOLDER = os.path.join(BASE_DIR, "images1_recipes_detail")
 # PAGE RANGE SETTINGS
 START_PAGE = 1001      
 END_PAGE = 1164      
+DPI = 300
+WORKERS = None  # None = one worker per CPU
 POPPLER_PATH = None
 
 if os.name != 'nt':
     POPPLER_PATH = None
 
-def convert_pdf(pdf_path, output_folder):
-    # Create output folder if it doesn't exist
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-        print(f"Created folder: {output_folder}")
-
+def convert_pdf(pdf_path, output_folder, start_page=START_PAGE, end_page=END_PAGE, dpi=DPI, workers=WORKERS):
     print(f"Starting conversion of {pdf_path}")
-    print(f"Range: Page {START_PAGE} to {END_PAGE if END_PAGE else 'End'}")
-    
+    print(f"Range: Page {start_page} to {end_page if end_page else 'End'}")
+
     try:
-        # We pass first_page and last_page here
-        images = convert_from_path(
-            pdf_path, 
-            dpi=300, 
-            first_page=START_PAGE, 
-            last_page=END_PAGE, 
+        # Pages are rendered in small chunks and written straight to disk,
+        # so memory stays flat no matter how long the range is
+        saved = rasterize_pdf(
+            pdf_path,
+            output_folder,
+            first_page=start_page,
+            last_page=end_page,
+            dpi=dpi,
+            workers=workers,
             poppler_path=POPPLER_PATH
         )
     except Exception as e:
         print(f"Error: {e}")
         return
 
-    print(f"✅ Extracted {len(images)} pages. Saving files...")
-
-    # Save each page as an image
-    for i, image in enumerate(images):
-        # Calculate actual page number based on start page
-        current_page_num = START_PAGE + i
-        
-        # Format filename like: page_0001.jpg
-        filename = f"page_{str(current_page_num).zfill(4)}.jpg"
-        save_path = os.path.join(output_folder, filename)
-        
-        image.save(save_path, "JPEG")
-        
-        # Print progress
-        print(f"Saved: {filename}")
-
+    print(f"✅ Extracted {len(saved)} pages.")
     print("Conversion Complete!")
 
 if __name__ == "__main__":
-    convert_pdf(PDF_PATH, OUTPUT_FOLDER)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Render a page range of the PDF to JPEG files.")
+    parser.add_argument("--start-page", type=int, default=START_PAGE)
+    parser.add_argument("--end-page", type=int, default=END_PAGE)
+    parser.add_argument("--dpi", type=int, default=DPI)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    convert_pdf(PDF_PATH, OUTPUT_FOLDER, args.start_page, args.end_page, args.dpi, args.workers)
\ No newline at end of file
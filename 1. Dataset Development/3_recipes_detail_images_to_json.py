@@ -1,11 +1,23 @@
 import os
 import json
 import time
-import io
 import re
-from PIL import Image
+import argparse
 from google import genai
 from google.genai import types
+from page_scheduler import (
+    AdaptiveRateLimiter, run_pages, estimate_tokens,
+    DEFAULT_CONCURRENCY, DEFAULT_RPM, DEFAULT_TPM, EST_OUTPUT_TOKENS,
+)
+from model_call import ModelCaller, request_config, DEFAULT_DEADLINE
+from response_cache import ResponseCache, cache_key
+from page_payload import prepare_payload, PayloadReport
+from recipe_schema import parse_page, check_saved_page, SchemaError
+from page_batch import (
+    chunked, batch_prompt, page_marker, split_pages, TokenReport,
+    load_manifest, save_manifest, pages_in_open_jobs, pack_jobs, new_job_entry,
+    DEFAULT_BATCH_SIZE, POLL_SECONDS,
+)
 
 # --- CONFIGURATION ---
 API_KEY = "[ENCRYPTION_KEY]"  # Paste your key here
@@ -14,13 +26,32 @@ API_KEY = "[ENCRYPTION_KEY]"  # Paste your key here
 START_PAGE = 187
 END_PAGE = 1164
 
+# THROUGHPUT (requests in flight + quota shared by all workers)
+CONCURRENCY = DEFAULT_CONCURRENCY
+RPM = DEFAULT_RPM
+TPM = DEFAULT_TPM
+
+# BATCHING (page images per request; 1 = one page per call)
+BATCH_SIZE = 1
+
+# TAIL LATENCY (seconds before a call is abandoned; hedged duplicates after the recent p95)
+DEADLINE = DEFAULT_DEADLINE
+HEDGE = True
+
 # --- PATH SETUP ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FOLDER = os.path.join(BASE_DIR, "images1_recipes_detail")
 OUTPUT_FOLDER = os.path.join(BASE_DIR, "json_output1_recipes_detail")
+PAYLOAD_REPORT = os.path.join(BASE_DIR, "payload_report1_recipes_detail.csv")
+BATCH_MANIFEST = os.path.join(BASE_DIR, "batch_jobs1_recipes_detail.json")
 
 # --- CLIENT SETUP ---
-client = genai.Client(api_key=API_KEY)
+# Set GEMINI_BASE_URL to run against stub_model_server.py instead of the real API
+BASE_URL = os.environ.get("GEMINI_BASE_URL")
+client = genai.Client(
+    api_key=API_KEY,
+    http_options=types.HttpOptions(base_url=BASE_URL) if BASE_URL else None
+)
 MODEL_ID = "gemini-flash-latest" 
 
 SYSTEM_PROMPT = """
@@ -63,100 +94,417 @@ REQUIRED JSON FORMAT:
 ]
 """
 
-def clean_json_string(text):
-    text = text.replace("```json", "").replace("```", "")
-    return text.strip()
+# Prompt + one image: what a page costs when it travels alone. Only a
+# fallback; the report measures it (count_tokens / single-page calls)
+SINGLE_PAGE_TOKENS = estimate_tokens(SYSTEM_PROMPT) - EST_OUTPUT_TOKENS
+# Batch answers are cached per page under the unrendered batch prompt
+BATCH_CACHE_PROMPT = batch_prompt(SYSTEM_PROMPT, [])
 
-# --- NEW HELPER FUNCTION ---
-def pil_to_bytes(img):
-    """Converts PIL Image to raw bytes for Gemini"""
-    buf = io.BytesIO()
-    img.save(buf, format='JPEG')
-    return buf.getvalue()
+def measure_single_page_tokens(image_path, page_num):
+    """Prompt tokens of one page sent alone, from count_tokens (no generation); None if the API cannot say."""
+    image_bytes, mime_type = prepare_payload(image_path)
+    prompt = SYSTEM_PROMPT.replace("{PAGE_NUMBER}", str(page_num))
+    try:
+        result = client.models.count_tokens(
+            model=MODEL_ID,
+            contents=[types.Content(role="user", parts=[
+                types.Part.from_text(text=prompt),
+                types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+            ])]
+        )
+    except Exception as e:
+        print(f"   ⚠️ Could not count single-page tokens ({e}); the saving will be an estimate")
+        return None
+    return result.total_tokens
 
-def process_page_with_retry(image_path, page_num):
-    retries = 0
-    max_retries = 3
-    
-    while retries < max_retries:
+def process_page_with_retry(image_path, page_num, caller=None, cache=None, report=None, tokens=None):
+    max_resends = 3
+    prompt = SYSTEM_PROMPT.replace("{PAGE_NUMBER}", str(page_num))
+    est_tokens = estimate_tokens(prompt)
+
+    # Prepared once (original bytes if they fit the budget); retries reuse it
+    image_bytes, mime_type = prepare_payload(image_path)
+
+    # Same image + prompt + model = same answer; never pay for it twice
+    key = None
+    if cache:
+        key = cache_key(image_bytes, prompt, MODEL_ID)
+        cached_text = cache.get(key)
+        if cached_text is not None:
+            try:
+                data, _ = parse_page(cached_text, page_num)
+                print(f"   💾 Cache hit for page {page_num}")
+                return data
+            except SchemaError as e:
+                print(f"   ⚠️ Cached answer for page {page_num} is unusable ({e}), re-sending")
+
+    caller = caller or ModelCaller()
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+                types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+            ]
+        )
+    ]
+    record = None
+    if report:
+        record = lambda attempt, seconds, ok: report.record(page_num, image_path, len(image_bytes), seconds, attempt, ok)
+
+    # Deadlines, hedging, backoff and rate limits live in caller.call;
+    # this loop only re-sends answers that could not be repaired locally
+    for attempt in range(1, max_resends + 1):
+        print(f"   ...sending page {page_num} to Gemini (Attempt {attempt})...")
         try:
-            print(f"   ...sending to Gemini (Attempt {retries+1})...")
-            
-            # 1. Load Image
-            img = Image.open(image_path)
-            
-            # 2. Convert to Bytes (The Fix)
-            image_bytes = pil_to_bytes(img)
-
-            # 3. Send Request using `from_bytes`
-            response = client.models.generate_content(
-                model=MODEL_ID,
-                contents=[
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_text(text=SYSTEM_PROMPT.replace("{PAGE_NUMBER}", str(page_num))),
-                            types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg") 
-                        ]
-                    )
-                ]
+            response = caller.call(
+                lambda: client.models.generate_content(model=MODEL_ID, contents=contents, config=request_config(caller)),
+                est_tokens, f"page {page_num}", record,
             )
-            
-            cleaned_text = clean_json_string(response.text)
-            return json.loads(cleaned_text)
-
         except Exception as e:
-            error_msg = str(e)
-            if "429" in error_msg or "Quota" in error_msg:
-                wait_time = 20 * (retries + 1)
-                print(f"   ⚠️ Rate Limit Hit. Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-                retries += 1
-            else:
-                print(f"   ❌ Fatal Error on page {page_num}: {e}")
-                return None
-    
-    print(f"   ❌ Failed after {max_retries} attempts.")
+            print(f"   ❌ Fatal Error on page {page_num}: {e}")
+            return None
+
+        if tokens:
+            usage = getattr(response, "usage_metadata", None)
+            tokens.record(1, getattr(usage, "prompt_token_count", None))
+
+        # Broken or off-schema answers are repaired locally; only what
+        # cannot be repaired raises SchemaError and costs another call
+        try:
+            data, notes = parse_page(response.text or "", page_num)
+        except SchemaError as e:
+            print(f"   ⚠️ Unrecoverable answer for page {page_num}: {e}")
+            continue
+        if notes:
+            print(f"   🩹 Repaired page {page_num} locally ({len(notes)} fixes: {notes[0]}...)")
+        if cache:
+            cache.put(key, response.text)
+        return data
+
+    print(f"   ❌ Page {page_num} failed after {max_resends} attempts.")
     return None
 
-def main():
+def page_parts(prompt, pages):
+    """Prompt, then a 'PAGE n' marker in front of every image so the answer can be split per page."""
+    parts = [types.Part.from_text(text=prompt)]
+    for page_num, image_bytes, mime_type in pages:
+        parts.append(types.Part.from_text(text=page_marker(page_num)))
+        parts.append(types.Part.from_bytes(data=image_bytes, mime_type=mime_type))
+    return parts
+
+def process_batch_with_retry(batch, caller=None, cache=None, report=None, tokens=None):
+    """
+    Sends several pages in one request and demultiplexes the answer per page.
+    batch is [(page_num, image_path)]. Returns ({page_num: data}, [page_num]);
+    the second list holds pages to fall back to single-page requests
+    (missing from the answer, unrepairable, or the whole call failed).
+    """
+    payloads = {page_num: (image_path,) + prepare_payload(image_path) for page_num, image_path in batch}
+
+    results, keys = {}, {}
+    if cache:
+        for page_num, (_, image_bytes, _) in payloads.items():
+            keys[page_num] = cache_key(image_bytes, BATCH_CACHE_PROMPT, MODEL_ID)
+            cached_text = cache.get(keys[page_num])
+            if cached_text is None:
+                continue
+            try:
+                results[page_num], _ = parse_page(cached_text, page_num)
+                print(f"   💾 Cache hit for page {page_num}")
+            except SchemaError:
+                pass
+
+    todo = [page_num for page_num, _ in batch if page_num not in results]
+    if len(todo) < 2:
+        return results, todo
+
+    caller = caller or ModelCaller()
+    prompt = batch_prompt(SYSTEM_PROMPT, todo)
+    est_tokens = estimate_tokens(prompt, images=len(todo))
+    contents = [types.Content(role="user", parts=page_parts(prompt, [(page_num,) + payloads[page_num][1:] for page_num in todo]))]
+    label = ", ".join(str(page_num) for page_num in todo)
+
+    def record(attempt, seconds, ok):
+        if report:
+            for page_num in todo:
+                image_path, image_bytes, _ = payloads[page_num]
+                report.record(page_num, image_path, len(image_bytes), seconds, attempt, ok)
+
+    print(f"   ...sending pages {label} to Gemini in one request...")
+    try:
+        response = caller.call(
+            lambda: client.models.generate_content(model=MODEL_ID, contents=contents, config=request_config(caller)),
+            est_tokens, f"pages {label}", record,
+        )
+    except Exception as e:
+        print(f"   ❌ Batch {label} failed ({e}), sending its pages one by one")
+        return results, todo
+
+    if tokens:
+        usage = getattr(response, "usage_metadata", None)
+        tokens.record(len(todo), getattr(usage, "prompt_token_count", None))
+
+    parsed, failures = split_pages(response.text or "", todo)
+    for page_num, (data, notes) in parsed.items():
+        if notes:
+            print(f"   🩹 Repaired page {page_num} locally ({len(notes)} fixes: {notes[0]}...)")
+        if cache:
+            cache.put(keys[page_num], json.dumps(data, ensure_ascii=False))
+        results[page_num] = data
+    for page_num, reason in failures.items():
+        print(f"   ⚠️ Page {page_num} unusable in the batch answer ({reason}), sending it alone")
+    return results, list(failures)
+
+def save_json(data, save_path):
+    """Writes via a temp file so a half-written page never counts as 'Exists'."""
+    tmp_path = save_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, save_path)
+
+def submit_batch_job(jobs, batch_size=DEFAULT_BATCH_SIZE, manifest_path=BATCH_MANIFEST):
+    """
+    Offline mode: packs the pending pages into multi-page requests, submits
+    them as asynchronous batch jobs (inline, split under the payload limit)
+    and records every job and its pages in the manifest. Nothing is waited for.
+    """
+    manifest = load_manifest(manifest_path)
+    requests, sizes, inlined = [], [], []
+    for group in chunked(jobs, batch_size):
+        pages = [(page_num,) + prepare_payload(os.path.join(INPUT_FOLDER, filename)) for page_num, filename, _ in group]
+        page_nums = [page_num for page_num, _, _ in group]
+        inlined.append({
+            "contents": [types.Content(role="user", parts=page_parts(batch_prompt(SYSTEM_PROMPT, page_nums), pages))],
+            "metadata": {"pages": ",".join(str(p) for p in page_nums)},
+        })
+        requests.append({"pages": page_nums, "files": [os.path.basename(save_path) for _, _, save_path in group]})
+        sizes.append(sum(len(image_bytes) for _, image_bytes, _ in pages))
+
+    for job_requests in pack_jobs(list(range(len(requests))), sizes):
+        first, last = requests[job_requests[0]]["pages"][0], requests[job_requests[-1]]["pages"][-1]
+        job = client.batches.create(
+            model=MODEL_ID,
+            src=[inlined[i] for i in job_requests],
+            config={"display_name": f"mustika-rasa-{first}-{last}"},
+        )
+        manifest["jobs"].append(new_job_entry(job.name, [requests[i] for i in job_requests]))
+        save_manifest(manifest, manifest_path)  # after every job: a crash never loses a job name
+        pages = sum(len(requests[i]["pages"]) for i in job_requests)
+        print(f"📤 Submitted {job.name}: pages {first}-{last} ({pages} pages in {len(job_requests)} requests, {getattr(job.state, 'value', job.state)})")
+
+    print(f"🗂️ Manifest: {os.path.basename(manifest_path)}. Collect later with --collect-jobs")
+
+def collect_batch_jobs(manifest_path=BATCH_MANIFEST, wait=False, poll_seconds=POLL_SECONDS):
+    """
+    Fetches finished batch jobs from the manifest and writes their answers into
+    the per-page JSON files. Pages that come back unusable stay unsaved, so
+    the next normal run sends only those. With wait, polls until all are done.
+    """
+    manifest = load_manifest(manifest_path)
+    tokens = TokenReport(SINGLE_PAGE_TOKENS)
+    open_jobs = [job for job in manifest["jobs"] if not job.get("collected")]
+    if open_jobs:
+        # Baseline for the saving: the first page of the first open job, sent alone
+        request = open_jobs[0]["requests"][0]
+        stem = os.path.splitext(request["files"][0])[0]
+        image_paths = [os.path.join(INPUT_FOLDER, stem + ext) for ext in (".jpg", ".png")]
+        image_path = next((path for path in image_paths if os.path.exists(path)), None)
+        if image_path:
+            tokens.set_baseline(measure_single_page_tokens(image_path, request["pages"][0]))
+    saved, unusable, first_submit, last_end = 0, [], None, None
+
+    while True:
+        open_jobs = [job for job in manifest["jobs"] if not job.get("collected")]
+        for entry in open_jobs:
+            job = client.batches.get(name=entry["name"])
+            state = getattr(job.state, "value", job.state)
+            if state in ("JOB_STATE_PENDING", "JOB_STATE_QUEUED", "JOB_STATE_RUNNING"):
+                print(f"⏳ {entry['name']}: {state}")
+                continue
+
+            entry.update(collected=True, state=state, collected_at=time.time())
+            responses = (job.dest.inlined_responses if job.dest else None) or []
+            if state != "JOB_STATE_SUCCEEDED":
+                print(f"❌ {entry['name']} ended as {state}; its pages will be sent by the next normal run")
+                responses = []
+            for i, request in enumerate(entry["requests"]):
+                # A request without an answer (failed job, short response list) counts as unusable
+                item = responses[i] if i < len(responses) else None
+                if item is None or item.error or item.response is None:
+                    unusable.extend(request["pages"])
+                    continue
+                usage = getattr(item.response, "usage_metadata", None)
+                tokens.record(len(request["pages"]), getattr(usage, "prompt_token_count", None))
+                parsed, failures = split_pages(item.response.text, request["pages"])
+                for page_num, filename in zip(request["pages"], request["files"]):
+                    if page_num in parsed:
+                        save_json(parsed[page_num][0], os.path.join(OUTPUT_FOLDER, filename))
+                        saved += 1
+                unusable.extend(failures)
+
+            first_submit = min(first_submit or entry["submitted_at"], entry["submitted_at"])
+            end_time = job.end_time.timestamp() if job.end_time else time.time()
+            last_end = max(last_end or end_time, end_time)
+            save_manifest(manifest, manifest_path)
+            print(f"📥 Collected {entry['name']}")
+
+        if not wait or all(job.get("collected") for job in manifest["jobs"]):
+            break
+        time.sleep(poll_seconds)
+
+    elapsed = (last_end - first_submit) if saved else 0.0
+    pending = len(pages_in_open_jobs(manifest))
+    print(f"\n✨ Batch jobs: {saved} pages saved, {len(unusable)} unusable, {pending} still in running jobs "
+          f"({saved / elapsed * 60 if elapsed else 0:.1f} pages/min from submit to finish)")
+    print(f"   {tokens.summary()}")
+    if unusable:
+        print(f"   Unusable pages (sent singly by the next normal run): {sorted(unusable)}")
+
+def main(start_page=START_PAGE, end_page=END_PAGE, concurrency=CONCURRENCY, rpm=RPM, tpm=TPM, refresh=False,
+         batch_size=BATCH_SIZE, job_mode=None, wait=False, deadline=DEADLINE, hedge=HEDGE):
     if not os.path.exists(OUTPUT_FOLDER):
         os.makedirs(OUTPUT_FOLDER)
 
+    if job_mode == "collect":
+        collect_batch_jobs(wait=wait)
+        return
+
     all_files = sorted([f for f in os.listdir(INPUT_FOLDER) if f.endswith(('.jpg', '.png'))])
     
-    print(f"🚀 Starting Batch (Fixed Bytes Version): Page {START_PAGE} to {END_PAGE}...")
+    print(f"🚀 Starting Batch (Concurrent Version): Page {start_page} to {end_page}...")
 
+    # 1. Collect pending pages (resume = skip pages whose JSON exists).
+    #    With refresh, every page is rebuilt and only changed inputs reach the API.
+    #    Pages waiting in a submitted batch job are never sent twice.
+    in_batch_jobs = pages_in_open_jobs(load_manifest(BATCH_MANIFEST))
+    jobs = []
     for filename in all_files:
         try:
             match = re.search(r'page_(\d+)', filename)
             if not match: continue
             page_num = int(match.group(1))
             
-            if page_num < START_PAGE: continue
-            if END_PAGE and page_num > END_PAGE: break 
+            if page_num < start_page: continue
+            if end_page and page_num > end_page: break 
         except ValueError:
             continue
 
         json_filename = filename.replace(".jpg", ".json").replace(".png", ".json")
         save_path = os.path.join(OUTPUT_FOLDER, json_filename)
 
-        if os.path.exists(save_path):
-            print(f"⏩ Skipping {filename} (Exists)")
+        if os.path.exists(save_path) and not refresh:
+            # Saved pages are re-validated; only the ones that cannot be
+            # repaired in place go back to the API (no manual delete-and-rerun)
+            status = check_saved_page(save_path, page_num)
+            if status == "ok":
+                print(f"⏩ Skipping {filename} (Exists)")
+                continue
+            if status == "repaired":
+                print(f"🩹 Repaired {json_filename} locally")
+                continue
+            print(f"♻️ {json_filename} is invalid, queued again")
+
+        if page_num in in_batch_jobs:
+            print(f"⏳ Skipping {filename} (in a batch job)")
             continue
 
+        jobs.append((page_num, filename, save_path))
+
+    if job_mode == "submit":
+        if batch_size < 2:
+            # One page per request would pay for the batch prompt and save nothing
+            batch_size = DEFAULT_BATCH_SIZE
+            print(f"ℹ️ Batch jobs use {batch_size} pages per request (set --batch-size to change)")
+        submit_batch_job(jobs, batch_size)
+        return
+
+    # 2. Run them concurrently under one shared rate limiter
+    limiter = AdaptiveRateLimiter(rpm=rpm, tpm=tpm)
+    caller = ModelCaller(limiter, deadline=deadline, hedge=hedge)
+    cache = ResponseCache()
+    report = PayloadReport()
+    tokens = TokenReport(SINGLE_PAGE_TOKENS)
+    if batch_size > 1 and jobs:
+        # Baseline for the saving (single-page fallbacks in the run refine it)
+        page_num, filename, _ = jobs[0]
+        tokens.set_baseline(measure_single_page_tokens(os.path.join(INPUT_FOLDER, filename), page_num))
+    saved_pages = []
+
+    def save_page(data, save_path):
+        save_json(data, save_path)
+        saved_pages.append(save_path)
+        print(f"   ✅ Saved to {os.path.basename(save_path)}")
+
+    def handle(job):
+        page_num, filename, save_path = job
         print(f"📄 Processing: {filename}")
-        
-        data = process_page_with_retry(os.path.join(INPUT_FOLDER, filename), page_num)
-        
-        if data is not None:
-            with open(save_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"   ✅ Saved to {json_filename}")
-        
-        time.sleep(2)
-
-    print("\n✨ Batch Complete!")
+        data = process_page_with_retry(os.path.join(INPUT_FOLDER, filename), page_num, caller, cache, report, tokens)
+        if data is None:
+            return False
+        save_page(data, save_path)
+        return True
+
+    def handle_batch(batch):
+        """One multi-page request; pages it cannot deliver go through the single-page path."""
+        print(f"📄 Processing: {', '.join(filename for _, filename, _ in batch)}")
+        paths = {page_num: (os.path.join(INPUT_FOLDER, filename), save_path) for page_num, filename, save_path in batch}
+        results, fallback = process_batch_with_retry(
+            [(page_num, image_path) for page_num, (image_path, _) in paths.items()], caller, cache, report, tokens
+        )
+        for page_num in fallback:
+            data = process_page_with_retry(paths[page_num][0], page_num, caller, cache, report, tokens)
+            if data is not None:
+                results[page_num] = data
+        for page_num, data in results.items():
+            save_page(data, paths[page_num][1])
+        return len(results) == len(batch)
+
+    if batch_size > 1:
+        work, handler = chunked(jobs, batch_size), handle_batch
+        print(f"📋 {len(jobs)} pages in {len(work)} requests of up to {batch_size} pages "
+              f"with {concurrency} workers ({rpm} RPM / {tpm} TPM)")
+    else:
+        work, handler = jobs, handle
+        print(f"📋 {len(jobs)} pages to process with {concurrency} workers ({rpm} RPM / {tpm} TPM)")
+    try:
+        stats = run_pages(work, handler, concurrency)
+    finally:
+        cache.flush()
+        report.save(PAYLOAD_REPORT)
+
+    # Counted in pages, not requests, so batch sizes compare directly
+    done = len(saved_pages)
+    pages_per_minute = done / stats['elapsed'] * 60 if stats['elapsed'] else 0.0
+    print(f"\n✨ Batch Complete! {done} saved, {len(jobs) - done} failed "
+          f"in {stats['elapsed']:.1f}s ({pages_per_minute:.1f} pages/min, "
+          f"{limiter.rate_limited} rate limits hit)")
+    print(f"   {caller.summary()}")
+    print(f"   {tokens.summary()}")
+    print(f"   {cache.summary()}")
+    print(f"   {report.summary()} (per page: {os.path.basename(PAYLOAD_REPORT)})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="OCR recipe detail pages to JSON with Gemini.")
+    parser.add_argument("--start-page", type=int, default=START_PAGE)
+    parser.add_argument("--end-page", type=int, default=END_PAGE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=RPM, help="Requests per minute (0 = no limit)")
+    parser.add_argument("--tpm", type=int, default=TPM, help="Tokens per minute (0 = no limit)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Rebuild existing page JSON; unchanged pages come from the response cache")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Page images per request (answers are split per page)")
+    jobs_group = parser.add_mutually_exclusive_group()
+    jobs_group.add_argument("--submit-job", action="store_true",
+                            help="Submit the pending pages as asynchronous batch jobs and exit")
+    jobs_group.add_argument("--collect-jobs", action="store_true",
+                            help="Write the results of finished batch jobs to the page JSON files")
+    parser.add_argument("--wait", action="store_true", help="With --collect-jobs, poll until every job is done")
+    parser.add_argument("--deadline", type=float, default=DEADLINE, help="Seconds before a model call is abandoned")
+    parser.add_argument("--no-hedge", action="store_true", help="Never send hedged duplicate requests")
+    args = parser.parse_args()
+
+    job_mode = "submit" if args.submit_job else "collect" if args.collect_jobs else None
+    main(args.start_page, args.end_page, args.concurrency, args.rpm, args.tpm, args.refresh,
+         args.batch_size, job_mode, args.wait, args.deadline, HEDGE and not args.no_hedge)
\ No newline at end of file
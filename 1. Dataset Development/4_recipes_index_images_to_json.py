@@ -1,11 +1,14 @@
 import os
 import json
 import time
-import io
 import re
-from PIL import Image
+import argparse
 from google import genai
 from google.genai import types
+from page_scheduler import AdaptiveRateLimiter, run_pages
+from model_call import ModelCaller, request_config, DEFAULT_DEADLINE
+from response_cache import ResponseCache, cache_key
+from page_payload import prepare_payload, PayloadReport
 
 # --- CONFIGURATION ---
 API_KEY = "[ENCRYPTION_KEY]" # ⚠️ PASTE KEY HERE
@@ -13,12 +16,27 @@ START_PAGE = 1166
 END_PAGE = 1187
 MODEL_ID = "gemini-flash-latest"
 
+# SPECULATIVE MODE (all pages in parallel, then a local reconciliation pass)
+CONCURRENCY = 8
+RPM = 60
+UNKNOWN_CATEGORY = "UNKNOWN"
+
+# TAIL LATENCY (seconds before a call is abandoned; hedged duplicates after the recent p95)
+DEADLINE = DEFAULT_DEADLINE
+HEDGE = True
+
 # --- PATHS ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FOLDER = os.path.join(BASE_DIR, "images2_recipes_index")
 OUTPUT_FOLDER = os.path.join(BASE_DIR, "json_output2_recipes_index")
+PAYLOAD_REPORT = os.path.join(BASE_DIR, "payload_report2_recipes_index.csv")
 
-client = genai.Client(api_key=API_KEY)
+# Set GEMINI_BASE_URL to run against stub_model_server.py instead of the real API
+BASE_URL = os.environ.get("GEMINI_BASE_URL")
+client = genai.Client(
+    api_key=API_KEY,
+    http_options=types.HttpOptions(base_url=BASE_URL) if BASE_URL else None
+)
 
 # --- STRICTER PROMPT ---
 SYSTEM_PROMPT_TEMPLATE = """
@@ -44,39 +62,85 @@ OUTPUT FORMAT (Strict JSON):
 }
 """
 
-def pil_to_bytes(img):
-    buf = io.BytesIO()
-    img.save(buf, format='JPEG')
-    return buf.getvalue()
+# --- STATELESS PROMPT (speculative mode) ---
+# Same task, but the carried-over category is not known when the page is sent,
+# so leading recipes are marked UNKNOWN and fixed up locally afterwards.
+SPECULATIVE_PROMPT = """
+You are a Data Engineer converting a book index.
+The image is a multi-column index page from an Indonesian cookbook.
+
+CONTEXT:
+This page may be a CONTINUATION of a previous page. You do NOT know the category
+that was active at the end of the previous page.
+
+YOUR TASK:
+1. Extract every recipe name.
+2. Assign a Category to each recipe.
+   - If you see a NEW BOLD HEADER (e.g. "SAMBAL"), switch to that category.
+   - Recipes that appear BEFORE the first header on this page get the category "UNKNOWN".
+   - Never guess a category for those leading recipes.
 
-def process_page_with_state(image_path, page_num, previous_category):
+OUTPUT FORMAT (Strict JSON):
+{
+  "starts_with_header": true,
+  "last_active_category": "The category valid at the very bottom of this page, or UNKNOWN if the page has no header",
+  "mappings": [
+    { "recipes_original_name": "Recipe Name", "category": "Category Name" }
+  ]
+}
+"""
+
+def request_page_json(image_path, page_num, prompt, cache=None, report=None, caller=None):
+    """Sends one index page with the given prompt and returns the parsed JSON object."""
     retries = 0
     max_retries = 3
-    
-    current_prompt = SYSTEM_PROMPT_TEMPLATE.replace("{PREVIOUS_CATEGORY}", previous_category)
 
+    # Prepared once (original bytes if they fit the budget); retries reuse it
+    image_bytes, mime_type = prepare_payload(image_path)
+
+    # The carried-over category is part of the prompt, so it is part of the key too
+    key = None
+    cached_text = None
+    if cache:
+        key = cache_key(image_bytes, prompt, MODEL_ID)
+        cached_text = cache.get(key)
+        if cached_text is not None:
+            print(f"   💾 Cache hit for page {page_num}")
+
+    caller = caller or ModelCaller()
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=prompt),
+                types.Part.from_bytes(data=image_bytes, mime_type=mime_type) 
+            ]
+        )
+    ]
+    record = None
+    if report:
+        record = lambda attempt, seconds, ok: report.record(page_num, image_path, len(image_bytes), seconds, attempt, ok)
+
+    # Deadlines, hedging, backoff and rate limits live in caller.call;
+    # this loop only re-sends answers that do not parse
     while retries < max_retries:
+        if cached_text is not None:
+            raw_text = cached_text
+            cached_text = None  # a bad cached answer falls through to a real request
+        else:
+            print(f"   ...sending page {page_num} to Gemini (Attempt {retries+1})...")
+            try:
+                response = caller.call(
+                    lambda: client.models.generate_content(model=MODEL_ID, contents=contents, config=request_config(caller)),
+                    label=f"page {page_num}", on_attempt=record,
+                )
+            except Exception as e:
+                print(f"   ❌ Failed to process page {page_num}: {e}")
+                return None
+            raw_text = response.text
+
         try:
-            print(f"   ...sending to Gemini (Attempt {retries+1})...")
-            
-            img = Image.open(image_path)
-            image_bytes = pil_to_bytes(img)
-
-            response = client.models.generate_content(
-                model=MODEL_ID,
-                contents=[
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_text(text=current_prompt),
-                            types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg") 
-                        ]
-                    )
-                ]
-            )
-            
             # --- CLEANING ---
-            raw_text = response.text
             if not raw_text:
                 raise ValueError("Empty response")
                 
@@ -89,33 +153,109 @@ def process_page_with_state(image_path, page_num, previous_category):
                 cleaned_text = cleaned_text[start:end+1]
 
             data = json.loads(cleaned_text)
-            
-            # --- PYTHON FALLBACK (The Fix) ---
-            # If Gemini returned null/empty category, force the previous one
-            for item in data.get('mappings', []):
-                if not item.get('category'):
-                    item['category'] = previous_category
-            
-            # Ensure last_active_category exists
-            if not data.get('last_active_category'):
-                 # If list is not empty, use the last item's category
-                if data.get('mappings'):
-                    data['last_active_category'] = data['mappings'][-1]['category']
-                else:
-                    # If page was empty, carry over previous
-                    data['last_active_category'] = previous_category
-
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            if cache:
+                cache.put(key, raw_text)
             return data
 
         except Exception as e:
-            print(f"   ⚠️ Error: {e}")
+            print(f"   ⚠️ Error on page {page_num}: {e}")
             retries += 1
-            time.sleep(5)
     
     print(f"   ❌ Failed to process page {page_num}")
     return None
 
-def main():
+def process_page_with_state(image_path, page_num, previous_category, cache=None, report=None, caller=None):
+    current_prompt = SYSTEM_PROMPT_TEMPLATE.replace("{PREVIOUS_CATEGORY}", previous_category)
+
+    data = request_page_json(image_path, page_num, current_prompt, cache, report, caller)
+    if data is None:
+        return None
+            
+    # --- PYTHON FALLBACK (The Fix) ---
+    # If Gemini returned null/empty category, force the previous one
+    for item in data.get('mappings', []):
+        if not item.get('category'):
+            item['category'] = previous_category
+    
+    # Ensure last_active_category exists
+    if not data.get('last_active_category'):
+         # If list is not empty, use the last item's category
+        if data.get('mappings'):
+            data['last_active_category'] = data['mappings'][-1]['category']
+        else:
+            # If page was empty, carry over previous
+            data['last_active_category'] = previous_category
+
+    return data
+
+def is_unknown(category):
+    return not category or str(category).strip().upper() == UNKNOWN_CATEGORY
+
+def reconcile_page(data, previous_category):
+    """
+    Local fix-up of one speculative page given the category carried from the page before.
+    Leading UNKNOWN rows take previous_category, and so does an UNKNOWN last_active_category.
+    Returns (data, reason); reason is None when the page was resolved locally, otherwise
+    it says why the page has to be re-queried with the real carried-over state.
+    """
+    if data is None:
+        return None, "speculative request failed"
+    mappings = data.get('mappings')
+    if not isinstance(mappings, list) or not all(isinstance(m, dict) for m in mappings):
+        return None, "malformed mappings"
+    if is_unknown(previous_category):
+        return None, "no carried-over category"
+
+    # The model claims there is no header at the top, yet labelled the first rows anyway
+    if mappings and data.get('starts_with_header') is False:
+        first = mappings[0].get('category')
+        if not is_unknown(first) and first != previous_category:
+            return None, f"guessed leading category '{first}'"
+
+    # UNKNOWN may only appear before the first header
+    seen_header = False
+    for item in mappings:
+        if is_unknown(item.get('category')):
+            if seen_header:
+                return None, "UNKNOWN after a header"
+            item['category'] = previous_category
+        else:
+            seen_header = True
+
+    last = data.get('last_active_category')
+    if is_unknown(last):
+        if seen_header:
+            return None, "no last category despite a header"
+        last = mappings[-1]['category'] if mappings else previous_category
+
+    return {'last_active_category': last, 'mappings': mappings}, None
+
+def speculative_extract(jobs, cache, report, concurrency=CONCURRENCY, rpm=RPM, deadline=DEADLINE, hedge=HEDGE):
+    """Sends every pending page at once with the stateless prompt. Returns {page_num: data}."""
+    limiter = AdaptiveRateLimiter(rpm=rpm, tpm=None)
+    caller = ModelCaller(limiter, deadline=deadline, hedge=hedge)
+    results = {}
+
+    def handle(job):
+        page_num, filename, _ = job
+        results[page_num] = request_page_json(
+            os.path.join(INPUT_FOLDER, filename), page_num, SPECULATIVE_PROMPT, cache, report, caller
+        )
+        return results[page_num] is not None
+
+    stats = run_pages(jobs, handle, concurrency)
+    print(f"⚡ Speculative pass: {stats['done']} pages, {stats['failed']} failed "
+          f"in {stats['elapsed']:.1f}s ({stats['pages_per_minute']:.1f} pages/min)")
+    print(f"   {caller.summary()}")
+    return results
+
+def save_page(data, save_path):
+    with open(save_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def main(refresh=False, speculative=False, concurrency=CONCURRENCY, rpm=RPM, deadline=DEADLINE, hedge=HEDGE):
     if not os.path.exists(OUTPUT_FOLDER):
         os.makedirs(OUTPUT_FOLDER)
 
@@ -135,42 +275,92 @@ def main():
     # Start with "Unknown" or explicitly set "MAKANAN UTAMA" if you know Page 1166 starts with it.
     current_state_category = "MAKANAN UTAMA" 
 
-    print(f"🚀 Starting v3 Extraction: Page {START_PAGE} to {END_PAGE}...")
+    cache = ResponseCache()
+    report = PayloadReport()
+    caller = ModelCaller(deadline=deadline, hedge=hedge)
 
+    jobs = []
     for page_num, filename in sorted_files:
         json_filename = filename.replace(".jpg", ".json").replace(".png", ".json")
-        save_path = os.path.join(OUTPUT_FOLDER, json_filename)
+        jobs.append((page_num, filename, os.path.join(OUTPUT_FOLDER, json_filename)))
+
+    # With refresh, re-run every page; unchanged (image, prompt) pairs come from the cache.
+    pending = [job for job in jobs if refresh or not os.path.exists(job[2])]
 
-        print(f"📄 {filename} | Context: '{current_state_category}'")
+    # The cache index and payload report are written even if the run dies part-way
+    try:
+        speculative_results = {}
+        if speculative and pending:
+            print(f"🚀 Starting speculative extraction of {len(pending)} pages with {concurrency} workers...")
+            speculative_results = speculative_extract(pending, cache, report, concurrency, rpm, deadline, hedge)
+        else:
+            print(f"🚀 Starting v3 Extraction: Page {START_PAGE} to {END_PAGE}...")
+
+        requeried = 0
+        for page_num, filename, save_path in jobs:
+            print(f"📄 {filename} | Context: '{current_state_category}'")
         
-        # If exists, load it to update state and skip
-        if os.path.exists(save_path):
-            try:
-                with open(save_path, 'r') as f:
-                    saved = json.load(f)
-                    current_state_category = saved.get('last_active_category', current_state_category)
-                print(f"   ⏩ Loaded state: '{current_state_category}'")
-                continue
-            except:
-                pass 
-
-        # Process
-        data = process_page_with_state(
-            os.path.join(INPUT_FOLDER, filename), 
-            page_num, 
-            current_state_category
-        )
+            # If exists, load it to update state and skip
+            if os.path.exists(save_path) and not refresh:
+                try:
+                    with open(save_path, 'r') as f:
+                        saved = json.load(f)
+                        current_state_category = saved.get('last_active_category', current_state_category)
+                    print(f"   ⏩ Loaded state: '{current_state_category}'")
+                    continue
+                except:
+                    pass 
+
+            data = None
+            if speculative:
+                # Cheap local pass: propagate the carried category into the leading rows
+                data, reason = reconcile_page(speculative_results.get(page_num), current_state_category)
+                if reason:
+                    print(f"   🔁 Ambiguous ({reason}), re-querying with real state")
+                    requeried += 1
+                else:
+                    print("   🧩 Reconciled locally")
+
+            if data is None:
+                # Process
+                data = process_page_with_state(
+                    os.path.join(INPUT_FOLDER, filename), 
+                    page_num, 
+                    current_state_category,
+                    cache,
+                    report,
+                    caller
+                )
+                if not speculative:
+                    time.sleep(2)
         
-        if data:
-            # Save
-            with open(save_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            if data:
+                # Save
+                save_page(data, save_path)
             
-            # Update State
-            current_state_category = data['last_active_category']
-            print(f"   ✅ Saved. New Context: '{current_state_category}'")
-        
-        time.sleep(2)
+                # Update State
+                current_state_category = data['last_active_category']
+                print(f"   ✅ Saved. New Context: '{current_state_category}'")
+
+        if speculative:
+            print(f"\n🧩 Reconciliation: {len(pending) - requeried} pages resolved locally, {requeried} re-queried")
+    finally:
+        cache.flush()
+        report.save(PAYLOAD_REPORT)
+    print(f"   {caller.summary()}")
+    print(f"   {cache.summary()}")
+    print(f"   {report.summary()} (per page: {os.path.basename(PAYLOAD_REPORT)})")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="OCR the recipe index pages to JSON with Gemini.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Rebuild existing page JSON; unchanged pages come from the response cache")
+    parser.add_argument("--speculative", action="store_true",
+                        help="Extract all pages in parallel without state, then reconcile locally")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=RPM, help="Requests per minute (0 = no limit)")
+    parser.add_argument("--deadline", type=float, default=DEADLINE, help="Seconds before a model call is abandoned")
+    parser.add_argument("--no-hedge", action="store_true", help="Never send hedged duplicate requests")
+    args = parser.parse_args()
+
+    main(args.refresh, args.speculative, args.concurrency, args.rpm, args.deadline, HEDGE and not args.no_hedge)
\ No newline at end of file
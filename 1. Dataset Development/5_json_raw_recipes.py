@@ -1,46 +1,53 @@
 import os
 import json
 import re
+from fragment_store import FragmentStore
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FOLDER = os.path.join(BASE_DIR, "json_output1_recipes_detail")
-RAW_OUTPUT = os.path.join(BASE_DIR, "raw_mustika_rasa_full.json")
+RAW_OUTPUT = os.path.join(BASE_DIR, "raw_mustika_rasa_full.jsonl")
 
 def get_page_number(filename):
     match = re.search(r'page_(\d+)', filename)
     return int(match.group(1)) if match else 99999
 
-def main():
-    all_files = sorted(
-        [f for f in os.listdir(INPUT_FOLDER) if f.endswith(".json")],
-        key=get_page_number
-    )
-    
-    raw_list = []
-    print(f"📂 Extracting fragments from {len(all_files)} files...")
-
+def iter_page_fragments(all_files):
+    """Yields fragments page by page, so only one page is in memory at a time."""
     for filename in all_files:
         page_num = get_page_number(filename)
         file_path = os.path.join(INPUT_FOLDER, filename)
-        
+
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                
-                for index, recipe in enumerate(data):
-                    # Create unique ID: MR_Page_Index
-                    recipe['recipe_id'] = f"MR_{page_num}_{str(index + 1).zfill(2)}"
-                    recipe['_source_page'] = page_num 
-                    raw_list.append(recipe)
-                    
         except Exception as e:
             print(f"❌ Error in {filename}: {e}")
+            continue
+        if not isinstance(data, list):
+            print(f"❌ Error in {filename}: expected a list of recipes")
+            continue
+
+        for index, recipe in enumerate(data):
+            # Create unique ID: MR_Page_Index
+            recipe['recipe_id'] = f"MR_{page_num}_{str(index + 1).zfill(2)}"
+            recipe['_source_page'] = page_num
+            yield recipe
+
+def main():
+    all_files = sorted(
+        [f for f in os.listdir(INPUT_FOLDER) if f.endswith(".json")],
+        key=get_page_number
+    )
+
+    print(f"📂 Extracting fragments from {len(all_files)} files...")
+
+    # Files are in page order and ids follow the on-page order,
+    # so the stream is already sorted the way the store expects
+    store = FragmentStore(RAW_OUTPUT)
+    count = store.write(iter_page_fragments(all_files))
 
-    with open(RAW_OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(raw_list, f, indent=2, ensure_ascii=False)
-    
-    print(f"💾 Raw data saved to {RAW_OUTPUT}")
+    print(f"💾 {count} raw fragments saved to {RAW_OUTPUT}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,73 @@
+import os
+import time
+import random
+import argparse
+import pandas as pd
+from category_classifier import CATEGORIES, CategoryClassifier
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECIPES_CSV = os.path.join(BASE_DIR, "df_recipes.csv")
+VOCAB_SCALE = 20
+SEED = 1967
+
+
+# --- LEGACY IMPLEMENTATION (get_category from 8_data_cleaning) ---
+# Kept verbatim as the baseline for timing and for the equality check.
+
+def legacy_get_category(text, categories=CATEGORIES):
+    if not isinstance(text, str):
+        return "Unknown"
+    text_lower = text.lower()
+    for category, keywords in categories.items():
+        for key in keywords:
+            if key in text_lower:
+                return category
+    return "Unknown"
+
+
+def scaled_categories(scale, seed=SEED):
+    """CATEGORIES plus `scale` made-up keywords per real one, as a bigger vocabulary would look."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    scaled = {}
+    for label, keywords in CATEGORIES.items():
+        extra = ["".join(rng.choice(letters) for _ in range(rng.randint(5, 9))) for _ in range(len(keywords) * scale)]
+        scaled[label] = keywords + extra
+    return scaled
+
+
+def compare(texts, categories, label):
+    classifier = CategoryClassifier(categories)
+
+    start = time.perf_counter()
+    legacy = texts.apply(lambda t: legacy_get_category(t, categories))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = classifier.classify_series(texts)
+    engine_time = time.perf_counter() - start
+
+    same = legacy.equals(engine)
+    n_keywords = sum(len(k) for k in categories.values())
+    print(f"{label:<28} {n_keywords:>5} keywords | legacy {legacy_time * 1000:7.1f} ms | "
+          f"engine {engine_time * 1000:7.1f} ms | identical: {'✅' if same else '❌'}")
+    return same
+
+
+def main(scale=VOCAB_SCALE):
+    df = pd.read_csv(RECIPES_CSV)
+    texts = pd.concat([df['ai_category'], df['title_original'], df['title_normalized']], ignore_index=True)
+    print(f"🧪 {len(texts):,} texts ({texts.nunique():,} distinct)")
+
+    ok = compare(texts, CATEGORIES, "Notebook vocabulary")
+    ok &= compare(texts, scaled_categories(scale), f"Vocabulary x{scale + 1}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Equality check and timing for the category classifier.")
+    parser.add_argument("--scale", type=int, default=VOCAB_SCALE)
+    args = parser.parse_args()
+
+    raise SystemExit(0 if main(args.scale) else 1)
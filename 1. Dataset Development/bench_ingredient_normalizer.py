@@ -0,0 +1,113 @@
+import os
+import re
+import time
+import argparse
+import pandas as pd
+from ingredient_normalizer import normalize_series
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INGREDIENTS_CSV = os.path.join(BASE_DIR, "df_ingredient_recipes.csv")
+COUNTS_CSV = os.path.join(BASE_DIR, "counts.csv")
+REPEAT = 20
+
+
+# --- LEGACY IMPLEMENTATION (clean_ingredient_name from 8_data_cleaning) ---
+# Kept verbatim as the baseline for timing and for the regression check.
+
+def legacy_clean_ingredient_name(text):
+    if not isinstance(text, str):
+        return ""
+    text = text.lower().strip()
+    text = re.sub(r'\([^)]*\)', '', text)
+    if '/' in text:
+        text = text.split('/')[0]
+    text = re.sub(r'[0-9½¼\.,]', '', text)
+    replacements = {
+        'oe': 'u',
+        'dj': 'j',
+        'tj': 'c',
+        'nj': 'ny',
+        'sj': 'sy',
+        'ch': 'kh',
+        'j': 'y'
+    }
+    for old, new in replacements.items():
+        if old == 'j' and 'dj' in text: continue
+        if old == 'j' and 'tj' in text: continue
+        if old == 'j' and 'nj' in text: continue
+        text = text.replace(old, new)
+    synonyms = {
+        'brambang': 'bawang merah',
+        'lombok': 'cabai',
+        'cabe': 'cabai',
+        'djae': 'jahe',
+        'jae': 'jahe',
+        'laos': 'lengkuas',
+        'jeruk nipis': 'jeruk',
+        'jeruk purut': 'jeruk',
+        'unclang': 'daun bawang',
+        'vetsin': 'penyedap rasa',
+        'micin': 'penyedap rasa'
+    }
+    stop_words = ['iris', 'halus', 'giling', 'potong', 'cincang', 'sisir', 'muda', 'tua', 'matang', 'segar']
+    words = text.split()
+    clean_words = []
+    for w in words:
+        if w in synonyms:
+            clean_words.append(synonyms[w])
+        elif w not in stop_words:
+            clean_words.append(w)
+    return ' '.join(clean_words).strip()
+
+
+# Hand-picked inputs for the rule edge cases (spelling order, blockers, noise)
+EDGE_CASES = [
+    None, float('nan'), "", "   ", "Garam", "AJAM (iris)", "minjak/mentega", "djae 2½ cm",
+    "tjabe rawit", "ddjj", "oedang", "sjarat", "cherry", "njonja", "jeruk nipis",
+    "bawang merah, iris halus", "gula 1.5 kg", "(semua) (bahan)", "lombok hijau / merah",
+]
+
+
+def main(repeat=REPEAT):
+    names = pd.read_csv(INGREDIENTS_CSV)['ingredient_normalized_name'].str.lower()
+    print(f"🧪 {len(names):,} rows, {names.nunique():,} distinct names")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy = names.apply(legacy_clean_ingredient_name)
+    legacy_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        engine = normalize_series(names)
+    engine_time = (time.perf_counter() - start) / repeat
+
+    failures = []
+    if not legacy.equals(engine):
+        failures.append("row-by-row output differs from the legacy function")
+    edge = pd.Series(EDGE_CASES, dtype=object)
+    if edge.apply(legacy_clean_ingredient_name).tolist() != normalize_series(edge).tolist():
+        failures.append("edge cases differ from the legacy function")
+    if os.path.exists(COUNTS_CSV):
+        expected = pd.read_csv(COUNTS_CSV, keep_default_na=False).set_index('ingredient_normalized_name')['count']
+        counts = engine.value_counts()
+        if sorted(counts.items()) != sorted(expected.items()):
+            failures.append("value counts differ from counts.csv")
+
+    print(f"Legacy : {legacy_time * 1000:8.1f} ms")
+    print(f"Engine : {engine_time * 1000:8.1f} ms")
+    print(f"Speedup: {legacy_time / engine_time:.1f}x")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Output identical to the legacy function and counts.csv")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regression check and timing for the ingredient normalizer.")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    raise SystemExit(0 if main(args.repeat) else 1)
@@ -0,0 +1,177 @@
+import json
+import time
+import random
+import argparse
+from stitcher import stitch
+
+# --- CONFIGURATION ---
+N_FRAGMENTS = 100_000
+SEED = 1967
+
+
+def synthetic_fragments(n, seed=SEED):
+    """
+    Page-ordered fragments shaped like the OCR output: 1-3 per page, with
+    continuation titles, placeholder instructions and 'inferred' rows mixed in.
+    """
+    rng = random.Random(seed)
+    page, index = 187, 0
+    for i in range(n):
+        if index and rng.random() < 0.5:
+            page += 1
+            index = 0
+        index += 1
+
+        title = rng.choice(["Arem Arem", "Sayur Lodeh", "Sambal Goreng", "Kue Lapis", "Soto Ayam"])
+        if index == 1 and rng.random() < 0.1:
+            title = rng.choice(["(Lanjutan)", "Continued", "Untitled fragment"])
+
+        roll = rng.random()
+        if roll < 0.1:
+            instructions = []
+        elif roll < 0.15:
+            instructions = ["(Instructions continue on next page)"]
+        else:
+            instructions = [f"Langkah {k}." for k in range(rng.randint(1, 6))]
+
+        groups = []
+        for g_name in rng.sample(["utama", "bumbu", "kuah", "inferred (bumbu)"], rng.randint(1, 3)):
+            groups.append({
+                "group_name": g_name,
+                "original_header": "Bahan",
+                "ingredients": [
+                    {
+                        "original_text": rng.choice(["garam", "gula", "kelapa", "bawang (inferred)"]),
+                        "item_original": "garam",
+                        "item_normalized": "garam",
+                        "quantity": 1.0,
+                        "unit": "sendok teh",
+                    }
+                    for _ in range(rng.randint(1, 8))
+                ],
+            })
+
+        yield {
+            "recipe_id": f"MR_{page}_{str(index).zfill(2)}",
+            "title_original": title.upper(),
+            "title_normalized": title,
+            "_source_page": page,
+            "ingredient_groups": groups,
+            "instructions": instructions,
+        }
+
+
+# --- LEGACY IMPLEMENTATION (6_sticth_continuation.py before the engine) ---
+# Kept verbatim as the baseline for timing and for the equality check.
+
+def legacy_is_continuation(prev, curr):
+    if not prev or not curr:
+        return False, None
+    curr_title_orig = (curr.get('title_original') or "").lower()
+    curr_title_norm = (curr.get('title_normalized') or "").lower()
+    page_diff = curr.get('_source_page', 999) - prev.get('_source_page', 0)
+    if not (0 <= page_diff <= 2):
+        return False, None
+    fragment_keywords = ["continu", "lanjut", "sambung", "untitled", 'fragment', 'cont.']
+    is_explicit_fragment = any(kw in curr_title_orig or kw in curr_title_norm for kw in fragment_keywords)
+    prev_instr_list = prev.get('instructions') or []
+    prev_instr_text = " ".join(map(str, prev_instr_list)).lower()
+    is_prev_incomplete = (
+        len(prev_instr_list) == 0 or
+        "incomplete" in prev_instr_text or
+        "missing" in prev_instr_text or
+        "continue" in prev_instr_text
+    )
+    list_id_to_stitch = ['MR_201_01', 'MR_276_01', 'MR_300_01', 'MR_310_01', 'MR_348_01', 'MR_432_01', 'MR_434_01', 'MR_561_01', 'MR_613_01', 'MR_715_01', 'MR_740_01', 'MR_748_01', 'MR_857_01', 'MR_861_01', 'MR_893_01', 'MR_980_01', 'MR_1098_01']
+    if is_explicit_fragment and is_prev_incomplete:
+        return True, "Keyword + Empty Instructions"
+    if is_explicit_fragment:
+        return True, "Explicit Keyword"
+    if curr.get('recipe_id', '') in list_id_to_stitch:
+        return True, "Force Stich"
+    return False, None
+
+
+def legacy_merge_recipes(head, tail):
+    head = json.loads(json.dumps(head))
+    head_groups = head.get('ingredient_groups', []) or []
+    tail_groups = tail.get('ingredient_groups', []) or []
+    for t_group in tail_groups:
+        g_name = (t_group.get('group_name') or "").lower()
+        if "inferred" in g_name:
+            continue
+        t_ingredients = [
+            ing for ing in t_group.get('ingredients', [])
+            if "inferred" not in (ing.get('original_text') or "").lower()
+        ]
+        if not t_ingredients:
+            continue
+        target_group = None
+        if any(name in g_name for name in ["utama", "bumbu"]):
+            for h_group in head_groups:
+                if h_group.get('group_name', '').lower() == g_name:
+                    target_group = h_group
+                    break
+        if target_group:
+            target_group['ingredients'].extend(t_ingredients)
+        else:
+            new_group = t_group.copy()
+            new_group['ingredients'] = t_ingredients
+            head_groups.append(new_group)
+    head['ingredient_groups'] = head_groups
+    t_instructions = tail.get('instructions', []) or []
+    h_instructions = head.get('instructions', []) or []
+    is_placeholder = any("continue" in str(line).lower() for line in h_instructions)
+    if t_instructions:
+        if not h_instructions or is_placeholder:
+            head['instructions'] = t_instructions
+        else:
+            head['instructions'].extend(t_instructions)
+    return head
+
+
+def legacy_stitch(raw_list):
+    final_recipes, stitch_log = [], []
+    buffer = raw_list[0]
+    for i in range(1, len(raw_list)):
+        next_item = raw_list[i]
+        should_stitch, reason = legacy_is_continuation(buffer, next_item)
+        if should_stitch:
+            stitch_log.append({"Head_ID": buffer['recipe_id'], "Tail_ID": next_item['recipe_id'], "Reason": reason})
+            buffer = legacy_merge_recipes(buffer, next_item)
+        else:
+            final_recipes.append(buffer)
+            buffer = next_item
+    final_recipes.append(buffer)
+    return final_recipes, stitch_log
+
+
+def main(n=N_FRAGMENTS):
+    print(f"🧪 Building {n:,} synthetic fragments...")
+    # Both runs get their own copy: the engine mutates the fragments it owns
+    legacy_input = list(synthetic_fragments(n))
+    engine_input = list(synthetic_fragments(n))
+
+    start = time.perf_counter()
+    legacy_recipes, legacy_log = legacy_stitch(legacy_input)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine_log = []
+    engine_recipes = list(stitch(iter(engine_input), engine_log))
+    engine_time = time.perf_counter() - start
+
+    same = legacy_recipes == engine_recipes and legacy_log == engine_log
+    print(f"Legacy : {legacy_time:7.3f}s  ({n / legacy_time:,.0f} fragments/s)")
+    print(f"Engine : {engine_time:7.3f}s  ({n / engine_time:,.0f} fragments/s)")
+    print(f"Speedup: {legacy_time / engine_time:.1f}x | {len(engine_recipes):,} recipes, "
+          f"{len(engine_log):,} stitches | identical output: {'✅' if same else '❌'}")
+    return same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stitching engine on synthetic fragments.")
+    parser.add_argument("-n", type=int, default=N_FRAGMENTS)
+    args = parser.parse_args()
+
+    main(args.n)
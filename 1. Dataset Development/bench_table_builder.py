@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+from fragment_store import FragmentStore
+from table_builder import build_tables, CHUNK_SIZE, RECIPE_DTYPES, INGREDIENT_DTYPES
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_FILE = os.path.join(BASE_DIR, "mustika_rasa_full_cleaned.jsonl")
+COPIES = 10
+
+
+# --- LEGACY IMPLEMENTATION (flattening cell of 8_data_cleaning) ---
+# Kept verbatim as the baseline for timing and for the equality check.
+
+def legacy_build_tables(raw_data):
+    recipes_rows = []
+    ingredients_rows = []
+    ing_pk_counter = 1
+    for recipe in raw_data:
+        rec_id = recipe.get('recipe_id')
+        instructions_clean = "\n".join(recipe.get('instructions', []) or [])
+        ing_json_str = json.dumps(recipe.get('ingredient_groups', []), ensure_ascii=False)
+        recipes_rows.append({
+            'id': rec_id,
+            'title_original': recipe.get('title_original'),
+            'title_normalized': recipe.get('title_normalized'),
+            'source_page': recipe.get('_source_page') or recipe.get('page_number'),
+            'region': recipe.get('region'),
+            'category': recipe.get('category'),
+            'ingredient_json': ing_json_str,
+            'instruction': instructions_clean
+        })
+        groups = recipe.get('ingredient_groups', [])
+        if groups:
+            for group in groups:
+                g_name = group.get('group_name', 'utama')
+                for item in group.get('ingredients', []):
+                    ingredients_rows.append({
+                        'id': f"ING_{str(ing_pk_counter).zfill(6)}",
+                        'recipe_id': rec_id,
+                        'ingredient_group': g_name,
+                        'ingredient_original_name': item.get('item_original'),
+                        'ingredient_normalized_name': item.get('item_normalized'),
+                        'ingredient_quantity': item.get('quantity'),
+                        'ingredient_unit': item.get('unit')
+                    })
+                    ing_pk_counter += 1
+    return pd.DataFrame(recipes_rows), pd.DataFrame(ingredients_rows)
+
+
+def repeated(path, copies):
+    """The store streamed `copies` times, standing in for a multi-book corpus."""
+    for _ in range(copies):
+        yield from FragmentStore(path)
+
+
+def measure(label, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = build()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<22} {elapsed:7.2f}s  peak {peak / 1e6:7.1f} MB  "
+          f"recipes {tables[0].shape}  ingredients {tables[1].shape}")
+    return tables
+
+
+def check_empty():
+    """No recipes, and recipes without ingredients, give empty frames with the usual columns."""
+    no_ingredients = [{'recipe_id': 'MR_1_01', 'ingredient_groups': []},
+                      {'recipe_id': 'MR_1_02', 'ingredient_groups': [{'group_name': 'utama', 'ingredients': []}]}]
+    ok = True
+    for recipes, n_recipes in (([], 0), (no_ingredients, 2)):
+        df_rec, df_ing = build_tables(recipes, chunk_size=1)
+        ok &= (list(df_rec.columns) == list(RECIPE_DTYPES) and len(df_rec) == n_recipes
+               and list(df_ing.columns) == list(INGREDIENT_DTYPES) and len(df_ing) == 0)
+    print(f"Empty inputs: {'✅' if ok else '❌'}")
+    return ok
+
+
+def main(copies=COPIES, chunk_size=CHUNK_SIZE):
+    print(f"🧪 {INPUT_FILE} x {copies}")
+    legacy = measure("Legacy (row dicts)", lambda: legacy_build_tables(repeated(INPUT_FILE, copies)))
+    engine = measure(f"Builder (chunk {chunk_size})", lambda: build_tables(repeated(INPUT_FILE, copies), chunk_size))
+
+    same = all(
+        old.to_csv(index=False) == new.to_csv(index=False)
+        for old, new in zip(legacy, engine)
+    )
+    print(f"Identical CSV output: {'✅' if same else '❌'}")
+    return check_empty() and same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Equality check, timing and peak memory of the table builder.")
+    parser.add_argument("--copies", type=int, default=COPIES)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    raise SystemExit(0 if main(args.copies, args.chunk_size) else 1)
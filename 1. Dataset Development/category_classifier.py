@@ -0,0 +1,137 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+UNKNOWN = "Unknown"
+
+# Keyword buckets in PRIORITY ORDER: when a text contains keywords from several
+# buckets, the bucket listed first wins ('sambal goreng' is a lauk, not a sambal).
+CATEGORIES = {
+    'MAKANAN UTAMA': [
+        'nasi', 'bubur', 'lontong', 'ketupat', 'tortilla', 'sagu', 'jagung', 'djagung', 'tiwul'
+    ],
+    'LAUK PAUK BASAH - BERKUAH': [
+        'sayur', 'sajur', 'sop', 'soto', 'gulai', 'kare', 'kari', 'lodeh', 'asem',
+        'brongkos', 'rawon', 'semur', 'garang asam', 'gangan', 'pindang', 'santan'
+    ],
+    'LAUK PAUK BASAH TIDAK BERKUAH': [
+        'pepes', 'botok', 'gadon', 'oseng', 'tumis', 'urap', 'pecel', 'petjel',
+        'karedok', 'gudeg', 'gudek', 'rendang', 'kalio', 'sambal goreng', 'sambel goreng',
+        'dendeng', 'terik', 'abon'
+    ],
+    'LAUK PAUK BAKAR': [
+        'sate', 'saté', 'ayam bakar', 'grill', 'ikan bakar', 'panggang', 'klotok'
+    ],
+    'LAUK PAUK GORENGAN': [
+        'goreng', 'perkedel', 'pekedel', 'dadar', 'martabak', 'lumpia', 'risoles',
+        'risolles', 'pastel', 'tahu', 'tempe', 'keripik', 'kerupuk', 'rempeyek', 'bakwan'
+    ],
+    'SAMBAL SAMBALAN': [
+        'sambal', 'sambel', 'saos', 'bumbu', 'petis', 'dabu-dabu'
+    ],
+    'DJADJANAN': [
+        'kue', 'kué', 'cake', 'bolu', 'jajanan', 'snack', 'lapis', 'desert', 'dessert',
+        'dodol', 'jenang', 'djenang', 'wajik', 'wadjid', 'getuk', 'gethuk', 'klepon',
+        'onde', 'apem', 'serabi', 'puding', 'poding', 'agar', 'kolak', 'pisang', 'ubi',
+        'singkong', 'tapai', 'tape', 'empek', 'pempek', 'tekwan', 'batagor', 'siomay'
+    ],
+    'MINUMAN': [
+        'es ', 'minuman', 'wedang', 'bajigur', 'bandrek', 'camilan', 'sirup',
+        'jus', 'kopi', 'teh', 'cendol', 'tjendol', 'dawet'
+    ]
+}
+
+
+class CategoryClassifier:
+    """
+    Substring keyword classifier compiled into one Aho-Corasick automaton.
+
+    Every keyword of every bucket goes into a single trie with failure links,
+    and each state stores the best (lowest) bucket rank of all keywords ending
+    there. A text is then scanned once, character by character, no matter how
+    many keywords there are. The result is the best-priority bucket among all
+    hits, which is the same answer as looping bucket by bucket and keyword by
+    keyword.
+    """
+
+    def __init__(self, categories=CATEGORIES, default=UNKNOWN):
+        self.default = default
+        self.labels = list(categories)
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]
+        for rank, label in enumerate(self.labels):
+            for keyword in categories[label]:
+                self._add(keyword.lower(), rank)
+        self._link()
+
+    def _add(self, keyword, rank):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            state = nxt
+        if self._best[state] is None or rank < self._best[state]:
+            self._best[state] = rank
+
+    def _link(self):
+        """Breadth-first failure links; a state also reports the keywords of its fail state."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None and (self._best[nxt] is None or inherited < self._best[nxt]):
+                    self._best[nxt] = inherited
+                queue.append(nxt)
+
+    def rank(self, text):
+        """Best (lowest) bucket rank for one text, or None without a hit."""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = None
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            rank = best_at[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+                if best == 0:
+                    break
+        return best
+
+    def classify(self, text):
+        """Category for one text; the default for non-strings or no hit."""
+        if not isinstance(text, str):
+            return self.default
+        rank = self.rank(text)
+        return self.default if rank is None else self.labels[rank]
+
+    def classify_series(self, series):
+        """Classifies a whole column, scanning each distinct text once."""
+        codes, uniques = pd.factorize(series)
+        mapped = np.array([self.classify(u) for u in uniques] + [self.default], dtype=object)
+        return pd.Series(mapped[codes], index=series.index, name=series.name)
+
+
+_default = CategoryClassifier()
+
+
+def get_category(text):
+    """Maps input text to a category; 'Unknown' if no keyword matches."""
+    return _default.classify(text)
+
+
+def classify_series(series):
+    return _default.classify_series(series)
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECIPES_CSV = os.path.join(BASE_DIR, "df_recipes.csv")
+INGREDIENTS_CSV = os.path.join(BASE_DIR, "df_ingredient_recipes.csv")
+RECIPES_PARQUET = os.path.join(BASE_DIR, "df_recipes.parquet")
+INGREDIENTS_PARQUET = os.path.join(BASE_DIR, "df_ingredient_recipes.parquet")
+
+# Small row groups keep min/max stats useful for page and id filters
+ROW_GROUP_SIZE = 512
+COMPRESSION = "zstd"
+
+# Low-cardinality text columns stored as dictionary (category) columns
+RECIPE_DICT_COLUMNS = ["region", "ai_category", "region_clean", "province_group", "category"]
+INGREDIENT_DICT_COLUMNS = ["ingredient_group", "ingredient_unit", "unit_canonical", "unit_dimension", "unit_status"]
+
+# --- SCHEMAS ---
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+INGREDIENT_STRUCT = pa.struct([
+    ("original_text", pa.string()),
+    ("item_original", pa.string()),
+    ("item_normalized", pa.string()),
+    ("quantity", pa.float64()),
+    ("unit", pa.string()),
+])
+
+INGREDIENT_GROUPS_TYPE = pa.list_(pa.struct([
+    ("group_name", pa.string()),
+    ("original_header", pa.string()),
+    ("ingredients", pa.list_(INGREDIENT_STRUCT)),
+]))
+
+RECIPES_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("title_original", pa.string()),
+    ("title_normalized", pa.string()),
+    ("source_page", pa.int32()),
+    ("region", DICT_STRING),
+    ("ai_category", DICT_STRING),
+    ("ingredient_groups", INGREDIENT_GROUPS_TYPE),
+    ("instruction", pa.string()),
+    ("region_clean", DICT_STRING),
+    ("province_group", DICT_STRING),
+    ("category", DICT_STRING),
+])
+
+INGREDIENTS_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("recipe_id", pa.string()),
+    ("ingredient_group", DICT_STRING),
+    ("ingredient_original_name", pa.string()),
+    ("ingredient_normalized_name", pa.string()),
+    ("ingredient_quantity", pa.float64()),
+    ("ingredient_unit", DICT_STRING),
+    # Added by unit_normalizer.normalize_units (null when exporting older tables)
+    ("unit_canonical", DICT_STRING),
+    ("unit_dimension", DICT_STRING),
+    ("quantity_g", pa.float64()),
+    ("quantity_ml", pa.float64()),
+    ("quantity_count", pa.float64()),
+    ("unit_status", DICT_STRING),
+])
+
+
+def _as_float(value):
+    """OCR quantities are mostly floats; ranges like '1.0-2.0' become null."""
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+
+def _parse_groups(ing_json):
+    """ingredient_json string (or an already-parsed list) -> list of group dicts."""
+    if isinstance(ing_json, str):
+        groups = json.loads(ing_json) if ing_json.strip() else []
+    elif isinstance(ing_json, list):
+        groups = ing_json
+    else:
+        groups = []
+    return [
+        {
+            "group_name": group.get("group_name"),
+            "original_header": group.get("original_header"),
+            "ingredients": [
+                {
+                    "original_text": item.get("original_text"),
+                    "item_original": item.get("item_original"),
+                    "item_normalized": item.get("item_normalized"),
+                    "quantity": _as_float(item.get("quantity")),
+                    "unit": item.get("unit"),
+                }
+                for item in group.get("ingredients") or []
+            ],
+        }
+        for group in groups or []
+    ]
+
+
+def _column(series, field):
+    """One pandas column -> Arrow array of the schema type (NaN -> null)."""
+    values = series.astype(object).where(series.notna(), None).tolist()
+    if pa.types.is_dictionary(field.type):
+        return pa.array(values, type=pa.string()).dictionary_encode()
+    return pa.array(values, type=field.type)
+
+
+def _to_table(df, schema):
+    arrays = []
+    for field in schema:
+        if field.name in df.columns:
+            arrays.append(_column(df[field.name], field))
+        else:
+            arrays.append(pa.nulls(len(df), type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def recipes_to_arrow(df_recipes):
+    """
+    Recipe table with typed columns; the ingredient_json text becomes a native
+    list<struct> column (ingredient_groups) instead of an embedded string.
+    """
+    df = df_recipes.drop(columns=[c for c in df_recipes.columns if c.startswith("Unnamed")])
+    if "ingredient_json" in df.columns:
+        df = df.assign(ingredient_groups=df["ingredient_json"].map(_parse_groups))
+    return _to_table(df, RECIPES_SCHEMA)
+
+
+def ingredients_to_arrow(df_ingredients):
+    df = df_ingredients.drop(columns=[c for c in df_ingredients.columns if c.startswith("Unnamed")])
+    quantity = pd.to_numeric(df["ingredient_quantity"], errors="coerce")
+    dropped = int((quantity.isna() & df["ingredient_quantity"].notna()).sum())
+    if dropped:
+        print(f"⚠️ {dropped} non-numeric quantities stored as null")
+    return _to_table(df.assign(ingredient_quantity=quantity), INGREDIENTS_SCHEMA)
+
+
+def write_parquet(table, path, row_group_size=ROW_GROUP_SIZE):
+    """Atomic write with per-row-group min/max statistics."""
+    tmp_path = path + ".tmp"
+    pq.write_table(
+        table, tmp_path,
+        row_group_size=row_group_size,
+        compression=COMPRESSION,
+        use_dictionary=True,
+        write_statistics=True,
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_tables(df_recipes, df_ingredients,
+                  recipes_path=RECIPES_PARQUET, ingredients_path=INGREDIENTS_PARQUET):
+    """Writes both tables as Parquet; called from the end of 8_data_cleaning."""
+    write_parquet(recipes_to_arrow(df_recipes), recipes_path)
+    write_parquet(ingredients_to_arrow(df_ingredients), ingredients_path)
+    print(f"💾 Parquet saved: {os.path.basename(recipes_path)}, {os.path.basename(ingredients_path)}")
+    return recipes_path, ingredients_path
+
+
+def read_recipes(columns=None, filters=None, path=RECIPES_PARQUET):
+    """
+    Loads only the requested columns; dictionary columns come back as pandas
+    categoricals. filters uses pyarrow syntax, e.g. [("source_page", ">=", 900)].
+    """
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+
+def read_ingredients(columns=None, filters=None, path=INGREDIENTS_PARQUET):
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+
+def main(compare=False):
+    if not os.path.exists(RECIPES_CSV) or not os.path.exists(INGREDIENTS_CSV):
+        print("❌ CSV tables not found. Run 8_data_cleaning.ipynb first.")
+        return
+
+    print("📂 Converting CSV tables to Parquet...")
+    df_recipes = pd.read_csv(RECIPES_CSV)
+    df_ingredients = pd.read_csv(INGREDIENTS_CSV)
+    export_tables(df_recipes, df_ingredients)
+
+    for csv_path, parquet_path in [(RECIPES_CSV, RECIPES_PARQUET), (INGREDIENTS_CSV, INGREDIENTS_PARQUET)]:
+        meta = pq.ParquetFile(parquet_path).metadata
+        print(f"   {os.path.basename(parquet_path)}: {meta.num_rows} rows, {meta.num_row_groups} row groups, "
+              f"{os.path.getsize(parquet_path) / 1024:.0f} KB (CSV {os.path.getsize(csv_path) / 1024:.0f} KB)")
+
+    if compare:
+        columns = ["id", "region_clean", "province_group", "category"]
+        start = time.perf_counter()
+        pd.read_csv(RECIPES_CSV)
+        csv_time = time.perf_counter() - start
+        start = time.perf_counter()
+        read_recipes(columns=columns)
+        parquet_time = time.perf_counter() - start
+        print(f"⏱️ Full CSV load: {csv_time * 1000:.1f} ms | Parquet {columns}: {parquet_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the step 8 tables as typed Parquet files.")
+    parser.add_argument("--compare", action="store_true", help="Time a column load against the CSV load")
+    args = parser.parse_args()
+
+    main(args.compare)
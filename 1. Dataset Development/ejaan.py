@@ -0,0 +1,40 @@
+import re
+import unicodedata
+
+# --- OLD SPELLING (Ejaan Lama / Van Ophuijsen -> EYD) ---
+# Folded in one left-to-right pass, so 'dj' never gets a second rewrite.
+# A lone 'j' is left alone: it is 'y' in old spelling but 'j' in new spelling,
+# and the fuzzy matchers absorb that one-letter difference.
+OLD_TO_NEW = {
+    'oe': 'u',
+    'dj': 'j',
+    'tj': 'c',
+    'nj': 'ny',
+    'sj': 'sy',
+    'ch': 'kh',
+}
+
+_OLD_RE = re.compile("|".join(sorted(OLD_TO_NEW, key=len, reverse=True)))
+_PARENS_RE = re.compile(r'\([^)]*\)')
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+
+def strip_accents(text):
+    """'saté' -> 'sate', 'kué' -> 'kue'."""
+    return "".join(ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch))
+
+
+def fold(text, drop_parens=True):
+    """
+    Comparison key for old and new spellings of the same name:
+    lowercase, no accents, no parenthesised notes, old spelling rewritten,
+    punctuation collapsed to single spaces. Non-strings fold to ''.
+    'ATJAR IKAN (Tjiandjur)' -> 'acar ikan', 'Djagung' -> 'jagung'.
+    """
+    if not isinstance(text, str):
+        return ""
+    text = strip_accents(text.lower())
+    if drop_parens:
+        text = _PARENS_RE.sub(' ', text)
+    text = _OLD_RE.sub(lambda m: OLD_TO_NEW[m.group(0)], text)
+    return _NON_WORD_RE.sub(' ', text).strip()
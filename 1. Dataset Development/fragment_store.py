@@ -0,0 +1,116 @@
+import os
+import re
+import json
+import heapq
+
+
+def fragment_sort_key(fragment):
+    """Store order: source page, then position on the page (the MR_<page>_<NN> suffix)."""
+    page = fragment.get('_source_page')
+    if page is None:
+        page = fragment.get('page_number') or 0
+    match = re.search(r'_(\d+)$', fragment.get('recipe_id') or "")
+    return (int(page), int(match.group(1)) if match else 0)
+
+
+class FragmentStore:
+    """
+    Line-delimited JSON store: one recipe fragment per line, sorted by
+    (_source_page, index on page) and keyed on recipe_id.
+    Reading is a generator, so consumers never hold the whole corpus.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        return self.iter_fragments()
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            return sum(1 for line in f if line.strip())
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def iter_fragments(self):
+        """Yields fragments one line at a time."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def write(self, fragments):
+        """
+        Replaces the store with an already-sorted stream of fragments.
+        Written to a temp file first, so readers never see half a store.
+        Returns the number of fragments written.
+        """
+        tmp_path = self.path + '.tmp'
+        count = 0
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for fragment in fragments:
+                f.write(json.dumps(fragment, ensure_ascii=False))
+                f.write('\n')
+                count += 1
+        os.replace(tmp_path, self.path)
+        return count
+
+    def _last_key(self):
+        """Sort key of the last line, read from the end of the file."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            chunk = b''
+            while pos > 0 and chunk.count(b'\n') < 2:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step) + chunk
+        lines = [line for line in chunk.split(b'\n') if line.strip()]
+        return fragment_sort_key(json.loads(lines[-1])) if lines else None
+
+    def append(self, fragment):
+        """Appends one fragment; it must sort after the current last line."""
+        last = self._last_key()
+        if last is not None and fragment_sort_key(fragment) < last:
+            raise ValueError(f"{fragment.get('recipe_id')} sorts before the end of the store; use upsert()")
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(fragment, ensure_ascii=False))
+            f.write('\n')
+
+    def upsert(self, fragments):
+        """
+        Inserts or replaces fragments by recipe_id in one streaming pass.
+        Only the updates are held in memory; the store is merged line by line.
+        Returns (inserted, replaced).
+        """
+        updates = {f['recipe_id']: f for f in fragments}
+        if not updates:
+            return 0, 0
+        replaced = 0
+
+        def existing():
+            nonlocal replaced
+            for fragment in self.iter_fragments():
+                if fragment.get('recipe_id') in updates:
+                    replaced += 1
+                    continue
+                yield fragment
+
+        new_items = sorted(updates.values(), key=fragment_sort_key)
+        self.write(heapq.merge(existing(), new_items, key=fragment_sort_key))
+        return len(updates) - replaced, replaced
+
+    def get(self, recipe_id):
+        """Linear scan lookup; fine for spot checks, not for bulk access."""
+        for fragment in self.iter_fragments():
+            if fragment.get('recipe_id') == recipe_id:
+                return fragment
+        return None
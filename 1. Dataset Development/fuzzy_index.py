@@ -0,0 +1,109 @@
+from collections import defaultdict
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+from ejaan import fold
+
+# --- CONFIGURATION ---
+NGRAM = 3
+MAX_CANDIDATES = 8
+MATCH_THRESHOLD = 0.85
+
+
+def ngrams(key, n=NGRAM):
+    """Character n-grams of a space-padded key; short keys still get one gram."""
+    padded = f" {key} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+class NgramIndex:
+    """
+    Blocking index over folded names: n-gram -> ids of the names containing it.
+
+    A query only meets the names it shares n-grams with; they are ranked by
+    Dice overlap and just the top few get the (expensive) edit-based score.
+    """
+
+    def __init__(self, names, n=NGRAM):
+        self.n = n
+        self.names = list(names)
+        self.keys = [fold(name) for name in self.names]
+        self.exact = {}
+        self.postings = defaultdict(list)
+        self.gram_counts = np.zeros(len(self.keys), dtype=np.int32)
+        for i, key in enumerate(self.keys):
+            if not key:
+                continue
+            self.exact.setdefault(key, i)
+            grams = ngrams(key, n)
+            self.gram_counts[i] = len(grams)
+            for gram in grams:
+                self.postings[gram].append(i)
+
+    def candidates(self, key, limit=MAX_CANDIDATES):
+        """Ids of the names sharing the most n-grams with key, best Dice first."""
+        grams = ngrams(key, self.n)
+        shared = defaultdict(int)
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] += 1
+        dice = {i: 2 * c / (len(grams) + self.gram_counts[i]) for i, c in shared.items()}
+        return sorted(dice, key=dice.get, reverse=True)[:limit]
+
+    def match(self, name, threshold=MATCH_THRESHOLD, limit=MAX_CANDIDATES):
+        """
+        Best indexed name for `name` as (id, score), or (None, best score).
+        Folded-key equality scores 1.0; otherwise the score is the edit
+        similarity (difflib ratio) of the folded keys.
+        """
+        key = fold(name)
+        if not key:
+            return None, 0.0
+        if key in self.exact:
+            return self.exact[key], 1.0
+        best_id, best_score = None, 0.0
+        for i in self.candidates(key, limit):
+            score = SequenceMatcher(None, key, self.keys[i], autojunk=False).ratio()
+            if score > best_score:
+                best_id, best_score = i, score
+        if best_score < threshold:
+            return None, best_score
+        return best_id, best_score
+
+
+def match_names(names, index, threshold=MATCH_THRESHOLD):
+    """
+    Matches a column of names against an NgramIndex, one lookup per distinct
+    name. Returns (row ids into the index, scores); unmatched names get
+    id -1 and score NaN.
+    """
+    codes, uniques = pd.factorize(names)
+    ids = np.full(len(uniques) + 1, -1, dtype=np.int64)
+    scores = np.full(len(uniques) + 1, np.nan)
+    for u, name in enumerate(uniques):
+        i, score = index.match(name, threshold)
+        if i is not None:
+            ids[u], scores[u] = i, score
+    return ids[codes], scores[codes]
+
+
+def fuzzy_join(left, left_on, right, right_on, columns, threshold=MATCH_THRESHOLD):
+    """
+    Left join that brings `columns` of `right` onto `left`, matching names
+    through their folded keys and the n-gram index. Each left row gets at most
+    one right row, so the row count never changes. Adds match_name and
+    match_score; unmatched rows get None in the joined columns.
+    """
+    ids, scores = match_names(left[left_on], NgramIndex(right[right_on].tolist()), threshold)
+    found = ids >= 0
+    safe_ids = np.where(found, ids, 0)
+
+    result = left.copy()
+    for column in list(columns) + [right_on]:
+        values = right[column].to_numpy(dtype=object)[safe_ids] if len(right) else np.full(len(left), None)
+        target = 'match_name' if column == right_on else column
+        result[target] = np.where(found, values, None)
+    result['match_score'] = scores
+    return result
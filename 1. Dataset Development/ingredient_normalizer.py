@@ -0,0 +1,85 @@
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# --- RULES (from the clean_ingredient_name cell in 8_data_cleaning) ---
+
+# OLD SPELLING NORMALIZATION (the "Ejaan Lama" fixer). Order matters.
+OLD_SPELLING = [
+    ('oe', 'u'),
+    ('dj', 'j'),
+    ('tj', 'c'),
+    ('nj', 'ny'),
+    ('sj', 'sy'),
+    ('ch', 'kh'),
+]
+# 'j' in old spelling was often the 'y' sound ('ajam' -> 'ayam'), applied last
+# and only when the text has no 'dj' / 'tj' / 'nj' left
+J_TO_Y_BLOCKERS = ('dj', 'tj', 'nj')
+
+# Synonyms mapped to a canonical name (matched per word)
+SYNONYMS = {
+    'brambang': 'bawang merah',
+    'lombok': 'cabai',
+    'cabe': 'cabai',
+    'djae': 'jahe',
+    'jae': 'jahe',
+    'laos': 'lengkuas',
+    'jeruk nipis': 'jeruk',
+    'jeruk purut': 'jeruk',
+    'unclang': 'daun bawang',
+    'vetsin': 'penyedap rasa',
+    'micin': 'penyedap rasa',
+}
+
+# Preparation words dropped from the name
+STOP_WORDS = frozenset(['iris', 'halus', 'giling', 'potong', 'cincang', 'sisir', 'muda', 'tua', 'matang', 'segar'])
+
+# Compiled once instead of on every row
+_PARENS_RE = re.compile(r'\([^)]*\)')
+_NOISE_TABLE = str.maketrans('', '', '0123456789½¼.,')
+
+
+def fix_old_spelling(text):
+    for old, new in OLD_SPELLING:
+        text = text.replace(old, new)
+    if not any(blocker in text for blocker in J_TO_Y_BLOCKERS):
+        text = text.replace('j', 'y')
+    return text
+
+
+@lru_cache(maxsize=None)
+def _normalize(text):
+    # 1. Lowercase and strip whitespace
+    text = text.lower().strip()
+    # 2. Remove text inside parentheses ("(iris)", "1/2 tua")
+    text = _PARENS_RE.sub('', text)
+    # 3. "minyak/mentega" -> first item is the primary one
+    text = text.split('/', 1)[0]
+    # 4. Remove numbers and noise characters
+    text = text.translate(_NOISE_TABLE)
+    # 5. Old spelling
+    text = fix_old_spelling(text)
+    # 6. Synonyms & preparation words
+    words = [SYNONYMS.get(w, w) for w in text.split() if w in SYNONYMS or w not in STOP_WORDS]
+    return ' '.join(words).strip()
+
+
+def normalize_name(text):
+    """Normalizes one ingredient name; non-strings become ''."""
+    if not isinstance(text, str):
+        return ""
+    return _normalize(text)
+
+
+def normalize_series(series):
+    """
+    Normalizes a column of ingredient names. Each distinct value is normalized
+    once and the results are mapped back to the rows through the factorized
+    codes, so the cost depends on the vocabulary, not on the row count.
+    """
+    codes, uniques = pd.factorize(series)
+    # Missing values get code -1, which picks the trailing '' below
+    mapped = np.array([normalize_name(u) for u in uniques] + [""], dtype=object)
+    return pd.Series(mapped[codes], index=series.index, name=series.name)
@@ -0,0 +1,317 @@
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+import httpx
+from google.genai import types
+from page_scheduler import is_rate_limit_error, retry_after_seconds
+
+# --- DEFAULTS ---
+DEFAULT_DEADLINE = 120.0       # seconds one attempt may take, hedge included
+MAX_ATTEMPTS = 3               # transport-level attempts per call
+
+# Hedging: a second copy of a call that is slower than the recent p95
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20         # no hedging until the latency window has this many calls
+HEDGE_MIN_DELAY = 2.0          # never hedge sooner than this
+HEDGE_BUDGET = 0.05            # hedges may add at most 5% extra calls
+HEDGE_POLL = 0.25              # seconds between checks for a free rate-limit slot
+LATENCY_WINDOW = 200
+
+# Backoff: full jitter on an exponential ceiling; a server Retry-After wins
+BACKOFF_BASE = 2.0
+BACKOFF_CAP = 60.0
+
+# Circuit breaker: after this many failed calls in a row, fail fast for a while
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def status_code(e):
+    """HTTP status of an API error, or None when the service never answered."""
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(e):
+    """
+    429, 408, 5xx, deadlines and network errors are worth another attempt.
+    Other 4xx and everything else (bugs, bad config) are not.
+    """
+    code = status_code(e)
+    if code is not None:
+        return code in (408, 429) or code >= 500
+    return isinstance(e, (DeadlineExceeded, OSError, httpx.TransportError))
+
+
+def backoff_delay(attempt, retry_after=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Seconds to wait before attempt+1: the server's Retry-After, else full jitter up to base * 2^attempt."""
+    if retry_after:
+        return retry_after + random.uniform(0, 1)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def quantile(self, q, min_samples=HEDGE_MIN_SAMPLES):
+        with self.lock:
+            if len(self.samples) < min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. After `threshold` failed calls in a row it opens
+    and every call fails fast for `cooldown` seconds; then one probe call is
+    let through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self.probing:
+                raise CircuitOpenError(f"circuit open after {self.failures} failed calls in a row")
+            self.probing = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+                # Opens, or re-opens for another cooldown when the probe failed
+                self.opened_at = time.monotonic()
+                self.probing = False
+                self.times_opened += 1
+
+    def release_probe(self):
+        """The probe got no verdict (e.g. a 429); the next call probes again."""
+        with self.lock:
+            self.probing = False
+
+
+def request_config(caller):
+    """The HTTP timeout matches the caller's deadline, so an abandoned call also closes its connection."""
+    return types.GenerateContentConfig(http_options=types.HttpOptions(timeout=int(caller.deadline * 1000)))
+
+
+def _start(fn):
+    """Runs fn on a daemon thread; a hung call can be abandoned without blocking exit."""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+class ModelCaller:
+    """
+    One shared way to make a model call:
+    - per-attempt deadline (a hung call is abandoned, not waited on)
+    - a hedged duplicate once the call is slower than the recent p95,
+      within a small budget so average load barely moves
+    - jittered exponential backoff that honours Retry-After
+    - a circuit breaker that fails fast during sustained outages
+    Rate limits go through the shared AdaptiveRateLimiter when one is given.
+    """
+
+    def __init__(self, limiter=None, deadline=DEFAULT_DEADLINE, max_attempts=MAX_ATTEMPTS,
+                 hedge=True, breaker=None):
+        self.limiter = limiter
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "attempts": 0, "hedges": 0, "hedge_wins": 0,
+                      "timeouts": 0, "retries": 0, "failed": 0}
+        self.call_times = []
+        self.lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def hedge_delay(self):
+        """Seconds after which a duplicate is sent, or None (no hedging yet / budget used up)."""
+        if not self.hedge:
+            return None
+        p = self.latency.quantile(HEDGE_QUANTILE)
+        if p is None:
+            return None
+        with self.lock:
+            if self.stats["hedges"] >= self.stats["calls"] * HEDGE_BUDGET:
+                return None
+        return min(max(p, HEDGE_MIN_DELAY), self.deadline)
+
+    def _claim_hedge(self, tokens):
+        """
+        A hedge goes out only within the budget and never queues behind the
+        waiting workers (it would get its slot too late to beat the primary):
+        it takes the next slot ahead of them, or is checked again shortly.
+        """
+        with self.lock:
+            if self.stats["hedges"] >= self.stats["calls"] * HEDGE_BUDGET:
+                return False
+            if self.limiter and not self.limiter.try_acquire(tokens, priority=True):
+                return False
+            self.stats["hedges"] += 1
+            return True
+
+    def _attempt(self, fn, tokens):
+        """One attempt: primary call, maybe one hedge; the first success wins."""
+        # The deadline starts once the primary has its rate-limit slot
+        if self.limiter:
+            self.limiter.acquire(tokens)
+        start = time.monotonic()
+        primary = _start(fn)
+        pending = {primary}
+        delay = self.hedge_delay()
+        hedge_at = start + delay if delay is not None else None
+
+        first_error = None
+        while pending:
+            now = time.monotonic()
+            remaining = self.deadline - (now - start)
+            if remaining <= 0:
+                break
+            timeout = remaining
+            if hedge_at is not None:
+                if now >= hedge_at:
+                    if self._claim_hedge(tokens):
+                        pending.add(_start(fn))
+                        hedge_at = None
+                        continue
+                    hedge_at = now + HEDGE_POLL
+                timeout = min(timeout, hedge_at - now)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result(), time.monotonic() - start
+                first_error = first_error or future.exception()
+
+        if first_error is not None and not pending:
+            raise first_error
+        self._count("timeouts")
+        raise DeadlineExceeded(f"no answer within {self.deadline:g}s")
+
+    def call(self, fn, tokens=0, label="call", on_attempt=None):
+        """
+        Runs fn() (one generate_content call) under the deadline / hedge /
+        backoff / breaker policy and returns its response. on_attempt(attempt,
+        seconds, ok) is called after every attempt (e.g. PayloadReport).
+        Raises the last error when every attempt failed.
+        """
+        self._count("calls")
+        call_start = time.monotonic()
+        last_error = None
+
+        for attempt in range(self.max_attempts):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                self._count("failed")
+                raise
+            self._count("attempts")
+            if attempt:
+                self._count("retries")
+            attempt_start = time.monotonic()
+            try:
+                response, seconds = self._attempt(fn, tokens)
+            except Exception as e:
+                last_error = e
+                if on_attempt:
+                    on_attempt(attempt + 1, time.monotonic() - attempt_start, False)
+
+                if is_rate_limit_error(e):
+                    self.breaker.release_probe()
+                    retry_after = retry_after_seconds(e)
+                    if self.limiter:
+                        # Pauses every worker and lowers the shared rate
+                        wait_time = self.limiter.on_rate_limited(retry_after)
+                    else:
+                        wait_time = backoff_delay(attempt, retry_after)
+                        time.sleep(wait_time)
+                    print(f"   ⚠️ Rate Limit Hit on {label}. Waiting {wait_time:.0f} seconds...")
+                elif not is_retryable(e):
+                    if status_code(e) is not None:
+                        # The service answered; the request itself is at fault
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.release_probe()
+                    break
+                else:
+                    self.breaker.record_failure()
+                    if attempt + 1 == self.max_attempts:
+                        break
+                    wait_time = backoff_delay(attempt)
+                    print(f"   ⚠️ {label}: {e}. Retrying in {wait_time:.1f}s...")
+                    time.sleep(wait_time)
+                continue
+
+            self.breaker.record_success()
+            self.latency.record(seconds)
+            if on_attempt:
+                on_attempt(attempt + 1, seconds, True)
+            if self.limiter:
+                usage = getattr(response, "usage_metadata", None)
+                self.limiter.record_usage(tokens, getattr(usage, "total_token_count", None))
+                self.limiter.on_success()
+            with self.lock:
+                self.call_times.append(time.monotonic() - call_start)
+            return response
+
+        self._count("failed")
+        raise last_error
+
+    def summary(self):
+        with self.lock:
+            s = dict(self.stats)
+            times = sorted(self.call_times)
+        if not times:
+            return f"calls: {s['calls']} ({s['failed']} failed), no successful calls"
+        pick = lambda q: times[min(len(times) - 1, int(len(times) * q))]
+        return (f"calls: {s['calls']} ({s['attempts']} attempts, {s['hedges']} hedged / {s['hedge_wins']} hedge wins, "
+                f"{s['timeouts']} timeouts, {s['failed']} failed, breaker opened {self.breaker.times_opened}x), "
+                f"latency p50 {pick(0.5):.2f}s / p95 {pick(0.95):.2f}s / p99 {pick(0.99):.2f}s")
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import threading
+from recipe_schema import clean_json_string, recover_truncated, repair_page, SchemaError
+
+# --- DEFAULTS ---
+DEFAULT_BATCH_SIZE = 4            # page images per request in batch mode
+JOB_MAX_BYTES = 14 * 1024 * 1024  # image bytes per inline batch job (~19 MB base64; the API caps inline jobs at 20 MB)
+POLL_SECONDS = 30                 # batch-job status polling interval
+
+# Appended to the single-page prompt. The recipe format itself is unchanged;
+# the answer only wraps one recipe list per page.
+BATCH_INSTRUCTIONS = """
+BATCH MODE:
+This request contains {COUNT} page images. Each image is preceded by a text part "PAGE <number>".
+Pages in this request, in image order: {PAGES}.
+Apply every rule above to each page separately and use that page's number in its recipe_id.
+Return ONE JSON object with one entry per page, in the same order:
+{"pages": [{"page_number": 123, "recipes": [ ...the REQUIRED JSON FORMAT list for that page... ]}]}
+"""
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def batch_prompt(system_prompt, page_nums):
+    """The single-page prompt generalized to several pages, plus the batch answer format."""
+    prompt = system_prompt.replace("{PAGE_NUMBER}", "<page number>")
+    return prompt + (BATCH_INSTRUCTIONS
+                     .replace("{COUNT}", str(len(page_nums)))
+                     .replace("{PAGES}", ", ".join(str(p) for p in page_nums)))
+
+
+def page_marker(page_num):
+    return f"PAGE {page_num}"
+
+
+def _page_entries(data):
+    """[(page_number, recipes)] from {"pages": [...]}, a bare list of entries or {"187": [...]}."""
+    if isinstance(data, dict) and isinstance(data.get("pages"), list):
+        data = data["pages"]
+    if isinstance(data, dict):
+        return [(key, value) for key, value in data.items()]
+    if isinstance(data, list):
+        return [
+            (entry.get("page_number"), entry.get("recipes"))
+            for entry in data if isinstance(entry, dict)
+        ]
+    return []
+
+
+def split_pages(text, page_nums):
+    """
+    Demultiplexes one batch answer into per-page recipe lists.
+    Every page is repaired and validated on its own (recipe_schema), so one
+    bad page does not cost the others. Returns ({page: (recipes, notes)},
+    {page: reason}); pages missing from the answer are failures too.
+    """
+    cleaned = clean_json_string(text or "")
+    try:
+        data = json.loads(cleaned)
+    except json.JSONDecodeError:
+        # A cut-off answer still has its complete leading page entries
+        recovered, _ = recover_truncated(cleaned)
+        try:
+            data = json.loads(recovered) if recovered else None
+        except json.JSONDecodeError:
+            data = None
+
+    wanted = set(page_nums)
+    results = {}
+    for page, recipes in _page_entries(data):
+        try:
+            page = int(page)
+        except (TypeError, ValueError):
+            continue
+        if page not in wanted or page in results:
+            continue
+        try:
+            results[page] = repair_page(recipes, page)
+        except SchemaError as e:
+            results[page] = e
+
+    failures = {}
+    for page in page_nums:
+        if page not in results:
+            failures[page] = "missing from the batch answer"
+        elif isinstance(results[page], SchemaError):
+            failures[page] = str(results.pop(page))
+    return results, failures
+
+
+class TokenReport:
+    """
+    Prompt tokens per page (from usage metadata) against the one-page-per-call
+    baseline. The baseline is measured: single-page calls of the same run
+    first, else a count_tokens of one page (set_baseline). Only when neither
+    exists is the pre-flight estimate used, and the saving is labelled so.
+    """
+
+    def __init__(self, estimated_single_page_tokens):
+        self.estimated_single_page_tokens = estimated_single_page_tokens
+        self.counted_single_page_tokens = None
+        self.calls = 0
+        self.pages = 0
+        self.prompt_tokens = 0
+        self.single_calls = 0
+        self.single_tokens = 0
+        self.lock = threading.Lock()
+
+    def set_baseline(self, prompt_tokens):
+        """Prompt tokens of one page sent alone, from count_tokens (None = unknown)."""
+        self.counted_single_page_tokens = prompt_tokens or None
+
+    def record(self, pages, prompt_tokens):
+        if not prompt_tokens:
+            return
+        with self.lock:
+            self.calls += 1
+            self.pages += pages
+            self.prompt_tokens += prompt_tokens
+            if pages == 1:
+                self.single_calls += 1
+                self.single_tokens += prompt_tokens
+
+    def baseline(self):
+        """(tokens per page sent alone, where that number comes from)."""
+        if self.single_calls:
+            return self.single_tokens / self.single_calls, f"measured on {self.single_calls} single-page calls"
+        if self.counted_single_page_tokens:
+            return self.counted_single_page_tokens, "measured with count_tokens"
+        return self.estimated_single_page_tokens, "estimated"
+
+    def summary(self):
+        with self.lock:
+            if not self.pages:
+                return "prompt tokens: no usage reported"
+            per_page = self.prompt_tokens / self.pages
+            single, source = self.baseline()
+        return (f"prompt tokens: {per_page:.0f}/page over {self.calls} calls vs {single:.0f} "
+                f"one page per call ({source}; saves {single - per_page:.0f}/page)")
+
+
+# --- BATCH JOB MANIFEST ---
+# One JSON file lists every submitted job and the pages of each of its
+# requests, so results can be collected by a later run.
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"jobs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def pages_in_open_jobs(manifest):
+    """Pages already submitted and not collected yet (never submitted twice)."""
+    return {
+        page
+        for job in manifest["jobs"] if not job.get("collected")
+        for request in job["requests"]
+        for page in request["pages"]
+    }
+
+
+def pack_jobs(requests, sizes, max_bytes=JOB_MAX_BYTES):
+    """Groups requests (with their payload sizes) into jobs under the inline payload limit."""
+    jobs, current, current_bytes = [], [], 0
+    for request, size in zip(requests, sizes):
+        if current and current_bytes + size > max_bytes:
+            jobs.append(current)
+            current, current_bytes = [], 0
+        current.append(request)
+        current_bytes += size
+    if current:
+        jobs.append(current)
+    return jobs
+
+
+def new_job_entry(name, requests):
+    return {"name": name, "submitted_at": time.time(), "requests": requests, "collected": False}
@@ -0,0 +1,118 @@
+import io
+import os
+import csv
+import threading
+from functools import lru_cache
+from PIL import Image, ImageOps
+
+# --- BUDGET ---
+# Pages that already fit are sent as the original file bytes (no decode, no re-encode).
+MAX_PAYLOAD_BYTES = 400_000
+MAX_LONG_SIDE = 2560           # pixels; Gemini downsamples anything larger anyway
+MIN_JPEG_QUALITY = 50
+MARGIN_THRESHOLD = 200         # grayscale value below which a pixel counts as ink
+MARGIN_PADDING = 0.01          # keep 1% of the page size around the detected text
+
+MIME_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+
+def _crop_margins(gray):
+    """Crops blank paper around the text block, keeping a small padding."""
+    ink = gray.point(lambda p: 255 if p < MARGIN_THRESHOLD else 0)
+    bbox = ink.getbbox()
+    if not bbox:
+        return gray
+    pad_x = int(gray.width * MARGIN_PADDING)
+    pad_y = int(gray.height * MARGIN_PADDING)
+    left, top, right, bottom = bbox
+    return gray.crop((
+        max(0, left - pad_x), max(0, top - pad_y),
+        min(gray.width, right + pad_x), min(gray.height, bottom + pad_y),
+    ))
+
+
+def _shrink_to_budget(image_path, max_bytes, max_long_side):
+    """Grayscale -> crop margins -> downscale -> JPEG at the best quality that fits."""
+    with Image.open(image_path) as img:
+        gray = ImageOps.grayscale(img)
+    gray = _crop_margins(gray)
+    if max(gray.size) > max_long_side:
+        gray.thumbnail((max_long_side, max_long_side), Image.LANCZOS)
+
+    quality = 90
+    while True:
+        buf = io.BytesIO()
+        gray.save(buf, format="JPEG", quality=quality, optimize=True)
+        data = buf.getvalue()
+        if len(data) <= max_bytes:
+            return data
+        if quality > MIN_JPEG_QUALITY:
+            quality -= 10
+        else:
+            # Quality floor reached: trade pixels instead
+            gray = gray.resize((int(gray.width * 0.8), int(gray.height * 0.8)), Image.LANCZOS)
+
+
+@lru_cache(maxsize=32)
+def _prepare(image_path, mtime, size, max_bytes, max_long_side):
+    mime_type = MIME_TYPES.get(os.path.splitext(image_path)[1].lower(), "image/jpeg")
+    with Image.open(image_path) as img:
+        # Only the header is read here; pixels are not decoded
+        width, height = img.size
+
+    if size <= max_bytes and max(width, height) <= max_long_side:
+        with open(image_path, "rb") as f:
+            return f.read(), mime_type
+
+    return _shrink_to_budget(image_path, max_bytes, max_long_side), "image/jpeg"
+
+
+def prepare_payload(image_path, max_bytes=MAX_PAYLOAD_BYTES, max_long_side=MAX_LONG_SIDE):
+    """
+    Returns (image_bytes, mime_type) ready to upload.
+    Prepared once per file version (path + mtime + size) and memoized,
+    so every retry reuses the same bytes.
+    """
+    st = os.stat(image_path)
+    return _prepare(image_path, st.st_mtime, st.st_size, max_bytes, max_long_side)
+
+
+class PayloadReport:
+    """Collects bytes-sent and latency per page and writes them to a CSV."""
+
+    FIELDS = ["page", "original_bytes", "sent_bytes", "latency_s", "attempt", "ok"]
+
+    def __init__(self):
+        self.rows = []
+        self.lock = threading.Lock()
+
+    def record(self, page_num, image_path, sent_bytes, latency, attempt, ok):
+        with self.lock:
+            self.rows.append({
+                "page": page_num,
+                "original_bytes": os.path.getsize(image_path),
+                "sent_bytes": sent_bytes,
+                "latency_s": round(latency, 3),
+                "attempt": attempt,
+                "ok": ok,
+            })
+
+    def save(self, path):
+        with self.lock:
+            rows = sorted(self.rows, key=lambda r: (r["page"], r["attempt"]))
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def summary(self):
+        with self.lock:
+            sent = [r for r in self.rows if r["ok"]]
+        if not sent:
+            return "payload: no requests sent"
+        total_orig = sum(r["original_bytes"] for r in sent)
+        total_sent = sum(r["sent_bytes"] for r in sent)
+        latencies = sorted(r["latency_s"] for r in sent)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return (f"payload: {total_sent / 1e6:.1f} MB sent for {total_orig / 1e6:.1f} MB of pages, "
+                f"latency mean {sum(latencies) / len(latencies):.2f}s / p95 {p95:.2f}s")
@@ -0,0 +1,193 @@
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# --- DEFAULTS ---
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RPM = 60
+DEFAULT_TPM = 250_000
+
+# Rough token cost of one request, used until the response reports real usage.
+# Gemini bills a page image as a handful of 258-token tiles.
+EST_IMAGE_TOKENS = 1300
+EST_OUTPUT_TOKENS = 1500
+
+# Adaptive backoff: halve the rate on a 429, win it back slowly on success
+MIN_RATE_SCALE = 0.1
+RATE_DECREASE = 0.5
+RATE_INCREASE = 0.02
+DEFAULT_COOLDOWN = 20
+
+
+def estimate_tokens(prompt_text, images=1):
+    """Cheap pre-flight token estimate (~4 chars per token) for the TPM bucket."""
+    return len(prompt_text) // 4 + images * EST_IMAGE_TOKENS + EST_OUTPUT_TOKENS
+
+
+def is_rate_limit_error(e):
+    """Recognizes 429 / quota errors from the genai client (or the stub server)."""
+    if getattr(e, "code", None) == 429 or getattr(e, "status_code", None) == 429:
+        return True
+    error_msg = str(e)
+    return "429" in error_msg or "Quota" in error_msg or "RESOURCE_EXHAUSTED" in error_msg
+
+
+def retry_after_seconds(e):
+    """Server hint from a 429: Retry-After header or the RetryInfo 'retryDelay'."""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            return float(value)
+    except (TypeError, ValueError):
+        pass
+    match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(e))
+    return float(match.group(1)) if match else None
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at rate_per_minute.
+    Not thread-safe on its own; AdaptiveRateLimiter holds the lock.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        # Allow a burst of ~10 seconds worth of quota, never less than one unit
+        self.capacity = capacity or max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now, scale=1.0):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount, scale=1.0):
+        """Seconds until `amount` is available (0 if it is available now)."""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / (self.rate * scale)
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class AdaptiveRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets shared by all workers
+    (rpm / tpm of 0 or None = no limit).
+    A 429 halves the effective rate and pauses everyone for the cooldown
+    (or the server's Retry-After); each success wins a little of it back.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.scale = 1.0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        """Takes one request slot if it is free now (lock held); else returns the seconds to wait."""
+        now = time.monotonic()
+        if self.requests:
+            self.requests.refill(now, self.scale)
+        if self.tokens:
+            self.tokens.refill(now, self.scale)
+
+        wait = max(0.0, self.paused_until - now)
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1, self.scale))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, self.scale))
+
+        if wait == 0.0:
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+        return wait
+
+    def acquire(self, tokens=0):
+        """Blocks until one request carrying `tokens` may be sent."""
+        while True:
+            with self.lock:
+                wait = self._reserve(tokens)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    def try_acquire(self, tokens=0, priority=False):
+        """
+        Non-blocking acquire: True if the slot was taken, False if it would
+        have to wait. With priority the slot goes ahead of the workers queued
+        in acquire(): the buckets may run into debt (never deeper than one
+        request) and the queued workers wait the difference, so the rate
+        over time is unchanged.
+        """
+        with self.lock:
+            if not priority:
+                return self._reserve(tokens) == 0.0
+            now = time.monotonic()
+            if now < self.paused_until:
+                return False
+            buckets = [(bucket, amount) for bucket, amount in ((self.requests, 1), (self.tokens, tokens)) if bucket]
+            for bucket, _ in buckets:
+                bucket.refill(now, self.scale)
+            if any(bucket.tokens < 0 for bucket, _ in buckets):
+                return False
+            for bucket, amount in buckets:
+                bucket.take(amount)
+            return True
+
+    def record_usage(self, estimated, actual):
+        """Charges (or refunds) the difference once real usage is known."""
+        if not self.tokens or not actual:
+            return
+        with self.lock:
+            self.tokens.tokens -= (actual - estimated)
+
+    def on_success(self):
+        with self.lock:
+            self.scale = min(1.0, self.scale + RATE_INCREASE)
+
+    def on_rate_limited(self, retry_after=None):
+        """Backs off every worker, not just the one that hit the 429."""
+        with self.lock:
+            self.rate_limited += 1
+            self.scale = max(MIN_RATE_SCALE, self.scale * RATE_DECREASE)
+            pause = retry_after if retry_after else DEFAULT_COOLDOWN
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            return pause
+
+
+def run_pages(jobs, handler, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Runs handler(job) for every job on a thread pool of `concurrency` workers.
+    The handler returns True when the page was saved. Returns a stats dict
+    with pages done/failed and throughput in pages per minute.
+    """
+    stats = {"done": 0, "failed": 0}
+    if not jobs:
+        stats.update({"elapsed": 0.0, "pages_per_minute": 0.0})
+        return stats
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(handler, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"   ❌ Worker error on {futures[future]}: {e}")
+                ok = False
+            stats["done" if ok else "failed"] += 1
+
+    elapsed = time.monotonic() - start
+    stats["elapsed"] = elapsed
+    stats["pages_per_minute"] = stats["done"] / elapsed * 60 if elapsed else 0.0
+    return stats
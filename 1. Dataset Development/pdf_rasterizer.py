@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+# --- DEFAULTS ---
+DEFAULT_DPI = 300
+# Pages rendered per worker task. Small chunks keep poppler's working set
+# (and the number of files parked in the temp folder) tiny.
+DEFAULT_CHUNK_SIZE = 8
+
+
+def page_filename(page_num):
+    """Format filename like: page_0001.jpg"""
+    return f"page_{str(page_num).zfill(4)}.jpg"
+
+
+def pending_pages(output_folder, first_page, last_page):
+    """Returns the pages in the range that have not been rendered yet."""
+    return [
+        p for p in range(first_page, last_page + 1)
+        if not os.path.exists(os.path.join(output_folder, page_filename(p)))
+    ]
+
+
+def chunk_pages(pages, chunk_size):
+    """
+    Groups sorted page numbers into contiguous (first, last) runs of at most
+    chunk_size pages, so already-rendered pages split a run instead of being redone.
+    """
+    chunks = []
+    for p in pages:
+        if chunks and p == chunks[-1][1] + 1 and (p - chunks[-1][0]) < chunk_size:
+            chunks[-1][1] = p
+        else:
+            chunks.append([p, p])
+    return [tuple(c) for c in chunks]
+
+
+def render_chunk(pdf_path, output_folder, first_page, last_page, dpi, poppler_path=None):
+    """
+    Worker task: renders one contiguous page run.
+    pdftoppm writes the JPEGs straight to disk (paths_only=True), so no page is
+    ever decoded into a PIL image in this process. Each file is then moved into
+    place under its final name, which makes a half-finished run safe to resume.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix=".render_", dir=output_folder)
+    try:
+        paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            output_folder=tmp_dir,
+            output_file="p",
+            fmt="jpeg",
+            paths_only=True,
+            thread_count=1,
+            poppler_path=poppler_path,
+        )
+        saved = []
+        # pdftoppm zero-pads page suffixes, so sorted paths are in page order
+        for offset, path in enumerate(sorted(paths)):
+            page_num = first_page + offset
+            os.replace(path, os.path.join(output_folder, page_filename(page_num)))
+            saved.append(page_num)
+        return saved
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def rasterize_pdf(pdf_path, output_folder, first_page, last_page=None, dpi=DEFAULT_DPI,
+                  workers=None, chunk_size=DEFAULT_CHUNK_SIZE, poppler_path=None):
+    """
+    Streams pages first_page..last_page of the PDF into output_folder as JPEGs.
+    Chunks are spread over a process pool and every page is written as soon as
+    it is rendered, so peak memory does not grow with the page count.
+    Pages that already exist are skipped. Returns the list of pages written.
+    """
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+        print(f"Created folder: {output_folder}")
+
+    if not last_page:
+        last_page = pdfinfo_from_path(pdf_path, poppler_path=poppler_path)["Pages"]
+
+    todo = pending_pages(output_folder, first_page, last_page)
+    skipped = (last_page - first_page + 1) - len(todo)
+    if skipped:
+        print(f"⏩ Skipping {skipped} pages (Exists)")
+    if not todo:
+        return []
+
+    chunks = chunk_pages(todo, chunk_size)
+    workers = workers or os.cpu_count() or 1
+    print(f"Rendering {len(todo)} pages in {len(chunks)} chunks on {workers} workers at {dpi} dpi")
+
+    written = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_chunk, pdf_path, output_folder, first, last, dpi, poppler_path): (first, last)
+            for first, last in chunks
+        }
+        for future in as_completed(futures):
+            first, last = futures[future]
+            try:
+                pages = future.result()
+            except Exception as e:
+                print(f"❌ Error on pages {first}-{last}: {e}")
+                continue
+            written.extend(pages)
+            for page_num in pages:
+                print(f"Saved: {page_filename(page_num)}")
+
+    return sorted(written)
@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(BASE_DIR, ".pipeline_state.json")
+LOG_FOLDER = os.path.join(BASE_DIR, ".pipeline_logs")
+PY = sys.executable
+
+# Each step declares what it reads and writes (paths relative to BASE_DIR).
+# Dependencies are derived from these: a step depends on whichever step
+# produces one of its inputs. Folders are hashed file by file.
+STEPS = [
+    {
+        "name": "1_detail_images",
+        "cmd": [PY, "1_recipes_detail_pdf_to_images.py"],
+        "inputs": ["mustika_rasa.pdf", "1_recipes_detail_pdf_to_images.py", "pdf_rasterizer.py"],
+        "outputs": ["images1_recipes_detail"],
+    },
+    {
+        "name": "2_index_images",
+        "cmd": [PY, "2_recipes_index_pdf_to_images.py"],
+        "inputs": ["mustika_rasa.pdf", "2_recipes_index_pdf_to_images.py", "pdf_rasterizer.py"],
+        "outputs": ["images2_recipes_index"],
+    },
+    {
+        "name": "3_detail_ocr",
+        "cmd": [PY, "3_recipes_detail_images_to_json.py"],
+        "inputs": ["images1_recipes_detail", "3_recipes_detail_images_to_json.py",
+                   "page_scheduler.py", "model_call.py", "response_cache.py", "page_payload.py",
+                   "recipe_schema.py", "page_batch.py"],
+        "outputs": ["json_output1_recipes_detail"],
+    },
+    {
+        "name": "4_index_ocr",
+        "cmd": [PY, "4_recipes_index_images_to_json.py"],
+        "inputs": ["images2_recipes_index", "4_recipes_index_images_to_json.py",
+                   "page_scheduler.py", "model_call.py", "response_cache.py", "page_payload.py"],
+        "outputs": ["json_output2_recipes_index"],
+    },
+    {
+        "name": "5_raw_fragments",
+        "cmd": [PY, "5_json_raw_recipes.py"],
+        "inputs": ["json_output1_recipes_detail", "5_json_raw_recipes.py", "fragment_store.py"],
+        "outputs": ["raw_mustika_rasa_full.jsonl"],
+    },
+    {
+        "name": "6_stitch",
+        "cmd": [PY, "6_sticth_continuation.py"],
+        "inputs": ["raw_mustika_rasa_full.jsonl", "6_sticth_continuation.py",
+                   "stitcher.py", "fragment_store.py"],
+        "outputs": ["mustika_rasa_full_cleaned.jsonl"],
+    },
+    {
+        "name": "7_food_index",
+        "cmd": [PY, "7_recipes_index_csv.py"],
+        "inputs": ["json_output2_recipes_index", "7_recipes_index_csv.py"],
+        "outputs": ["food_index.csv"],
+    },
+    {
+        "name": "8_data_cleaning",
+        # Executed into a scratch copy so the committed notebook keeps its outputs
+        "cmd": ["jupyter", "nbconvert", "--to", "notebook", "--execute",
+                "--output", ".pipeline_8_data_cleaning.ipynb", "8_data_cleaning.ipynb"],
+        "inputs": ["mustika_rasa_full_cleaned.jsonl", "food_index.csv", "8_data_cleaning.ipynb",
+                   "columnar_export.py", "ingredient_normalizer.py", "category_classifier.py",
+                   "fuzzy_index.py", "ejaan.py", "region_canonicalizer.py", "region_aliases.csv",
+                   "sqlite_export.py", "unit_normalizer.py", "unit_aliases.csv",
+                   "table_builder.py", "fragment_store.py"],
+        "outputs": ["df_recipes.csv", "df_ingredient_recipes.csv", "counts.csv",
+                    "df_recipes.parquet", "df_ingredient_recipes.parquet", "mustika_rasa.db"],
+    },
+]
+
+
+class Hasher:
+    """
+    Content hashes for files and folders, memoized on (size, mtime) in the
+    state file so unchanged files are never re-read.
+    """
+
+    def __init__(self, memo):
+        self.memo = memo
+        self.lock = threading.Lock()
+
+    def file_hash(self, path):
+        st = os.stat(path)
+        rel = os.path.relpath(path, BASE_DIR)
+        with self.lock:
+            entry = self.memo.get(rel)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self.lock:
+            self.memo[rel] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def path_hash(self, rel_path):
+        """Hash of a file, of a folder's visible files, or None if missing."""
+        path = os.path.join(BASE_DIR, rel_path)
+        if os.path.isfile(path):
+            return self.file_hash(path)
+        if os.path.isdir(path):
+            h = hashlib.sha256()
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if name.startswith(".") or not os.path.isfile(full):
+                    continue
+                h.update(f"{name}:{self.file_hash(full)}\n".encode("utf-8"))
+            return h.hexdigest()
+        return None
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"files": {}, "steps": {}}
+
+
+def save_state(state):
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def dependencies(steps):
+    """Maps each step name to the steps producing its inputs."""
+    producers = {out: s["name"] for s in steps for out in s["outputs"]}
+    return {
+        s["name"]: {producers[i] for i in s["inputs"] if i in producers and producers[i] != s["name"]}
+        for s in steps
+    }
+
+
+def upstream_closure(targets, deps):
+    """Targets plus everything they (transitively) depend on."""
+    selected, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(deps[name])
+    return selected
+
+
+def stale_reason(step, state, hasher):
+    """Returns why the step must run, or None if its recorded inputs still match."""
+    inputs = {i: hasher.path_hash(i) for i in step["inputs"]}
+    missing_inputs = [i for i, h in inputs.items() if h is None]
+    missing_outputs = [o for o in step["outputs"] if hasher.path_hash(o) is None]
+
+    if missing_inputs:
+        if not missing_outputs:
+            # Source not available here (e.g. the PDF), but the artifacts are: keep them
+            return None
+        return f"missing input {missing_inputs[0]}"
+    if missing_outputs:
+        return f"missing output {missing_outputs[0]}"
+
+    recorded = state["steps"].get(step["name"])
+    if not recorded:
+        return "never recorded"
+    for i, h in inputs.items():
+        if recorded["inputs"].get(i) != h:
+            return f"{i} changed"
+    return None
+
+
+def run_step(step):
+    """Runs one step as a subprocess, logging to .pipeline_logs/<name>.log."""
+    os.makedirs(LOG_FOLDER, exist_ok=True)
+    log_path = os.path.join(LOG_FOLDER, f"{step['name']}.log")
+    start = time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(step["cmd"], cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, time.monotonic() - start, log_path
+
+
+def run_pipeline(targets=None, force=(), jobs=4, dry_run=False, adopt=False):
+    state = load_state()
+    hasher = Hasher(state["files"])
+    state_lock = threading.Lock()
+    steps = {s["name"]: s for s in STEPS}
+    deps = dependencies(STEPS)
+    selected = upstream_closure(targets or list(steps), deps)
+
+    done, failed, timings = set(), set(), {}
+    running = {}
+    would_run = set()
+
+    def ready(name):
+        return deps[name] & selected <= done
+
+    def finish(name, step, input_hashes):
+        with state_lock:
+            state["steps"][name] = {
+                "inputs": input_hashes,
+                "outputs": {o: hasher.path_hash(o) for o in step["outputs"]},
+                "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            save_state(state)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(done) + len(failed) < len(selected):
+            blocked = {n for n in selected - done - failed - set(running) if deps[n] & failed}
+            failed |= blocked
+            for name in blocked:
+                print(f"⛔ {name}: skipped (upstream failed)")
+
+            for name in [s["name"] for s in STEPS]:
+                if name not in selected or name in done or name in failed or name in running:
+                    continue
+                if not ready(name):
+                    continue
+                step = steps[name]
+                reason = "forced" if name in force else stale_reason(step, state, hasher)
+                if reason is None and dry_run and deps[name] & would_run:
+                    reason = "upstream may change"
+                if reason is None:
+                    print(f"✅ {name}: up to date")
+                    done.add(name)
+                    continue
+                if adopt and all(hasher.path_hash(o) is not None for o in step["outputs"]):
+                    # Trust the artifacts already on disk and record them as built
+                    finish(name, step, {i: hasher.path_hash(i) for i in step["inputs"]})
+                    print(f"📌 {name}: adopted existing outputs")
+                    done.add(name)
+                    continue
+                if dry_run:
+                    print(f"🔸 {name}: would run ({reason})")
+                    would_run.add(name)
+                    done.add(name)
+                    continue
+                print(f"▶️  {name}: running ({reason})")
+                input_hashes = {i: hasher.path_hash(i) for i in step["inputs"]}
+                running[name] = (pool.submit(run_step, step), input_hashes)
+
+            if not running:
+                continue
+
+            finished, _ = wait([f for f, _ in running.values()], return_when=FIRST_COMPLETED)
+            for name in [n for n, (f, _) in running.items() if f in finished]:
+                future, input_hashes = running.pop(name)
+                returncode, elapsed, log_path = future.result()
+                timings[name] = elapsed
+                if returncode == 0:
+                    finish(name, steps[name], input_hashes)
+                    done.add(name)
+                    print(f"   ✔ {name} finished in {elapsed:.1f}s")
+                else:
+                    failed.add(name)
+                    print(f"   ❌ {name} failed after {elapsed:.1f}s (exit {returncode}), see {log_path}")
+
+    with state_lock:
+        save_state(state)
+
+    if timings:
+        print("\n--- Step wall time ---")
+        for name in [s["name"] for s in STEPS if s["name"] in timings]:
+            print(f"{name:<18} {timings[name]:8.1f}s")
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental runner for the numbered dataset pipeline.")
+    parser.add_argument("targets", nargs="*", help="Steps to bring up to date (default: all)")
+    parser.add_argument("--force", nargs="*", default=[], help="Steps to rerun even if up to date")
+    parser.add_argument("--jobs", type=int, default=4, help="Independent steps run in parallel")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what is stale")
+    parser.add_argument("--adopt", action="store_true",
+                        help="Record existing outputs as up to date instead of rebuilding them")
+    args = parser.parse_args()
+
+    unknown = [t for t in args.targets + args.force if t not in {s["name"] for s in STEPS}]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)}")
+
+    ok = run_pipeline(args.targets, set(args.force), args.jobs, args.dry_run, args.adopt)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,398 @@
+import os
+import re
+import json
+import time
+import argparse
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_FOLDER = os.path.join(BASE_DIR, "json_output1_recipes_detail")
+
+DEFAULT_GROUP_NAME = "utama"
+_NONE = type(None)
+
+# --- SCHEMA (the REQUIRED JSON FORMAT of the detail-page SYSTEM_PROMPT) ---
+# dict = object with these required keys (extra keys are allowed),
+# [spec] = list of spec, tuple = allowed scalar types.
+INGREDIENT_SPEC = {
+    "original_text": (str,),
+    "item_original": (str,),
+    "item_normalized": (str,),
+    "quantity": (float, _NONE),
+    "unit": (str, _NONE),
+}
+GROUP_SPEC = {
+    "group_name": (str,),
+    "original_header": (str, _NONE),
+    "ingredients": [INGREDIENT_SPEC],
+}
+RECIPE_SPEC = {
+    "recipe_id": (str,),
+    "title_original": (str, _NONE),
+    "title_normalized": (str,),
+    "region": (str, _NONE),
+    "page_number": (int,),
+    "category": (str, _NONE),
+    "ingredient_groups": [GROUP_SPEC],
+    "instructions": [(str,)],
+}
+PAGE_SPEC = [RECIPE_SPEC]
+
+
+class SchemaError(ValueError):
+    """A page answer that cannot be repaired locally; the page has to be re-sent."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        shown = "; ".join(errors[:3]) + (f" (+{len(errors) - 3} more)" if len(errors) > 3 else "")
+        super().__init__(f"Invalid page JSON: {shown}")
+
+
+def _compile(spec):
+    """
+    Turns a spec into a nested closure check(value, path, errors). The spec is
+    walked once here, so validating a page is plain isinstance calls.
+    """
+    if isinstance(spec, dict):
+        fields = [(key, _compile(sub)) for key, sub in spec.items()]
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected object, got {type(value).__name__}")
+                return
+            for key, check in fields:
+                if key not in value:
+                    errors.append(f"{path}.{key}: missing")
+                else:
+                    check(value[key], f"{path}.{key}", errors)
+        return check_object
+
+    if isinstance(spec, list):
+        check_item = _compile(spec[0])
+
+        def check_list(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected list, got {type(value).__name__}")
+                return
+            for i, item in enumerate(value):
+                check_item(item, f"{path}[{i}]", errors)
+        return check_list
+
+    allowed = spec
+
+    def check_scalar(value, path, errors):
+        # bool is an int subclass but never a valid page number or quantity
+        if isinstance(value, bool) or not isinstance(value, allowed):
+            names = "/".join("null" if t is _NONE else t.__name__ for t in allowed)
+            errors.append(f"{path}: expected {names}, got {type(value).__name__}")
+    return check_scalar
+
+
+_check_page = _compile(PAGE_SPEC)
+
+
+def validate_page(data):
+    """List of schema violations ("$[0].ingredient_groups: missing", ...); empty when valid."""
+    errors = []
+    _check_page(data, "$", errors)
+    return errors
+
+
+# --- REPAIR ---
+
+def clean_json_string(text):
+    text = text.replace("```json", "").replace("```", "")
+    return text.strip()
+
+
+def recover_truncated(text):
+    """
+    The JSON array in a broken answer cut back to its last complete top-level
+    element and closed with ']' (covers cut-off answers, trailing commas and
+    text after the array). Returns (text, kept elements) or (None, 0) when not
+    even the first element is complete.
+    """
+    start = text.find("[")
+    if start < 0:
+        return None, 0
+    depth = 0
+    in_string = escaped = False
+    last_end, complete = None, 0
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+            if depth == 1:
+                last_end, complete = i + 1, complete + 1
+            elif depth == 0:
+                break
+    if last_end is None:
+        return None, 0
+    return text[start:last_end] + "]", complete
+
+
+_FRACTION_RE = re.compile(r"^(?:(\d+)\s+)?(\d+)\s*/\s*(\d+)$")
+_RANGE_RE = re.compile(r"^(\d+(?:[.,]\d+)?)\s*(?:-|–|s/d|sampai)\s*(\d+(?:[.,]\d+)?)$")
+
+
+def coerce_quantity(value):
+    """
+    Quantity -> (float or None, range end or None, ok). Accepts numbers,
+    '1,5', '1/2', '1 1/2' and ranges like '1.0-2.0' (lower bound + end).
+    """
+    if value is None:
+        return None, None, True
+    if isinstance(value, bool):
+        return None, None, False
+    if isinstance(value, (int, float)):
+        return (float(value) if value == value else None), None, True
+    if not isinstance(value, str):
+        return None, None, False
+
+    text = value.strip().lower()
+    if not text:
+        return None, None, True
+    try:
+        return float(text.replace(",", ".")), None, True
+    except ValueError:
+        pass
+    match = _FRACTION_RE.match(text)
+    if match and int(match.group(3)):
+        whole, num, den = match.groups()
+        return int(whole or 0) + int(num) / int(den), None, True
+    match = _RANGE_RE.match(text)
+    if match:
+        low, high = (float(g.replace(",", ".")) for g in match.groups())
+        return low, high, True
+    return None, None, False
+
+
+def _text_or_none(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _repair_ingredient(item, path, notes):
+    """The repaired ingredient, or None when it has to be dropped."""
+    if isinstance(item, str) and item.strip():
+        item = {"original_text": item, "item_original": item, "item_normalized": item}
+        notes.append(f"{path}: string ingredient wrapped")
+    if not isinstance(item, dict):
+        notes.append(f"{path}: dropped {type(item).__name__} ingredient")
+        return None
+
+    item = dict(item)
+    names = [item.get(k) for k in ("item_normalized", "item_original", "original_text")]
+    name = next((n.strip() for n in names if isinstance(n, str) and n.strip()), None)
+    if name is None:
+        notes.append(f"{path}: dropped ingredient without a name")
+        return None
+    for key in ("original_text", "item_original", "item_normalized"):
+        if not isinstance(item.get(key), str) or not item[key].strip():
+            item[key] = name
+            notes.append(f"{path}.{key}: filled from '{name}'")
+
+    quantity, quantity_end, ok = coerce_quantity(item.get("quantity"))
+    if not ok:
+        notes.append(f"{path}.quantity: {item.get('quantity')!r} is not a number, set to null")
+    elif quantity_end is not None:
+        item["quantity_end"] = quantity_end
+        notes.append(f"{path}.quantity: range {item['quantity']!r} split")
+    elif not isinstance(item.get("quantity"), (float, _NONE)):
+        notes.append(f"{path}.quantity: {item.get('quantity')!r} coerced")
+    item["quantity"] = quantity
+
+    unit = item.get("unit")
+    if unit == "" or not isinstance(unit, (str, _NONE)):
+        notes.append(f"{path}.unit: {unit!r} set to null")
+        unit = None
+    item["unit"] = unit
+    return item
+
+
+def _repair_group(group, path, notes):
+    if isinstance(group, list):
+        group = {"ingredients": group}
+        notes.append(f"{path}: bare ingredient list wrapped in a group")
+    if not isinstance(group, dict):
+        notes.append(f"{path}: dropped {type(group).__name__} group")
+        return None
+
+    group = dict(group)
+    if not isinstance(group.get("group_name"), str) or not group["group_name"].strip():
+        group["group_name"] = DEFAULT_GROUP_NAME
+        notes.append(f"{path}.group_name: set to '{DEFAULT_GROUP_NAME}'")
+    if not isinstance(group.get("original_header"), (str, _NONE)):
+        group["original_header"] = _text_or_none(group["original_header"])
+    group.setdefault("original_header", None)
+
+    items = group.get("ingredients")
+    if items is None:
+        items = []
+    elif not isinstance(items, list):
+        notes.append(f"{path}.ingredients: dropped {type(items).__name__}")
+        items = []
+    repaired = (_repair_ingredient(item, f"{path}.ingredients[{i}]", notes) for i, item in enumerate(items))
+    group["ingredients"] = [item for item in repaired if item is not None]
+    return group
+
+
+def _repair_recipe(recipe, path, notes, page_num):
+    if not isinstance(recipe, dict):
+        return recipe          # left to the validator: not repairable
+    recipe = dict(recipe)
+
+    page = recipe.get("page_number")
+    if isinstance(page, str) and page.strip().isdigit():
+        recipe["page_number"] = int(page)
+        notes.append(f"{path}.page_number: coerced from string")
+    elif isinstance(page, float) and page.is_integer():
+        recipe["page_number"] = int(page)
+    elif page is None and page_num is not None:
+        recipe["page_number"] = page_num
+        notes.append(f"{path}.page_number: set to {page_num}")
+
+    for key in ("title_original", "region", "category"):
+        if key not in recipe or not isinstance(recipe[key], (str, _NONE)) or recipe[key] == "":
+            recipe[key] = _text_or_none(recipe.get(key))
+    if recipe.get("title_normalized") is None and isinstance(recipe.get("title_original"), str):
+        recipe["title_normalized"] = recipe["title_original"].title()
+        notes.append(f"{path}.title_normalized: filled from title_original")
+
+    steps = recipe.get("instructions")
+    if steps is None:
+        recipe["instructions"] = []
+        notes.append(f"{path}.instructions: null set to []")
+    elif isinstance(steps, str):
+        recipe["instructions"] = [steps]
+        notes.append(f"{path}.instructions: string wrapped in a list")
+    elif isinstance(steps, list):
+        recipe["instructions"] = [str(s) for s in steps if s is not None and str(s).strip()]
+
+    # A missing ingredient_groups key is left to the validator: the model
+    # skipped a section we cannot rebuild locally.
+    groups = recipe.get("ingredient_groups")
+    if isinstance(groups, dict):
+        groups = [groups]
+        notes.append(f"{path}.ingredient_groups: single group wrapped in a list")
+    if isinstance(groups, list):
+        repaired = (_repair_group(g, f"{path}.ingredient_groups[{i}]", notes) for i, g in enumerate(groups))
+        recipe["ingredient_groups"] = [g for g in repaired if g is not None]
+    return recipe
+
+
+def repair_page(data, page_num=None):
+    """
+    Best-effort local fixes (type coercion, defaults, dropping invalid
+    ingredients), then validation. Returns (page, notes); raises SchemaError
+    when the page is still invalid.
+    """
+    notes = []
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        if "recipe_id" in data:
+            data = [data]
+            notes.append("$: single recipe wrapped in a list")
+        elif len(lists) == 1:
+            data = lists[0]
+            notes.append("$: recipe list unwrapped from an object")
+    if isinstance(data, list):
+        data = [_repair_recipe(r, f"$[{i}]", notes, page_num) for i, r in enumerate(data)]
+
+    errors = validate_page(data)
+    if errors:
+        raise SchemaError(errors)
+    return data, notes
+
+
+def parse_page(text, page_num=None):
+    """
+    Model answer text -> (recipes, notes). Code fences are stripped, a
+    truncated array is cut back to its last complete recipe, and the result is
+    repaired and validated. Raises SchemaError when the page must be re-sent.
+    """
+    cleaned = clean_json_string(text)
+    notes = []
+    try:
+        data = json.loads(cleaned)
+    except json.JSONDecodeError as e:
+        recovered, kept = recover_truncated(cleaned)
+        if recovered is None:
+            raise SchemaError([f"$: not JSON ({e.msg} at char {e.pos}) and no complete recipe to recover"])
+        try:
+            data = json.loads(recovered)
+        except json.JSONDecodeError as e2:
+            raise SchemaError([f"$: not JSON ({e2.msg} at char {e2.pos})"])
+        notes.append(f"$: broken JSON ({e.msg}), kept {kept} complete recipes")
+    data, repair_notes = repair_page(data, page_num)
+    return data, notes + repair_notes
+
+
+def check_saved_page(path, page_num=None):
+    """
+    'ok', 'repaired' (rewritten in place) or 'invalid' for an existing page
+    JSON, so reruns only re-send pages that cannot be fixed locally.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        data, notes = parse_page(text, page_num)
+    except (OSError, SchemaError):
+        return "invalid"
+    if not notes:
+        return "ok"
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return "repaired"
+
+
+def page_number_from_name(filename):
+    match = re.search(r"page_(\d+)", filename)
+    return int(match.group(1)) if match else None
+
+
+def main(folder=OUTPUT_FOLDER, verbose=False):
+    files = sorted(f for f in os.listdir(folder) if f.endswith(".json"))
+    counts = {"ok": 0, "repaired": 0, "invalid": 0}
+    start = time.perf_counter()
+    for filename in files:
+        path = os.path.join(folder, filename)
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            _, notes = parse_page(text, page_number_from_name(filename))
+        except SchemaError as e:
+            counts["invalid"] += 1
+            print(f"❌ {filename}: {e}")
+            continue
+        counts["repaired" if notes else "ok"] += 1
+        if notes and verbose:
+            print(f"🩹 {filename}: " + "; ".join(notes))
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(files)} pages checked in {elapsed * 1000:.0f} ms: "
+          f"{counts['ok']} valid, {counts['repaired']} repairable, {counts['invalid']} need a re-send")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate (and dry-run repair) the detail-page JSON files.")
+    parser.add_argument("--folder", default=OUTPUT_FOLDER)
+    parser.add_argument("-v", "--verbose", action="store_true", help="List the repairs per page")
+    args = parser.parse_args()
+
+    main(args.folder, args.verbose)
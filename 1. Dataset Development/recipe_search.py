@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import argparse
+from collections import Counter
+import numpy as np
+import pandas as pd
+from ejaan import fold
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECIPES_CSV = os.path.join(BASE_DIR, "df_recipes.csv")
+INDEX_DIR = os.path.join(BASE_DIR, "search_index")
+
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 3      # a title token counts as this many instruction tokens
+TOP_K = 10
+
+POSTING_DTYPE = np.dtype([("doc", "<u4"), ("tf", "<u2")])
+
+
+def tokenize(text):
+    """Index terms: ejaan lama folded to modern spelling, accents and punctuation dropped."""
+    return fold(text, drop_parens=False).split()
+
+
+def document_terms(title_original, title_normalized, instruction):
+    """Term frequencies of one recipe; title tokens are boosted."""
+    tf = Counter()
+    titles = set(tokenize(title_original)) | set(tokenize(title_normalized))
+    for term in titles:
+        tf[term] += TITLE_BOOST
+    tf.update(tokenize(instruction))
+    return tf
+
+
+class SearchIndex:
+    """
+    BM25 over recipe titles and instructions.
+
+    On disk (INDEX_DIR):
+      postings.bin - every term's postings back to back, (doc uint32, tf uint16) records
+      doc_len.npy  - document lengths in (boosted) tokens
+      meta.json    - recipe ids, titles, and term -> [offset, count] in postings.bin
+    postings.bin and doc_len.npy are memory-mapped; a query reads only the
+    slices of its own terms.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.recipe_ids = meta["recipe_ids"]
+        self.titles = meta["titles"]
+        self.terms = meta["terms"]
+        self.k1, self.b = meta["k1"], meta["b"]
+        self.doc_len = np.load(os.path.join(index_dir, "doc_len.npy"), mmap_mode="r")
+        self.avgdl = float(meta["avgdl"]) or 1.0
+        postings_path = os.path.join(index_dir, "postings.bin")
+        if os.path.getsize(postings_path):
+            self.postings = np.memmap(postings_path, dtype=POSTING_DTYPE, mode="r")
+        else:
+            self.postings = np.zeros(0, dtype=POSTING_DTYPE)
+
+    def postings_for(self, term):
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, count = entry
+        return self.postings[offset:offset + count]
+
+    def search(self, query, k=TOP_K):
+        """Top-k [(recipe_id, score, title)] for a free-text query."""
+        n_docs = len(self.recipe_ids)
+        scores = np.zeros(n_docs, dtype=np.float64)
+        norm = self.k1 * (1 - self.b + self.b * np.asarray(self.doc_len) / self.avgdl)
+        for term in set(tokenize(query)):
+            postings = self.postings_for(term)
+            if postings is None:
+                continue
+            docs = postings["doc"].astype(np.int64)
+            tf = postings["tf"].astype(np.float64)
+            idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm[docs])
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.lexsort((hits, -scores[hits]))]
+        return [(self.recipe_ids[i], float(scores[i]), self.titles[i]) for i in hits]
+
+
+def build_index(df_recipes, index_dir=INDEX_DIR):
+    """Tokenizes every recipe once and writes the postings file and metadata."""
+    os.makedirs(index_dir, exist_ok=True)
+    recipe_ids = df_recipes["id"].tolist()
+    titles = df_recipes["title_normalized"].fillna(df_recipes["title_original"]).fillna("").tolist()
+
+    postings = {}
+    doc_len = np.zeros(len(recipe_ids), dtype=np.uint32)
+    columns = zip(df_recipes["title_original"], df_recipes["title_normalized"], df_recipes["instruction"])
+    for doc, (title_original, title_normalized, instruction) in enumerate(columns):
+        tf = document_terms(title_original, title_normalized, instruction)
+        doc_len[doc] = sum(tf.values())
+        for term, count in tf.items():
+            postings.setdefault(term, []).append((doc, min(count, 0xFFFF)))
+
+    terms, offset = {}, 0
+    tmp_path = os.path.join(index_dir, "postings.bin.tmp")
+    with open(tmp_path, "wb") as f:
+        for term in sorted(postings):
+            records = np.array(postings[term], dtype=POSTING_DTYPE)
+            f.write(records.tobytes())
+            terms[term] = [offset, len(records)]
+            offset += len(records)
+    os.replace(tmp_path, os.path.join(index_dir, "postings.bin"))
+    np.save(os.path.join(index_dir, "doc_len.npy"), doc_len)
+
+    meta = {
+        "recipe_ids": recipe_ids,
+        "titles": titles,
+        "terms": terms,
+        "k1": K1,
+        "b": B,
+        "avgdl": float(doc_len.mean()) if len(doc_len) else 0.0,
+    }
+    tmp_path = os.path.join(index_dir, "meta.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(index_dir, "meta.json"))
+    return len(terms), offset
+
+
+def main_build(recipes_csv=RECIPES_CSV):
+    start = time.perf_counter()
+    df_recipes = pd.read_csv(recipes_csv)
+    n_terms, n_postings = build_index(df_recipes)
+    print(f"📚 {len(df_recipes)} recipes, {n_terms} terms, {n_postings} postings "
+          f"in {time.perf_counter() - start:.2f}s -> {INDEX_DIR}")
+
+
+def main_search(query, k=TOP_K):
+    start = time.perf_counter()
+    index = SearchIndex()
+    results = index.search(query, k)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"🔎 '{query}' -> terms {tokenize(query)} | {len(results)} results in {elapsed:.1f} ms (incl. load)")
+    for recipe_id, score, title in results:
+        print(f"{score:7.3f}  {recipe_id:<12} {title}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BM25 search over recipe titles and instructions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Build the index from df_recipes.csv")
+    p_search = sub.add_parser("search", help="Ranked search; old and new spellings match each other")
+    p_search.add_argument("query")
+    p_search.add_argument("-k", type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        main_build()
+    else:
+        main_search(args.query, args.k)
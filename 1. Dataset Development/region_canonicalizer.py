@@ -0,0 +1,147 @@
+import os
+import csv
+import json
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from ejaan import fold
+from fuzzy_index import NgramIndex
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ALIAS_TABLE = os.path.join(BASE_DIR, "region_aliases.csv")
+CACHE_FILE = os.path.join(BASE_DIR, ".region_cache.json")
+REGION_COUNTS = os.path.join(BASE_DIR, "region.csv")
+MATCH_THRESHOLD = 0.85
+UNKNOWN_PROVINCE = "Unknown"
+
+
+def load_aliases(path=ALIAS_TABLE):
+    """alias -> (region_clean, province_group), in file order."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return {row['alias']: (row['region_clean'], row['province_group']) for row in csv.DictReader(f)}
+
+
+class RegionCanonicalizer:
+    """
+    Raw region text -> (region_clean, province_group).
+
+    Lookup order: exact alias, old-spelling folded alias, then the trigram
+    index over the folded aliases (accepted at >= threshold). Anything else
+    keeps its raw text with an 'Unknown' province, as region_map.get did.
+    Decisions are cached on disk per raw value; the cache is dropped when the
+    alias table or the threshold changes.
+    """
+
+    def __init__(self, alias_path=ALIAS_TABLE, cache_path=CACHE_FILE, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.cache_path = cache_path
+        self.aliases = load_aliases(alias_path)
+        self.alias_names = list(self.aliases)
+        self.index = NgramIndex(self.alias_names)
+        self.folded = {}
+        for name, key in zip(self.alias_names, self.index.keys):
+            self.folded.setdefault(key, name)
+
+        with open(alias_path, 'rb') as f:
+            self.signature = hashlib.sha1(f.read() + str(threshold).encode()).hexdigest()
+        self.cache = self._load_cache()
+        self._dirty = False
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if data.get('signature') != self.signature:
+            return {}
+        return data.get('decisions', {})
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'signature': self.signature, 'decisions': self.cache}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def decide(self, raw):
+        """Full decision for one raw string: region_clean, province_group, method, alias, score."""
+        if raw in self.aliases:
+            clean, province = self.aliases[raw]
+            return {'region_clean': clean, 'province_group': province, 'method': 'exact', 'alias': raw, 'score': 1.0}
+
+        key = fold(raw)
+        if key in self.folded:
+            alias = self.folded[key]
+            clean, province = self.aliases[alias]
+            return {'region_clean': clean, 'province_group': province, 'method': 'folded', 'alias': alias, 'score': 1.0}
+
+        i, score = self.index.match(raw, self.threshold)
+        if i is not None:
+            alias = self.alias_names[i]
+            clean, province = self.aliases[alias]
+            return {'region_clean': clean, 'province_group': province, 'method': 'fuzzy', 'alias': alias,
+                    'score': round(float(score), 4)}
+
+        return {'region_clean': raw, 'province_group': UNKNOWN_PROVINCE, 'method': 'unknown', 'alias': None,
+                'score': round(float(score), 4)}
+
+    def resolve(self, raw):
+        """(region_clean, province_group) for one value; non-strings map to (raw, 'Unknown')."""
+        if not isinstance(raw, str):
+            return raw, UNKNOWN_PROVINCE
+        decision = self.cache.get(raw)
+        if decision is None:
+            decision = self.decide(raw)
+            self.cache[raw] = decision
+            self._dirty = True
+        return decision['region_clean'], decision['province_group']
+
+    def canonicalize_series(self, series):
+        """
+        DataFrame [region_clean, province_group] aligned with `series`.
+        Each distinct value is resolved once, and the cache is saved afterwards.
+        """
+        codes, uniques = pd.factorize(series)
+        resolved = [self.resolve(u) for u in uniques] + [(np.nan, UNKNOWN_PROVINCE)]
+        clean = np.array([r[0] for r in resolved], dtype=object)[codes]
+        province = np.array([r[1] for r in resolved], dtype=object)[codes]
+        self.save()
+        return pd.DataFrame({'region_clean': clean, 'province_group': province}, index=series.index)
+
+    def decisions(self, values):
+        """Review table of how each value was resolved."""
+        rows = []
+        for raw in values:
+            if isinstance(raw, str):
+                self.resolve(raw)
+                rows.append({'region': raw, **self.cache[raw]})
+        self.save()
+        return pd.DataFrame(rows)
+
+
+def main(region_csv=REGION_COUNTS, show_all=False):
+    canonicalizer = RegionCanonicalizer()
+    regions = pd.read_csv(region_csv)['region']
+    table = canonicalizer.decisions(regions)
+
+    print(f"🗺️ {len(table)} region values, {len(canonicalizer.aliases)} aliases")
+    print(table['method'].value_counts().to_string())
+    review = table if show_all else table[table['method'].isin(['fuzzy', 'unknown'])]
+    if len(review):
+        print(review.to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve region values against the alias table.")
+    parser.add_argument("--input", default=REGION_COUNTS, help="CSV with a 'region' column")
+    parser.add_argument("--all", action="store_true", help="Show every decision, not only fuzzy/unknown ones")
+    args = parser.parse_args()
+
+    main(args.input, args.all)
@@ -0,0 +1,143 @@
+import os
+import time
+import hashlib
+import threading
+
+# --- DEFAULTS ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, ".response_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+INDEX_NAME = "index.tsv"
+
+
+def cache_key(image_bytes, prompt, model_id):
+    """Content address of one model call: hash(model id, rendered prompt, image bytes)."""
+    h = hashlib.sha256()
+    h.update(model_id.encode("utf-8"))
+    h.update(b"\0")
+    h.update(prompt.encode("utf-8"))
+    h.update(b"\0")
+    h.update(image_bytes)
+    return h.hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded cache of raw model responses.
+    - Entries live in <cache_dir>/<key[:2]>/<key>.txt
+    - index.tsv holds one "key<TAB>size<TAB>last_used" line per entry
+    - Least recently used entries are evicted once max_bytes is exceeded
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_NAME)
+        self.entries = {}          # key -> [size, last_used]
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    # --- index ---
+    def _load_index(self):
+        """
+        The entry files are the source of truth; index.tsv only supplies
+        last-used times. Files a run wrote without reaching flush are picked
+        up with their mtime, so they can be hit and evicted like the rest.
+        """
+        last_used = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) == 3:
+                        last_used[parts[0]] = float(parts[2])
+        self._scan_entries(last_used)
+
+    def _scan_entries(self, last_used):
+        for sub in os.listdir(self.cache_dir):
+            sub_dir = os.path.join(self.cache_dir, sub)
+            if not os.path.isdir(sub_dir):
+                continue
+            for name in os.listdir(sub_dir):
+                if name.endswith(".txt"):
+                    key = name[:-4]
+                    st = os.stat(os.path.join(sub_dir, name))
+                    self.entries[key] = [st.st_size, last_used.get(key, st.st_mtime)]
+        self.total_bytes = sum(size for size, _ in self.entries.values())
+
+    def flush(self):
+        """Rewrites the index atomically. Call once at the end of a run."""
+        with self.lock:
+            lines = [f"{k}\t{size}\t{used:.6f}\n" for k, (size, used) in self.entries.items()]
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, self.index_path)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".txt")
+
+    # --- lookups ---
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            entry[1] = time.time()
+            self.stats["hits"] += 1
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted by another worker between the lookup and the read
+            with self.lock:
+                self.stats["hits"] -= 1
+                self.stats["misses"] += 1
+            return None
+
+    def put(self, key, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        with self.lock:
+            old = self.entries.get(key)
+            if old:
+                self.total_bytes -= old[0]
+            self.entries[key] = [size, time.time()]
+            self.total_bytes += size
+            evicted = self._evict()
+        for k in evicted:
+            try:
+                os.remove(self._path(k))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drops least recently used entries until under budget (lock held)."""
+        if self.total_bytes <= self.max_bytes:
+            return []
+        evicted = []
+        for key, (size, _) in sorted(self.entries.items(), key=lambda kv: kv[1][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            del self.entries[key]
+            self.total_bytes -= size
+            self.stats["evictions"] += 1
+            evicted.append(key)
+        return evicted
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups * 100 if lookups else 0.0
+        return (f"cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({hit_rate:.0f}% hit rate), {self.stats['evictions']} evictions, "
+                f"{len(self.entries)} entries / {self.total_bytes / 1e6:.1f} MB")
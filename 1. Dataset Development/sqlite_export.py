@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import pandas as pd
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECIPES_CSV = os.path.join(BASE_DIR, "df_recipes.csv")
+INGREDIENTS_CSV = os.path.join(BASE_DIR, "df_ingredient_recipes.csv")
+DB_FILE = os.path.join(BASE_DIR, "mustika_rasa.db")
+
+RECIPE_COLUMNS = [
+    "recipe_id", "title_original", "title_normalized", "source_page", "region", "ai_category",
+    "region_clean", "province_group", "category", "ingredient_json", "instruction",
+]
+INGREDIENT_COLUMNS = [
+    "recipe_id", "position", "ingredient_group", "ingredient_original_name",
+    "ingredient_normalized_name", "ingredient_quantity", "ingredient_unit",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    recipe_id TEXT PRIMARY KEY,
+    title_original TEXT,
+    title_normalized TEXT,
+    source_page INTEGER,
+    region TEXT,
+    ai_category TEXT,
+    region_clean TEXT,
+    province_group TEXT,
+    category TEXT,
+    ingredient_json TEXT,
+    instruction TEXT,
+    row_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    recipe_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    ingredient_group TEXT,
+    ingredient_original_name TEXT,
+    ingredient_normalized_name TEXT,
+    ingredient_quantity REAL,
+    ingredient_unit TEXT,
+    PRIMARY KEY (recipe_id, position)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+    recipe_id UNINDEXED, title, instruction, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# Created after the rows are in, so a first load doesn't maintain them row by row.
+# (name, recipe_id) covers "which recipes use X" without touching the table.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_ingredients_name ON ingredients (ingredient_normalized_name, recipe_id);
+CREATE INDEX IF NOT EXISTS idx_recipes_province ON recipes (province_group, recipe_id);
+CREATE INDEX IF NOT EXISTS idx_recipes_category ON recipes (category, recipe_id);
+"""
+# ingredients.recipe_id is the leading column of its primary key, so it needs no extra index.
+
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+]
+
+
+def _clean(value):
+    """pandas NaN/NA -> None, numpy scalars -> Python, for sqlite3."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def recipe_rows(df_recipes):
+    df = df_recipes.rename(columns={"id": "recipe_id"})
+    df = df.reindex(columns=RECIPE_COLUMNS)
+    return {row[0]: tuple(_clean(v) for v in row) for row in df.itertuples(index=False, name=None)}
+
+
+def ingredient_rows(df_ingredients):
+    """recipe_id -> [row tuples]; rows are keyed by their position within the recipe."""
+    df = df_ingredients.assign(position=df_ingredients.groupby("recipe_id", sort=False).cumcount())
+    df = df.reindex(columns=INGREDIENT_COLUMNS)
+    grouped = {}
+    for row in df.itertuples(index=False, name=None):
+        grouped.setdefault(row[0], []).append(tuple(_clean(v) for v in row))
+    return grouped
+
+
+def row_hash(recipe, ingredients):
+    payload = json.dumps([recipe, ingredients], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def connect(db_path=DB_FILE):
+    conn = sqlite3.connect(db_path)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def export_sqlite(df_recipes, df_ingredients, db_path=DB_FILE):
+    """
+    Incremental export keyed on recipe_id: a recipe (with its ingredient rows
+    and FTS entry) is rewritten only if its content hash changed, and recipes
+    no longer in the table are deleted. Everything runs in one transaction
+    with executemany. Returns counts of inserted/updated/deleted/unchanged
+    recipes, and of ingredient rows skipped because their recipe_id is not
+    in the recipes table.
+    """
+    recipes = recipe_rows(df_recipes)
+    ingredients = ingredient_rows(df_ingredients)
+    orphans = [rid for rid in ingredients if rid not in recipes]
+    skipped = sum(len(ingredients[rid]) for rid in orphans)
+    hashes = {rid: row_hash(row, ingredients.get(rid, [])) for rid, row in recipes.items()}
+
+    conn = connect(db_path)
+    try:
+        stored = dict(conn.execute("SELECT recipe_id, row_hash FROM recipes"))
+        changed = [rid for rid, h in hashes.items() if stored.get(rid) != h]
+        removed = [rid for rid in stored if rid not in hashes]
+        stale = [(rid,) for rid in changed if rid in stored] + [(rid,) for rid in removed]
+
+        with conn:
+            conn.executemany("DELETE FROM ingredients WHERE recipe_id = ?", stale)
+            conn.executemany("DELETE FROM recipes_fts WHERE recipe_id = ?", stale)
+            conn.executemany("DELETE FROM recipes WHERE recipe_id = ?", [(rid,) for rid in removed])
+
+            placeholders = ", ".join("?" * (len(RECIPE_COLUMNS) + 1))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO recipes ({', '.join(RECIPE_COLUMNS)}, row_hash) VALUES ({placeholders})",
+                (recipes[rid] + (hashes[rid],) for rid in changed),
+            )
+            conn.executemany(
+                f"INSERT INTO ingredients ({', '.join(INGREDIENT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(INGREDIENT_COLUMNS))})",
+                (row for rid in changed for row in ingredients.get(rid, [])),
+            )
+            title_at = RECIPE_COLUMNS.index("title_original")
+            norm_at = RECIPE_COLUMNS.index("title_normalized")
+            instr_at = RECIPE_COLUMNS.index("instruction")
+            conn.executemany(
+                "INSERT INTO recipes_fts (recipe_id, title, instruction) VALUES (?, ?, ?)",
+                ((rid,
+                  " / ".join(t for t in (recipes[rid][title_at], recipes[rid][norm_at]) if t),
+                  recipes[rid][instr_at] or "")
+                 for rid in changed),
+            )
+            conn.executescript(INDEXES)
+
+        if changed or removed:
+            conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    inserted = sum(1 for rid in changed if rid not in stored)
+    return {
+        "inserted": inserted,
+        "updated": len(changed) - inserted,
+        "deleted": len(removed),
+        "unchanged": len(hashes) - len(changed),
+        "skipped_ingredients": skipped,
+        "skipped_recipe_ids": len(orphans),
+    }
+
+
+def main(db_path=DB_FILE):
+    if not os.path.exists(RECIPES_CSV) or not os.path.exists(INGREDIENTS_CSV):
+        print("❌ CSV tables not found. Run 8_data_cleaning.ipynb first.")
+        return
+    start = time.perf_counter()
+    stats = export_sqlite(pd.read_csv(RECIPES_CSV), pd.read_csv(INGREDIENTS_CSV), db_path)
+    print(f"🗄️ {db_path}: {stats['inserted']} inserted, {stats['updated']} updated, "
+          f"{stats['deleted']} deleted, {stats['unchanged']} unchanged "
+          f"in {time.perf_counter() - start:.2f}s")
+    if stats["skipped_ingredients"]:
+        print(f"⚠️ {stats['skipped_ingredients']} ingredient rows skipped: "
+              f"{stats['skipped_recipe_ids']} recipe_ids are not in {os.path.basename(RECIPES_CSV)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the step 8 tables to SQLite (FTS5, incremental).")
+    parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args()
+
+    main(args.db)
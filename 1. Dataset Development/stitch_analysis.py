@@ -0,0 +1,111 @@
+import re
+import numpy as np
+import pandas as pd
+from fragment_store import FragmentStore
+
+# --- HEURISTICS (same defaults as the exploration notebook) ---
+FRAGMENT_KEYWORDS = ["continu", "lanjut", "sambung", "untitled", "inferr", "previous"]
+INCOMPLETE_MARKERS = ["incomplete", "missing"]
+MAX_PAGE_GAP = 1
+
+REPORT_COLUMNS = ["Head_ID", "Head_Title", "Tail_ID", "Tail_Title", "Reason", "Page_Gap"]
+
+
+def _contains_any(series, words):
+    pattern = "|".join(re.escape(w) for w in words)
+    return series.str.contains(pattern, regex=True)
+
+
+def build_fragment_table(fragments, keywords=FRAGMENT_KEYWORDS, incomplete_markers=INCOMPLETE_MARKERS):
+    """
+    Columnar view of the fragment stream, one row per fragment in store order:
+    recipe_id, title, page, n_instructions, is_fragment_title, is_incomplete.
+    Flags are computed with vectorized string ops over whole columns.
+    """
+    rows = [
+        (
+            f.get('recipe_id'),
+            f.get('title_normalized'),
+            f.get('title_original'),
+            f.get('_source_page'),
+            len(f.get('instructions') or []),
+            " ".join(f.get('instructions') or []),
+        )
+        for f in fragments
+    ]
+    table = pd.DataFrame(rows, columns=[
+        "recipe_id", "title", "title_original", "page", "n_instructions", "instruction_text"
+    ])
+
+    title_orig = table["title_original"].fillna("").str.lower()
+    title_norm = table["title"].fillna("").str.lower()
+    table["is_fragment_title"] = _contains_any(title_orig, keywords) | _contains_any(title_norm, keywords)
+    table["is_incomplete"] = (
+        (table["n_instructions"] == 0)
+        | _contains_any(table["instruction_text"].str.lower(), incomplete_markers)
+    )
+    return table.drop(columns=["title_original", "instruction_text"])
+
+
+def _last_head(values, heads):
+    """For every row, the value at the closest head strictly before it (NaN if none)."""
+    return values.where(heads).shift(1).ffill()
+
+
+def stitch_candidates(table, max_page_gap=MAX_PAGE_GAP):
+    """
+    Vectorized equivalent of the notebook's analyze_stitching loop.
+
+    The loop keeps a 'buffer' that only moves to fragments that are NOT merged,
+    so the head of a tail is the closest preceding non-merged fragment. A
+    fragment merges when its title is a fragment title and it is within
+    max_page_gap pages of that head.
+
+    Heads start as every non-keyword fragment (plus the first row). Each round
+    compares keyword rows with the page of their head using shifted columns, and
+    promotes the first non-adjacent keyword row of each run to a head. Rows
+    after it then compare against it in the next round. Rounds are bounded by
+    the longest keyword run, which is one or two in practice.
+    """
+    if table.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    page = table["page"].astype(float)
+    is_kw = table["is_fragment_title"].to_numpy()
+    heads = pd.Series(~is_kw, index=table.index)
+    heads.iloc[0] = True
+
+    while True:
+        head_page = _last_head(page, heads)
+        gap = page - head_page
+        adjacent = (gap >= 0) & (gap <= max_page_gap)
+        failing = ~heads & ~adjacent
+        if not failing.any():
+            break
+        run_id = heads.cumsum()
+        first_failing = failing & (failing.astype(int).groupby(run_id).cumsum() == 1)
+        heads = heads | first_failing
+
+    tails = ~heads
+    position = pd.Series(np.arange(len(table)), index=table.index)
+    head_pos = _last_head(position, heads)[tails].astype(int).to_numpy()
+    head_rows = table.iloc[head_pos]
+    tail_rows = table[tails]
+
+    report = pd.DataFrame({
+        "Head_ID": head_rows["recipe_id"].to_numpy(),
+        "Head_Title": head_rows["title"].to_numpy(),
+        "Tail_ID": tail_rows["recipe_id"].to_numpy(),
+        "Tail_Title": tail_rows["title"].to_numpy(),
+        "Reason": np.where(head_rows["is_incomplete"].to_numpy(), "Keyword + Empty Instructions", "Explicit Keyword"),
+        "Page_Gap": tail_rows["page"].to_numpy() - head_rows["page"].to_numpy(),
+    })
+    return report
+
+
+def analyze_stitching(raw_input_path, **heuristics):
+    """Review DataFrame of stitch candidates for a fragment store (JSONL)."""
+    keywords = heuristics.pop("keywords", FRAGMENT_KEYWORDS)
+    incomplete_markers = heuristics.pop("incomplete_markers", INCOMPLETE_MARKERS)
+    table = build_fragment_table(FragmentStore(raw_input_path), keywords, incomplete_markers)
+    return stitch_candidates(table, **heuristics)
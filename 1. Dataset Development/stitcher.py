@@ -0,0 +1,208 @@
+import re
+
+# --- RULE CONFIGURATION ---
+FRAGMENT_KEYWORDS = ["continu", "lanjut", "sambung", "untitled", 'fragment', 'cont.']
+INCOMPLETE_MARKERS = ["incomplete", "missing", "continue"]
+FORCE_STITCH_IDS = frozenset([
+    'MR_201_01', 'MR_276_01', 'MR_300_01', 'MR_310_01', 'MR_348_01', 'MR_432_01',
+    'MR_434_01', 'MR_561_01', 'MR_613_01', 'MR_715_01', 'MR_740_01', 'MR_748_01',
+    'MR_857_01', 'MR_861_01', 'MR_893_01', 'MR_980_01', 'MR_1098_01',
+])
+MAX_PAGE_GAP = 2
+MERGEABLE_GROUPS = ["utama", "bumbu"]
+
+# One compiled alternation instead of a Python loop over keywords per title
+_FRAGMENT_RE = re.compile("|".join(re.escape(kw) for kw in FRAGMENT_KEYWORDS))
+_INCOMPLETE_RE = re.compile("|".join(re.escape(kw) for kw in INCOMPLETE_MARKERS))
+
+
+# --- FEATURES ---
+# Everything a rule may look at is computed once per fragment (and once more
+# for the head after each merge), never inside the rules themselves.
+
+def title_features(fragment):
+    title_orig = (fragment.get('title_original') or "").lower()
+    title_norm = (fragment.get('title_normalized') or "").lower()
+    return bool(_FRAGMENT_RE.search(title_orig) or _FRAGMENT_RE.search(title_norm))
+
+
+def instructions_incomplete(fragment):
+    instr_list = fragment.get('instructions') or []
+    if len(instr_list) == 0:
+        return True
+    return bool(_INCOMPLETE_RE.search(" ".join(map(str, instr_list)).lower()))
+
+
+def fragment_features(fragment):
+    return {
+        'recipe_id': fragment.get('recipe_id', ''),
+        'is_fragment_title': title_features(fragment),
+        'is_incomplete': instructions_incomplete(fragment),
+        'is_forced': fragment.get('recipe_id', '') in FORCE_STITCH_IDS,
+    }
+
+
+# --- RULE REGISTRY ---
+# Rules run in registration order; the first one that fires gives the reason.
+# A rule is predicate(prev_features, curr_features) -> bool.
+RULES = []
+
+
+def continuation_rule(reason):
+    def register(predicate):
+        RULES.append((reason, predicate))
+        return predicate
+    return register
+
+
+@continuation_rule("Keyword + Empty Instructions")
+def _keyword_and_incomplete(prev, curr):
+    return curr['is_fragment_title'] and prev['is_incomplete']
+
+
+@continuation_rule("Explicit Keyword")
+def _keyword(prev, curr):
+    return curr['is_fragment_title']
+
+
+@continuation_rule("Force Stich")
+def _forced(prev, curr):
+    return curr['is_forced']
+
+
+def is_adjacent(prev_page, curr_page):
+    page_diff = (curr_page if curr_page is not None else 999) - (prev_page if prev_page is not None else 0)
+    return 0 <= page_diff <= MAX_PAGE_GAP
+
+
+def match_rules(prev_features, curr_features):
+    for reason, predicate in RULES:
+        if predicate(prev_features, curr_features):
+            return reason
+    return None
+
+
+def is_continuation(prev, curr):
+    """Ad-hoc check for one pair of fragments; returns (should_stitch, reason)."""
+    if not prev or not curr:
+        return False, None
+    if not is_adjacent(prev.get('_source_page'), curr.get('_source_page')):
+        return False, None
+    reason = match_rules(fragment_features(prev), fragment_features(curr))
+    return (reason is not None), reason
+
+
+# --- MERGING ---
+
+class StitchBuffer:
+    """
+    The recipe currently being assembled. It owns its dict, so merges
+    mutate it in place; head groups are indexed by lower-cased name.
+    """
+
+    def __init__(self, head, features=None):
+        self.head = head
+        self.features = features or fragment_features(head)
+        self._groups = None
+
+    def group_index(self):
+        if self._groups is None:
+            self._groups = {}
+            for group in self.head.get('ingredient_groups', []) or []:
+                self._groups.setdefault((group.get('group_name') or '').lower(), group)
+        return self._groups
+
+    def merge(self, tail):
+        """
+        Surgically stitches tail into head.
+        - Filters out 'inferred' ingredients.
+        - Merges bumbu/utama groups if they exist in both.
+        - Replaces placeholders with real instructions.
+        """
+        head = self.head
+
+        # 1. Ingredient Merging & Filtering
+        head_groups = head.get('ingredient_groups', []) or []
+        tail_groups = tail.get('ingredient_groups', []) or []
+
+        for t_group in tail_groups:
+            g_name = (t_group.get('group_name') or "").lower()
+
+            # RULE: Skip if group_name contains 'inferred'
+            if "inferred" in g_name:
+                continue
+
+            # RULE: Skip individual ingredients containing 'inferred'
+            t_ingredients = [
+                ing for ing in t_group.get('ingredients', [])
+                if "inferred" not in (ing.get('original_text') or "").lower()
+            ]
+
+            if not t_ingredients:
+                continue
+
+            # Check for existing group to merge into
+            target_group = None
+            if any(name in g_name for name in MERGEABLE_GROUPS):
+                target_group = self.group_index().get(g_name)
+
+            if target_group:
+                target_group['ingredients'].extend(t_ingredients)
+            else:
+                # Add as a new group
+                new_group = t_group.copy()
+                new_group['ingredients'] = t_ingredients
+                head_groups.append(new_group)
+                self.group_index().setdefault(g_name, new_group)
+
+        head['ingredient_groups'] = head_groups
+
+        # 2. Instruction Replacement
+        t_instructions = tail.get('instructions', []) or []
+        h_instructions = head.get('instructions', []) or []
+
+        if t_instructions:
+            # Check if head instruction is a placeholder
+            is_placeholder = any("continue" in str(line).lower() for line in h_instructions)
+            if not h_instructions or is_placeholder:
+                head['instructions'] = t_instructions
+            else:
+                # If both have content, we append tail to head
+                head['instructions'].extend(t_instructions)
+            # Only the instructions can change the head's rule features
+            self.features['is_incomplete'] = instructions_incomplete(head)
+
+
+# --- ENGINE ---
+
+def stitch(fragments, stitch_log=None):
+    """
+    Single pass over a page-ordered fragment stream. Yields finished recipes
+    while holding only the one being assembled. Each stitch is appended to
+    stitch_log (if given) as {Head_ID, Tail_ID, Reason}.
+    """
+    buffer = None
+    for fragment in fragments:
+        if buffer is None:
+            buffer = StitchBuffer(fragment)
+            continue
+
+        features = fragment_features(fragment)
+        reason = None
+        if is_adjacent(buffer.head.get('_source_page'), fragment.get('_source_page')):
+            reason = match_rules(buffer.features, features)
+
+        if reason:
+            if stitch_log is not None:
+                stitch_log.append({
+                    "Head_ID": buffer.head['recipe_id'],
+                    "Tail_ID": fragment['recipe_id'],
+                    "Reason": reason
+                })
+            buffer.merge(fragment)
+        else:
+            yield buffer.head
+            buffer = StitchBuffer(fragment, features)
+
+    if buffer is not None:
+        yield buffer.head
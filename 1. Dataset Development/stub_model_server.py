@@ -0,0 +1,258 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURATION ---
+# Local stand-in for the Gemini generateContent endpoint (plus countTokens
+# and the inline batchGenerateContent / batches/{id} job endpoints), so the
+# OCR steps can be run and timed without the network. Point a script at it with:
+#   GEMINI_BASE_URL=http://127.0.0.1:8765 python 3_recipes_detail_images_to_json.py
+HOST = "127.0.0.1"
+PORT = 8765
+LATENCY = 2.0        # seconds per call
+JITTER = 0.5         # +/- seconds added to LATENCY
+SERVER_RPM = 0       # 0 = never answer 429
+RETRY_AFTER = 5
+BATCH_DELAY = 10.0   # seconds until a submitted batch job reports SUCCEEDED
+IMAGE_TOKENS = 1290  # prompt tokens billed per image
+SLOW_FRACTION = 0.0  # share of calls that hang in the tail (hedging / deadline tests)
+SLOW_LATENCY = 30.0  # seconds such a call takes
+ERROR_RATE = 0.0     # share of calls answered with 503
+
+
+def fake_recipe_page(prompt_text):
+    """Builds a small but schema-complete page answer from the prompt."""
+    match = re.search(r"MR_(\d+)_", prompt_text)
+    page_num = int(match.group(1)) if match else 0
+    if "last_active_category" in prompt_text:
+        return {
+            "last_active_category": "MAKANAN UTAMA",
+            "mappings": [{"recipes_original_name": f"Stub {page_num}", "category": "MAKANAN UTAMA"}],
+        }
+    return [{
+        "recipe_id": f"MR_{page_num}_01",
+        "title_original": f"STUB {page_num}",
+        "title_normalized": f"Stub {page_num}",
+        "region": None,
+        "page_number": page_num,
+        "category": "Stub",
+        "ingredient_groups": [{
+            "group_name": "utama",
+            "original_header": "Bahan",
+            "ingredients": [{
+                "original_text": "garam",
+                "item_original": "garam",
+                "item_normalized": "garam",
+                "quantity": 1.0,
+                "unit": "sendok teh",
+            }],
+        }],
+        "instructions": ["Stub instruction."],
+    }]
+
+
+def fake_answer(prompt_text):
+    """Multi-page requests ("PAGE n" before every image) get one recipe list per page."""
+    pages = re.findall(r"\bPAGE (\d+)\b", prompt_text)
+    if pages:
+        return {"pages": [{"page_number": int(p), "recipes": fake_recipe_page(f"MR_{p}_")} for p in pages]}
+    return fake_recipe_page(prompt_text)
+
+
+def prompt_text_and_tokens(request):
+    """The prompt text of a request and the prompt tokens it is billed (text + IMAGE_TOKENS per image)."""
+    parts = [part for content in request.get("contents", []) for part in content.get("parts", [])]
+    prompt_text = " ".join(part.get("text", "") for part in parts)
+    images = sum(1 for part in parts if "inlineData" in part or "inline_data" in part)
+    return prompt_text, len(prompt_text) // 4 + IMAGE_TOKENS * max(images, 1)
+
+
+def generate_response(request):
+    """The generateContent response body for one request body."""
+    prompt_text, prompt_tokens = prompt_text_and_tokens(request)
+    answer = json.dumps(fake_answer(prompt_text), ensure_ascii=False)
+    return {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": f"```json\n{answer}\n```"}]},
+            "finishReason": "STOP",
+        }],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": len(answer) // 4,
+            "totalTokenCount": prompt_tokens + len(answer) // 4,
+        },
+    }
+
+
+class StubState:
+    def __init__(self, latency, jitter, rpm, batch_delay=BATCH_DELAY,
+                 slow_fraction=SLOW_FRACTION, slow_latency=SLOW_LATENCY, error_rate=ERROR_RATE):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_fraction = slow_fraction
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rpm = rpm
+        self.batch_delay = batch_delay
+        self.window = deque()
+        self.lock = threading.Lock()
+        self.served = 0
+        self.throttled = 0
+        self.slow = 0
+        self.errors = 0
+        self.batches = {}          # id -> {"requests", "created", "model"}
+
+    def admit(self):
+        """Sliding one-minute window; False means answer 429."""
+        if not self.rpm:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            while self.window and now - self.window[0] > 60:
+                self.window.popleft()
+            if len(self.window) >= self.rpm:
+                self.throttled += 1
+                return False
+            self.window.append(now)
+            return True
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (deadline) or its hedge won
+
+    def _batch_body(self, batch_id):
+        """Batch job resource: RUNNING until batch_delay has passed, then SUCCEEDED with inline answers."""
+        job = self.state.batches[batch_id]
+        done = time.monotonic() - job["created"] >= self.state.batch_delay
+        metadata = {
+            "@type": "type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatch",
+            "model": job["model"],
+            "displayName": job["display_name"],
+            "state": "BATCH_STATE_SUCCEEDED" if done else "BATCH_STATE_RUNNING",
+            "createTime": job["create_time"],
+        }
+        if done:
+            if "responses" not in job:
+                job["responses"] = [
+                    {"response": generate_response(item.get("request", {})), "metadata": item.get("metadata")}
+                    for item in job["requests"]
+                ]
+                job["end_time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                with self.state.lock:
+                    self.state.served += len(job["requests"])
+            metadata["endTime"] = job["end_time"]
+            metadata["output"] = {"inlinedResponses": {"inlinedResponses": job["responses"]}}
+        return {"name": f"batches/{batch_id}", "metadata": metadata, "done": done}
+
+    def do_GET(self):
+        match = re.search(r"/batches/([^/?]+)", self.path)
+        if not match or match.group(1) not in self.state.batches:
+            self._send_json(404, {"error": {"code": 404, "message": "Unknown batch", "status": "NOT_FOUND"}})
+            return
+        self._send_json(200, self._batch_body(match.group(1)))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if ":batchGenerateContent" in self.path:
+            batch = request.get("batch", {})
+            with self.state.lock:
+                batch_id = f"stub-{len(self.state.batches) + 1}"
+                self.state.batches[batch_id] = {
+                    "requests": batch.get("inputConfig", {}).get("requests", {}).get("requests", []),
+                    "created": time.monotonic(),
+                    "create_time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "model": re.search(r"models/[^:]+", self.path).group(0),
+                    "display_name": batch.get("displayName", batch_id),
+                }
+            self._send_json(200, self._batch_body(batch_id))
+            return
+
+        if ":countTokens" in self.path:
+            self._send_json(200, {"totalTokens": prompt_text_and_tokens(request)[1]})
+            return
+
+        if ":generateContent" not in self.path:
+            self._send_json(404, {"error": {"code": 404, "message": "Unknown method", "status": "NOT_FOUND"}})
+            return
+
+        if not self.state.admit():
+            self._send_json(
+                429,
+                {"error": {"code": 429, "message": "Quota exceeded (stub)", "status": "RESOURCE_EXHAUSTED"}},
+                headers={"Retry-After": str(RETRY_AFTER)},
+            )
+            return
+
+        if random.random() < self.state.error_rate:
+            with self.state.lock:
+                self.state.errors += 1
+            self._send_json(503, {"error": {"code": 503, "message": "Overloaded (stub)", "status": "UNAVAILABLE"}})
+            return
+
+        latency = self.state.latency + random.uniform(-self.state.jitter, self.state.jitter)
+        if random.random() < self.state.slow_fraction:
+            latency = self.state.slow_latency
+            with self.state.lock:
+                self.state.slow += 1
+        time.sleep(max(0.0, latency))
+        body = generate_response(request)
+        with self.state.lock:
+            self.state.served += 1
+        self._send_json(200, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=HOST, port=PORT, latency=LATENCY, jitter=JITTER, rpm=SERVER_RPM, batch_delay=BATCH_DELAY,
+          slow_fraction=SLOW_FRACTION, slow_latency=SLOW_LATENCY, error_rate=ERROR_RATE):
+    StubHandler.state = StubState(latency, jitter, rpm, batch_delay, slow_fraction, slow_latency, error_rate)
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    print(f"🧪 Stub model server on http://{host}:{port} (latency {latency}s, rpm {rpm or 'unlimited'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        state = StubHandler.state
+        print(f"Served {state.served} calls ({state.slow} slow), throttled {state.throttled}, {state.errors} errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the Gemini generateContent API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--jitter", type=float, default=JITTER)
+    parser.add_argument("--rpm", type=int, default=SERVER_RPM)
+    parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY,
+                        help="Seconds before a submitted batch job completes")
+    parser.add_argument("--slow-fraction", type=float, default=SLOW_FRACTION,
+                        help="Share of calls that take --slow-latency seconds")
+    parser.add_argument("--slow-latency", type=float, default=SLOW_LATENCY)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="Share of calls answered with 503")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.latency, args.jitter, args.rpm, args.batch_delay,
+          args.slow_fraction, args.slow_latency, args.error_rate)
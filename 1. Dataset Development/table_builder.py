@@ -0,0 +1,113 @@
+import json
+from itertools import islice
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+CHUNK_SIZE = 5_000
+ING_ID_PREFIX = "ING_"
+ING_ID_WIDTH = 6
+
+# Declared up front so every chunk (and every book) gets the same dtypes.
+# Quantities stay object: OCR gives floats, None and the odd '1.0-2.0';
+# unit_normalizer decides what is numeric.
+RECIPE_DTYPES = {
+    'id': 'str',
+    'title_original': 'str',
+    'title_normalized': 'str',
+    'source_page': 'Int64',
+    'region': 'str',
+    'category': 'str',
+    'ingredient_json': 'str',
+    'instruction': 'str',
+}
+INGREDIENT_DTYPES = {
+    'id': 'str',
+    'recipe_id': 'str',
+    'ingredient_group': 'str',
+    'ingredient_original_name': 'str',
+    'ingredient_normalized_name': 'str',
+    'ingredient_quantity': 'object',
+    'ingredient_unit': 'str',
+}
+
+_encode_groups = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def ingredient_ids(start, count):
+    """ING_000001-style ids for rows start .. start+count-1, in one numpy call."""
+    if count == 0:
+        # zfill on an empty array fails (it reduces over the string lengths)
+        return np.array([], dtype=str)
+    numbers = np.arange(start, start + count).astype(str)
+    return np.char.add(ING_ID_PREFIX, np.char.zfill(numbers, ING_ID_WIDTH))
+
+
+def _frame(columns, dtypes):
+    return pd.DataFrame({name: pd.Series(columns[name], dtype=dtype) for name, dtype in dtypes.items()})
+
+
+def build_chunk(recipes, first_ing_id=1):
+    """
+    One batch of recipes -> (recipes DataFrame, ingredients DataFrame).
+    Values are appended straight into per-column lists (no row dicts), and
+    the ingredient ids are assigned afterwards in one vectorized step.
+    """
+    rec = {name: [] for name in RECIPE_DTYPES}
+    ing = {name: [] for name in INGREDIENT_DTYPES if name != 'id'}
+
+    for recipe in recipes:
+        rec_id = recipe.get('recipe_id')
+        groups = recipe.get('ingredient_groups', [])
+
+        rec['id'].append(rec_id)
+        rec['title_original'].append(recipe.get('title_original'))
+        rec['title_normalized'].append(recipe.get('title_normalized'))
+        rec['source_page'].append(recipe.get('_source_page') or recipe.get('page_number'))
+        rec['region'].append(recipe.get('region'))
+        rec['category'].append(recipe.get('category'))
+        rec['ingredient_json'].append(_encode_groups(groups))
+        rec['instruction'].append("\n".join(recipe.get('instructions', []) or []))
+
+        for group in groups or []:
+            g_name = group.get('group_name', 'utama')
+            items = group.get('ingredients', []) or []
+            n = len(items)
+            ing['recipe_id'].extend([rec_id] * n)
+            ing['ingredient_group'].extend([g_name] * n)
+            ing['ingredient_original_name'].extend([item.get('item_original') for item in items])
+            ing['ingredient_normalized_name'].extend([item.get('item_normalized') for item in items])
+            ing['ingredient_quantity'].extend([item.get('quantity') for item in items])
+            ing['ingredient_unit'].extend([item.get('unit') for item in items])
+
+    ing['id'] = ingredient_ids(first_ing_id, len(ing['recipe_id']))
+    return _frame(rec, RECIPE_DTYPES), _frame(ing, INGREDIENT_DTYPES)
+
+
+def iter_table_chunks(recipes, chunk_size=CHUNK_SIZE):
+    """
+    Streams (recipes_df, ingredients_df) per chunk_size recipes, with the
+    ingredient id counter carried across chunks. Only one chunk of source
+    recipes is held at a time.
+    """
+    recipes = iter(recipes)
+    next_ing_id = 1
+    while True:
+        batch = list(islice(recipes, chunk_size))
+        if not batch:
+            return
+        df_rec, df_ing = build_chunk(batch, next_ing_id)
+        next_ing_id += len(df_ing)
+        yield df_rec, df_ing
+
+
+def build_tables(recipes, chunk_size=CHUNK_SIZE):
+    """The recipes and ingredients tables for a whole recipe stream (e.g. a FragmentStore)."""
+    rec_parts, ing_parts = [], []
+    for df_rec, df_ing in iter_table_chunks(recipes, chunk_size):
+        rec_parts.append(df_rec)
+        ing_parts.append(df_ing)
+    if not rec_parts:
+        return build_chunk([])
+    return (pd.concat(rec_parts, ignore_index=True),
+            pd.concat(ing_parts, ignore_index=True))
@@ -0,0 +1,133 @@
+import os
+import csv
+import argparse
+import numpy as np
+import pandas as pd
+from ejaan import fold
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UNIT_TABLE = os.path.join(BASE_DIR, "unit_aliases.csv")
+INGREDIENTS_CSV = os.path.join(BASE_DIR, "df_ingredient_recipes.csv")
+
+# Dropped from count units only: 'ikat kecil' is still one ikat, but a
+# 'cangkir kecil' is not 240 ml, so sized mass/volume units stay unresolved.
+SIZE_WORDS = ("kecil", "sedang", "besar")
+
+# unit_status values
+OK = "ok"
+NO_UNIT = "no_unit"                  # quantity without unit: counted as pieces
+TO_TASTE = "to_taste"                # secukupnya, sesuai selera, ...
+NO_QUANTITY = "no_quantity"
+NON_NUMERIC = "non_numeric_quantity"
+UNKNOWN_UNIT = "unknown_unit"
+
+OUTPUT_COLUMNS = ["unit_canonical", "unit_dimension", "quantity_value",
+                  "quantity_g", "quantity_ml", "quantity_count", "unit_status"]
+
+
+def load_unit_table(path=UNIT_TABLE):
+    """folded alias -> (unit, dimension, factor to gram / ml / 1)."""
+    table = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            factor = float(row['factor']) if row['factor'] else np.nan
+            table.setdefault(fold(row['alias']), (row['unit'] or None, row['dimension'], factor))
+    return table
+
+
+class UnitNormalizer:
+    """
+    Resolves raw units against the declarative alias table (unit_aliases.csv)
+    and converts quantities to grams, millilitres or counts. Each distinct raw
+    unit is resolved once; the conversion is columnar.
+    """
+
+    def __init__(self, table_path=UNIT_TABLE):
+        self.table = load_unit_table(table_path)
+
+    def resolve(self, raw):
+        """(unit, dimension, factor) for one raw unit, or None if unknown."""
+        key = fold(raw)
+        if not key:
+            return None
+        if key in self.table:
+            return self.table[key]
+        words = key.split()
+        if len(words) > 1 and words[-1] in SIZE_WORDS:
+            base = self.table.get(" ".join(words[:-1]))
+            if base is not None and base[1] == "count":
+                return base
+        return None
+
+    def normalize(self, quantity, unit):
+        """
+        DataFrame with OUTPUT_COLUMNS aligned to the inputs:
+        canonical unit and dimension, numeric quantity, quantity in g / ml /
+        count (only the column of its dimension is filled) and unit_status.
+        """
+        index = unit.index
+        codes, uniques = pd.factorize(unit.astype("string").str.strip().str.lower())
+        resolved = [self.resolve(u) for u in uniques]
+        known = np.array([r is not None for r in resolved] + [False])
+        names = np.array([r[0] if r else None for r in resolved] + [None], dtype=object)
+        dims = np.array([r[1] if r else None for r in resolved] + [None], dtype=object)
+        factors = np.array([r[2] if r else np.nan for r in resolved] + [np.nan], dtype=np.float64)
+
+        has_unit = codes >= 0
+        is_known = known[codes]
+        dimension = dims[codes]
+        factor = factors[codes]
+
+        value = pd.to_numeric(quantity, errors="coerce").to_numpy(dtype=np.float64)
+        has_value = ~np.isnan(value)
+        raw_present = quantity.notna().to_numpy()
+
+        status = np.full(len(index), OK, dtype=object)
+        status[has_unit & ~is_known] = UNKNOWN_UNIT
+        status[is_known & (dimension == "to_taste")] = TO_TASTE
+        measurable = is_known & (dimension != "to_taste")
+        status[measurable & ~has_value & raw_present] = NON_NUMERIC
+        status[measurable & ~raw_present] = NO_QUANTITY
+        status[~has_unit & has_value] = NO_UNIT
+        status[~has_unit & ~has_value] = NO_QUANTITY
+
+        converted = value * factor
+        result = pd.DataFrame({
+            "unit_canonical": pd.array(names[codes], dtype="string"),
+            "unit_dimension": pd.array(np.where(has_unit, dimension, None), dtype="string"),
+            "quantity_value": value,
+            "quantity_g": np.where(measurable & (dimension == "mass"), converted, np.nan),
+            "quantity_ml": np.where(measurable & (dimension == "volume"), converted, np.nan),
+            "quantity_count": np.where(measurable & (dimension == "count"), converted,
+                                       np.where(~has_unit, value, np.nan)),
+            "unit_status": pd.array(status, dtype="string"),
+        }, index=index)
+        return result
+
+
+def normalize_units(df_ingredients, normalizer=None):
+    """Returns df_ingredients with the OUTPUT_COLUMNS added (replacing older ones)."""
+    normalizer = normalizer or UnitNormalizer()
+    columns = normalizer.normalize(df_ingredients["ingredient_quantity"], df_ingredients["ingredient_unit"])
+    return df_ingredients.drop(columns=[c for c in OUTPUT_COLUMNS if c in df_ingredients.columns]).join(columns)
+
+
+def main(show_unknown=False):
+    df = pd.read_csv(INGREDIENTS_CSV)
+    out = normalize_units(df)
+    print(f"⚖️ {len(out)} ingredient rows, {out['ingredient_unit'].nunique()} distinct raw units")
+    print(out["unit_status"].value_counts().to_string())
+    print(f"   mass rows: {out['quantity_g'].notna().sum()}, volume rows: {out['quantity_ml'].notna().sum()}, "
+          f"count rows: {out['quantity_count'].notna().sum()}")
+    if show_unknown:
+        unknown = out.loc[out["unit_status"] == UNKNOWN_UNIT, "ingredient_unit"].value_counts()
+        print(unknown.to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize ingredient units and quantities.")
+    parser.add_argument("--unknown", action="store_true", help="List raw units missing from unit_aliases.csv")
+    args = parser.parse_args()
+
+    main(args.unknown)
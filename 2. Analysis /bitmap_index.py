@@ -0,0 +1,256 @@
+import os
+import re
+import json
+import zlib
+import struct
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "1. Dataset Development")
+RECIPES_CSV = os.path.join(DATA_DIR, "df_recipes.csv")
+INGREDIENTS_CSV = os.path.join(DATA_DIR, "df_ingredient_recipes.csv")
+INDEX_FILE = os.path.join(BASE_DIR, "bitmap_index.bin")
+
+MAGIC = b"BMIX1"
+DEFAULT_FIELD = "ingredient"
+
+# query field -> (table, column)
+FIELDS = {
+    "ingredient": ("ingredients", "ingredient_normalized_name"),
+    "group": ("ingredients", "ingredient_group"),
+    "province": ("recipes", "province_group"),
+    "category": ("recipes", "category"),
+}
+
+
+def normalize_term(value):
+    return " ".join(str(value).lower().split())
+
+
+class BitmapIndex:
+    """
+    field:value -> bitmap over recipe rows, one bit per recipe, packed 8 to a
+    byte. Queries are evaluated with numpy &, | and ~ over whole bitmaps.
+    On disk: MAGIC, a length-prefixed JSON header (recipe ids, terms), and one
+    zlib-compressed block holding all bitmaps back to back.
+    """
+
+    def __init__(self, recipe_ids, terms, bitmaps):
+        self.recipe_ids = list(recipe_ids)
+        self.terms = terms                    # field -> {value: row in bitmaps}
+        self.bitmaps = bitmaps                # (n_terms, n_bytes) uint8
+        self.n_bytes = bitmaps.shape[1]
+        self.universe = np.packbits(np.ones(len(self.recipe_ids), dtype=bool))
+        if len(self.universe) < self.n_bytes:
+            self.universe = np.pad(self.universe, (0, self.n_bytes - len(self.universe)))
+
+    # --- BUILD / PERSIST ---
+
+    @classmethod
+    def build(cls, df_recipes, df_ingredients):
+        recipe_ids = sorted(set(df_recipes["id"].dropna()) | set(df_ingredients["recipe_id"].dropna()))
+        row_of = {rid: i for i, rid in enumerate(recipe_ids)}
+        tables = {
+            "recipes": df_recipes.rename(columns={"id": "recipe_id"}),
+            "ingredients": df_ingredients,
+        }
+
+        terms, packed = {}, []
+        for field, (table, column) in FIELDS.items():
+            df = tables[table]
+            if column not in df.columns:
+                terms[field] = {}
+                continue
+            pairs = pd.DataFrame({"row": df["recipe_id"].map(row_of), "value": df[column]}).dropna()
+            pairs["value"] = pairs["value"].map(normalize_term)
+            pairs = pairs[pairs["value"] != ""]
+            terms[field] = {}
+            for value, rows in pairs.groupby("value", sort=True)["row"]:
+                bits = np.zeros(len(recipe_ids), dtype=bool)
+                bits[rows.to_numpy(dtype=np.int64)] = True
+                terms[field][value] = len(packed)
+                packed.append(np.packbits(bits))
+
+        n_bytes = (len(recipe_ids) + 7) // 8
+        bitmaps = np.vstack(packed) if packed else np.zeros((0, n_bytes), dtype=np.uint8)
+        return cls(recipe_ids, terms, bitmaps)
+
+    def save(self, path=INDEX_FILE):
+        header = json.dumps({"recipe_ids": self.recipe_ids, "terms": self.terms}, ensure_ascii=False).encode("utf-8")
+        blob = zlib.compress(self.bitmaps.tobytes(), 9)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<III", len(header), self.bitmaps.shape[0], self.bitmaps.shape[1]))
+            f.write(header)
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a bitmap index file")
+            header_len, n_terms, n_bytes = struct.unpack("<III", f.read(12))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            bitmaps = np.frombuffer(zlib.decompress(f.read()), dtype=np.uint8).reshape(n_terms, n_bytes)
+        return cls(header["recipe_ids"], header["terms"], bitmaps)
+
+    # --- BITMAPS ---
+
+    def empty(self):
+        return np.zeros(self.n_bytes, dtype=np.uint8)
+
+    def bitmap(self, field, value):
+        """Bitmap for one field:value; unknown fields raise, unknown values are empty."""
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}' (use one of: {', '.join(FIELDS)})")
+        row = self.terms.get(field, {}).get(normalize_term(value))
+        return self.empty() if row is None else self.bitmaps[row]
+
+    def ids(self, bitmap):
+        rows = np.flatnonzero(np.unpackbits(bitmap)[:len(self.recipe_ids)])
+        return [self.recipe_ids[i] for i in rows]
+
+    def count(self, expression):
+        return int(np.unpackbits(self.evaluate(expression))[:len(self.recipe_ids)].sum())
+
+    def query(self, expression):
+        """Recipe ids matching a boolean expression, e.g. 'kelapa AND terasi AND NOT santan'."""
+        return self.ids(self.evaluate(expression))
+
+    def evaluate(self, expression):
+        return QueryParser(self, expression).parse()
+
+
+# --- QUERY LANGUAGE ---
+# expr   := term (OR term)*
+# term   := factor ([AND] factor)*          (juxtaposition means AND)
+# factor := NOT factor | '(' expr ')' | [field ':'] value
+# value  := word | "quoted words"
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+
+
+def tokenize(expression):
+    tokens, pos = [], 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Cannot parse query near: {expression[pos:]!r}")
+        pos = match.end()
+        lparen, rparen, quoted, word = match.groups()
+        if lparen:
+            tokens.append(("(", lparen))
+        elif rparen:
+            tokens.append((")", rparen))
+        elif quoted is not None:
+            tokens.append(("value", quoted))
+        elif word.upper() in ("AND", "OR", "NOT"):
+            tokens.append((word.upper(), word))
+        else:
+            tokens.append(("value", word))
+    return tokens
+
+
+class QueryParser:
+    """Recursive-descent evaluator: each rule returns a bitmap."""
+
+    def __init__(self, index, expression):
+        self.index = index
+        self.tokens = tokenize(expression)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty query")
+        result = self.expr()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.pos][1]}' in query")
+        return result
+
+    def expr(self):
+        result = self.term()
+        while self.peek() == "OR":
+            self.take()
+            result = result | self.term()
+        return result
+
+    def term(self):
+        result = self.factor()
+        while self.peek() in ("AND", "NOT", "(", "value"):
+            if self.peek() == "AND":
+                self.take()
+            result = result & self.factor()
+        return result
+
+    def factor(self):
+        kind = self.peek()
+        if kind == "NOT":
+            self.take()
+            return ~self.factor() & self.index.universe
+        if kind == "(":
+            self.take()
+            result = self.expr()
+            if self.peek() != ")":
+                raise ValueError("Missing ')' in query")
+            self.take()
+            return result
+        if kind == "value":
+            return self.atom(self.take()[1])
+        raise ValueError("Query ends where a value was expected")
+
+    def atom(self, text):
+        field, value = DEFAULT_FIELD, text
+        if ":" in text:
+            field, value = text.split(":", 1)
+            if not value and self.peek() == "value":
+                value = self.take()[1]   # field:"quoted value"
+        return self.index.bitmap(field.lower(), value)
+
+
+def build(recipes_csv=RECIPES_CSV, ingredients_csv=INGREDIENTS_CSV, path=INDEX_FILE):
+    index = BitmapIndex.build(pd.read_csv(recipes_csv), pd.read_csv(ingredients_csv))
+    index.save(path)
+    sizes = ", ".join(f"{len(v)} {k}" for k, v in index.terms.items())
+    print(f"🗂️ {len(index.recipe_ids)} recipes, {sizes} -> {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Boolean recipe queries over ingredient/province/category/group bitmaps.",
+        epilog='example: python bitmap_index.py query \'kelapa AND terasi AND NOT santan AND province:"Jawa Timur"\'')
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Build the index from the cleaned tables")
+    p_query = sub.add_parser("query", help="Evaluate an AND/OR/NOT expression")
+    p_query.add_argument("expression")
+    p_query.add_argument("--limit", type=int, default=50)
+    p_terms = sub.add_parser("terms", help="List the indexed values of a field")
+    p_terms.add_argument("field", choices=list(FIELDS))
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build()
+    elif args.command == "query":
+        index = BitmapIndex.load()
+        ids = index.query(args.expression)
+        print(f"🔎 {len(ids)} recipes")
+        for recipe_id in ids[:args.limit]:
+            print(recipe_id)
+    else:
+        index = BitmapIndex.load()
+        for value in index.terms.get(args.field, {}):
+            print(value)
@@ -0,0 +1,153 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from fingerprint_index import DATA_DIR, recipe_ingredient_arrays
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECIPES_CSV = os.path.join(DATA_DIR, "df_recipes.csv")
+INGREDIENTS_CSV = os.path.join(DATA_DIR, "df_ingredient_recipes.csv")
+CACHE_DIR = os.path.join(BASE_DIR, ".cooccurrence_cache")
+
+MIN_COUNT = 3
+TOP_N = 20
+SLICE_COLUMNS = ["province_group", "category"]
+
+
+def table_hash(df_recipes, df_ingredients):
+    """Content hash of exactly the columns the engine reads."""
+    h = hashlib.sha1()
+    h.update(pd.util.hash_pandas_object(
+        df_ingredients[["recipe_id", "ingredient_normalized_name"]], index=False).to_numpy().tobytes())
+    cols = ["id"] + [c for c in SLICE_COLUMNS if c in df_recipes.columns]
+    h.update(pd.util.hash_pandas_object(df_recipes[cols], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class CooccurrenceEngine:
+    """
+    Ingredient x ingredient co-occurrence from one sparse product X.T @ X over
+    the binary recipe x ingredient matrix X. A slice (province_group /
+    category) is a row mask on X, so the matrix is built once and every slice
+    is a single product over the masked rows. The count matrix of a slice is
+    cached on disk under the hash of the input tables.
+    """
+
+    def __init__(self, df_recipes, df_ingredients, cache_dir=CACHE_DIR):
+        self.recipe_ids, self.vocab, indptr, indices = recipe_ingredient_arrays(df_ingredients)
+        data = np.ones(len(indices), dtype=np.int32)
+        self.X = sparse.csr_matrix((data, indices, indptr), shape=(len(self.recipe_ids), len(self.vocab)))
+
+        attrs = df_recipes.drop_duplicates("id").set_index("id")
+        self.attributes = {
+            column: attrs[column].reindex(self.recipe_ids).to_numpy(dtype=object)
+            for column in SLICE_COLUMNS if column in attrs.columns
+        }
+        self.cache_dir = cache_dir
+        self.signature = table_hash(df_recipes, df_ingredients)
+
+    def mask(self, **filters):
+        """Row mask for e.g. province_group='Jawa Timur', category=['DJADJANAN', 'MINUMAN']."""
+        mask = np.ones(len(self.recipe_ids), dtype=bool)
+        for column, value in filters.items():
+            if value is None:
+                continue
+            if column not in self.attributes:
+                raise ValueError(f"Cannot slice on '{column}' (use one of: {', '.join(self.attributes)})")
+            values = [value] if isinstance(value, str) else list(value)
+            mask &= np.isin(self.attributes[column], values)
+        return mask
+
+    def _cache_path(self, filters):
+        key = json.dumps({k: v for k, v in sorted(filters.items()) if v is not None}, ensure_ascii=False)
+        name = hashlib.sha1(f"{self.signature}|{key}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{name}.npz")
+
+    def counts(self, **filters):
+        """(co-occurrence matrix C, recipes in slice). C[i, i] is the recipe count of ingredient i."""
+        path = self._cache_path(filters) if self.cache_dir else None
+        if path and os.path.exists(path):
+            with np.load(path) as cached:
+                n_recipes = int(cached["n_recipes"])
+            return sparse.load_npz(path.replace(".npz", ".C.npz")), n_recipes
+
+        rows = self.mask(**filters)
+        Xs = self.X[rows]
+        C = (Xs.T @ Xs).tocsr()
+        n_recipes = int(rows.sum())
+
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            sparse.save_npz(path.replace(".npz", ".C.npz"), C)
+            np.savez(path, n_recipes=n_recipes)
+        return C, n_recipes
+
+    def pairs(self, min_count=MIN_COUNT, **filters):
+        """
+        One row per ingredient pair (a < b) seen together in >= min_count
+        recipes of the slice: count, support, PMI, NPMI and lift.
+        """
+        C, n = self.counts(**filters)
+        columns = ["ingredient_a", "ingredient_b", "count", "support", "pmi", "npmi", "lift"]
+        if n == 0:
+            return pd.DataFrame(columns=columns)
+
+        upper = sparse.triu(C, k=1).tocoo()
+        keep = upper.data >= min_count
+        a, b, c = upper.row[keep], upper.col[keep], upper.data[keep].astype(np.float64)
+        n_ing = C.diagonal().astype(np.float64)
+
+        p_ab = c / n
+        lift = c * n / (n_ing[a] * n_ing[b])
+        pmi = np.log(lift)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            npmi = np.where(p_ab < 1, pmi / -np.log(p_ab), 1.0)
+
+        vocab = np.asarray(self.vocab, dtype=object)
+        return pd.DataFrame({
+            "ingredient_a": vocab[a],
+            "ingredient_b": vocab[b],
+            "count": c.astype(np.int64),
+            "support": p_ab,
+            "pmi": pmi,
+            "npmi": npmi,
+            "lift": lift,
+        }, columns=columns)
+
+    def partners(self, ingredient, min_count=MIN_COUNT, **filters):
+        """Pairs involving one ingredient, with the partner in ingredient_b."""
+        df = self.pairs(min_count, **filters)
+        name = ingredient.lower().strip()
+        hits = df[(df["ingredient_a"] == name) | (df["ingredient_b"] == name)].copy()
+        flip = hits["ingredient_b"] == name
+        hits.loc[flip, ["ingredient_a", "ingredient_b"]] = hits.loc[flip, ["ingredient_b", "ingredient_a"]].to_numpy()
+        return hits
+
+
+def load_engine():
+    return CooccurrenceEngine(pd.read_csv(RECIPES_CSV), pd.read_csv(INGREDIENTS_CSV))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingredient co-occurrence, PMI and lift, optionally per slice.")
+    parser.add_argument("--province", help="province_group to slice on")
+    parser.add_argument("--category", help="category to slice on")
+    parser.add_argument("--ingredient", help="only pairs with this ingredient")
+    parser.add_argument("--min-count", type=int, default=MIN_COUNT)
+    parser.add_argument("--sort", choices=["count", "pmi", "npmi", "lift"], default="npmi")
+    parser.add_argument("--top", type=int, default=TOP_N)
+    args = parser.parse_args()
+
+    engine = load_engine()
+    filters = {"province_group": args.province, "category": args.category}
+    if args.ingredient:
+        result = engine.partners(args.ingredient, args.min_count, **filters)
+    else:
+        result = engine.pairs(args.min_count, **filters)
+    n = int(engine.mask(**filters).sum())
+    print(f"🧂 {n} recipes in slice, {len(result)} pairs with count >= {args.min_count}")
+    print(result.sort_values(args.sort, ascending=False).head(args.top).to_string(index=False))
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import zlib
+import argparse
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "1. Dataset Development")
+INGREDIENTS_CSV = os.path.join(DATA_DIR, "df_ingredient_recipes.csv")
+INDEX_DIR = os.path.join(BASE_DIR, "fingerprint_index")
+
+NUM_PERM = 128          # MinHash signature length
+BANDS = 32              # LSH bands x rows = NUM_PERM; 32 x 4 catches Jaccard >~ 0.4
+SEED = 1967
+TOP_K = 10
+DUPLICATE_THRESHOLD = 0.8
+
+_PRIME = np.int64((1 << 31) - 1)
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+
+def clean_name(series):
+    return series.astype("string").str.lower().str.strip()
+
+
+def stable_vocabulary(names, previous=None):
+    """
+    Ingredient -> column id. Ids from a previous build are kept and new names
+    are appended in sorted order, so column ids never move between builds.
+    """
+    vocab = list(previous or [])
+    known = set(vocab)
+    vocab.extend(sorted(set(names) - known))
+    return vocab
+
+
+def recipe_ingredient_arrays(df_ingredients, previous_vocab=None):
+    """
+    Binary recipe x ingredient matrix as CSR arrays: (recipe_ids, vocab, indptr,
+    indices). Rows are sorted recipe ids, one entry per (recipe, ingredient).
+    """
+    names = clean_name(df_ingredients["ingredient_normalized_name"])
+    pairs = pd.DataFrame({"recipe_id": df_ingredients["recipe_id"], "name": names}).dropna()
+    pairs = pairs[pairs["name"] != ""]
+
+    recipe_ids = sorted(df_ingredients["recipe_id"].dropna().unique())
+    vocab = stable_vocabulary(pairs["name"].unique(), previous_vocab)
+
+    rows = pd.Categorical(pairs["recipe_id"], categories=recipe_ids).codes.astype(np.int64)
+    cols = pd.Categorical(pairs["name"], categories=vocab).codes.astype(np.int64)
+    # One entry per (recipe, ingredient), sorted by row then column
+    cells = np.unique(rows * len(vocab) + cols)
+    row_of_cell, indices = np.divmod(cells, len(vocab))
+    indptr = np.zeros(len(recipe_ids) + 1, dtype=np.int64)
+    np.add.at(indptr, row_of_cell + 1, 1)
+    return recipe_ids, vocab, np.cumsum(indptr), indices.astype(np.int32)
+
+
+def name_hash(names):
+    """Per-ingredient 31-bit hash of the NAME, so signatures don't depend on column ids."""
+    return np.array([zlib.crc32(n.encode("utf-8")) & 0x7FFFFFFF for n in names], dtype=np.int64)
+
+
+def minhash_params(num_perm=NUM_PERM, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+    return a, b
+
+
+def minhash_signatures(indptr, indices, vocab, num_perm=NUM_PERM, seed=SEED):
+    """
+    (n_recipes, num_perm) uint32 signatures. Every ingredient is hashed by
+    num_perm universal hash functions once; a recipe's signature is the
+    column-wise minimum over its ingredients (minimum.reduceat over the CSR rows).
+    """
+    a, b = minhash_params(num_perm, seed)
+    x = name_hash(vocab)
+    hashed = ((a[:, None] * x[None, :] + b[:, None]) % _PRIME).astype(np.uint32)  # (num_perm, V)
+
+    n = len(indptr) - 1
+    signatures = np.full((n, num_perm), _EMPTY, dtype=np.uint32)
+    nonempty = np.flatnonzero(np.diff(indptr) > 0)
+    if len(indices) and len(nonempty):
+        per_entry = hashed[:, indices]                      # (num_perm, nnz)
+        mins = np.minimum.reduceat(per_entry, indptr[nonempty], axis=1)
+        signatures[nonempty] = mins.T
+    return signatures
+
+
+def band_keys(signatures, bands=BANDS):
+    """(bands, n) uint64 bucket keys: each band's rows folded with an FNV-style mix."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    banded = signatures[:, :bands * rows].reshape(n, bands, rows).astype(np.uint64)
+    keys = np.full((n, bands), np.uint64(0xCBF29CE484222325), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(rows):
+            keys = (keys ^ banded[:, :, r]) * np.uint64(0x100000001B3)
+    return keys.T.copy()
+
+
+class FingerprintIndex:
+    """
+    Recipe x ingredient CSR matrix (indptr / indices over a stable vocabulary),
+    MinHash signatures and an LSH table. The LSH table is stored as the bucket keys of
+    each band sorted, plus the recipe order, so a lookup is a binary search
+    per band. Everything is saved as .npy and loaded memory-mapped.
+    """
+
+    def __init__(self, recipe_ids, vocab, indptr, indices, signatures, sorted_keys, key_order, bands=BANDS):
+        self.recipe_ids = list(recipe_ids)
+        self.vocab = list(vocab)
+        self.indptr = indptr
+        self.indices = indices
+        self.signatures = signatures
+        self.sorted_keys = sorted_keys
+        self.key_order = key_order
+        self.bands = bands
+        self.row_of = {rid: i for i, rid in enumerate(self.recipe_ids)}
+        self.column_of = {name: j for j, name in enumerate(self.vocab)}
+
+    # --- BUILD / PERSIST ---
+
+    @classmethod
+    def build(cls, df_ingredients, previous_vocab=None, num_perm=NUM_PERM, bands=BANDS):
+        recipe_ids, vocab, indptr, indices = recipe_ingredient_arrays(df_ingredients, previous_vocab)
+        signatures = minhash_signatures(indptr, indices, vocab, num_perm)
+        keys = band_keys(signatures, bands)
+        key_order = np.argsort(keys, axis=1, kind="stable").astype(np.int32)
+        sorted_keys = np.take_along_axis(keys, key_order, axis=1)
+        return cls(recipe_ids, vocab, indptr, indices, signatures, sorted_keys, key_order, bands)
+
+    def save(self, index_dir=INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        for name in ["indptr", "indices", "signatures", "sorted_keys", "key_order"]:
+            np.save(os.path.join(index_dir, f"{name}.npy"), np.asarray(getattr(self, name)))
+        meta = {"recipe_ids": self.recipe_ids, "vocab": self.vocab, "bands": self.bands,
+                "num_perm": int(self.signatures.shape[1]), "seed": SEED}
+        tmp_path = os.path.join(index_dir, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(index_dir, "meta.json"))
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+                  for name in ["indptr", "indices", "signatures", "sorted_keys", "key_order"]}
+        return cls(meta["recipe_ids"], meta["vocab"], bands=meta["bands"], **arrays)
+
+    # --- MATRIX ---
+
+    def ingredients_of(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def csr(self):
+        """The recipe x ingredient matrix as scipy.sparse.csr_matrix (scipy needed here only)."""
+        from scipy.sparse import csr_matrix
+        data = np.ones(len(self.indices), dtype=np.float32)
+        return csr_matrix((data, np.asarray(self.indices), np.asarray(self.indptr)),
+                          shape=(len(self.recipe_ids), len(self.vocab)))
+
+    def jaccard(self, row_a, row_b):
+        a, b = self.ingredients_of(row_a), self.ingredients_of(row_b)
+        if len(a) == 0 and len(b) == 0:
+            return 0.0
+        shared = len(np.intersect1d(a, b, assume_unique=True))
+        return shared / (len(a) + len(b) - shared)
+
+    # --- QUERIES ---
+
+    def _signature_for(self, names):
+        cols = [self.column_of[n] for n in names if n in self.column_of]
+        if not cols:
+            return None, np.array([], dtype=np.int32)
+        cols = np.unique(np.array(cols, dtype=np.int32))
+        sig = minhash_signatures(np.array([0, len(cols)]), cols, self.vocab, self.signatures.shape[1])[0]
+        return sig, cols
+
+    def _candidates(self, signature):
+        keys = band_keys(signature[None, :], self.bands)[:, 0]
+        found = []
+        for band in range(self.bands):
+            lo = np.searchsorted(self.sorted_keys[band], keys[band], side="left")
+            hi = np.searchsorted(self.sorted_keys[band], keys[band], side="right")
+            if hi > lo:
+                found.append(self.key_order[band, lo:hi])
+        return np.unique(np.concatenate(found)) if found else np.array([], dtype=np.int32)
+
+    def _rank(self, signature, candidates, k, exclude=None):
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        if len(candidates) == 0:
+            return []
+        estimates = (self.signatures[candidates] == signature).mean(axis=1)
+        best = np.argsort(-estimates, kind="stable")[:k]
+        return [(self.recipe_ids[candidates[i]], float(estimates[i])) for i in best]
+
+    def similar(self, recipe_id, k=TOP_K):
+        """Most similar recipes as [(recipe_id, estimated Jaccard)], LSH candidates only."""
+        if recipe_id not in self.row_of:
+            raise ValueError(f"Unknown recipe id '{recipe_id}' (ids look like MR_187_01)")
+        row = self.row_of[recipe_id]
+        signature = np.asarray(self.signatures[row])
+        return self._rank(signature, self._candidates(signature), k, exclude=row)
+
+    def similar_to_ingredients(self, names, k=TOP_K):
+        """Most similar recipes to an ad-hoc ingredient list."""
+        signature, _ = self._signature_for([n.lower().strip() for n in names])
+        if signature is None:
+            return []
+        return self._rank(signature, self._candidates(signature), k)
+
+    def near_duplicates(self, threshold=DUPLICATE_THRESHOLD):
+        """
+        Pairs sharing at least one LSH bucket whose exact ingredient Jaccard
+        is >= threshold, as a DataFrame sorted by similarity.
+        """
+        pairs = set()
+        for band in range(self.bands):
+            keys = np.asarray(self.sorted_keys[band])
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            ends = np.r_[starts[1:], len(keys)]
+            for s, e in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+                members = np.sort(self.key_order[band, s:e])
+                for i in range(len(members)):
+                    for j in range(i + 1, len(members)):
+                        pairs.add((int(members[i]), int(members[j])))
+
+        rows = []
+        for a, b in pairs:
+            if len(self.ingredients_of(a)) == 0:
+                continue
+            score = self.jaccard(a, b)
+            if score >= threshold:
+                rows.append({"recipe_a": self.recipe_ids[a], "recipe_b": self.recipe_ids[b], "jaccard": score})
+        df = pd.DataFrame(rows, columns=["recipe_a", "recipe_b", "jaccard"])
+        return df.sort_values(["jaccard", "recipe_a", "recipe_b"], ascending=[False, True, True], ignore_index=True)
+
+
+def build(ingredients_csv=INGREDIENTS_CSV, index_dir=INDEX_DIR):
+    previous_vocab = None
+    meta_path = os.path.join(index_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            previous_vocab = json.load(f)["vocab"]
+
+    start = time.perf_counter()
+    index = FingerprintIndex.build(pd.read_csv(ingredients_csv), previous_vocab)
+    index.save(index_dir)
+    print(f"🧬 {len(index.recipe_ids)} recipes x {len(index.vocab)} ingredients, "
+          f"{len(index.indices)} entries, built in {time.perf_counter() - start:.2f}s -> {index_dir}")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recipe fingerprints: sparse matrix, MinHash and LSH.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Build and save the index from df_ingredient_recipes.csv")
+    p_similar = sub.add_parser("similar", help="Most similar recipes to a recipe id")
+    p_similar.add_argument("recipe_id")
+    p_similar.add_argument("-k", type=int, default=TOP_K)
+    p_ing = sub.add_parser("ingredients", help="Most similar recipes to a list of ingredients")
+    p_ing.add_argument("names", nargs="+")
+    p_ing.add_argument("-k", type=int, default=TOP_K)
+    p_dup = sub.add_parser("duplicates", help="Near-duplicate recipe pairs")
+    p_dup.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build()
+    else:
+        index = FingerprintIndex.load()
+        if args.command == "similar":
+            results = index.similar(args.recipe_id, args.k)
+        elif args.command == "ingredients":
+            results = index.similar_to_ingredients(args.names, args.k)
+        else:
+            print(index.near_duplicates(args.threshold).to_string(index=False))
+            results = None
+        for recipe_id, score in results or []:
+            print(f"{recipe_id:<14} {score:.3f}")
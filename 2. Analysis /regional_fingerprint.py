@@ -0,0 +1,230 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from fingerprint_index import DATA_DIR, recipe_ingredient_arrays
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RECIPES_CSV = os.path.join(DATA_DIR, "df_recipes.csv")
+INGREDIENTS_CSV = os.path.join(DATA_DIR, "df_ingredient_recipes.csv")
+
+REGION_COLUMN = "province_group"
+BACKGROUND_REGIONS = ["Unknown"]   # counted in "the rest of the book", never reported
+MIN_RECIPES = 5                    # smaller regions are background only
+TOP_K = 15                         # ingredients per region that get confidence intervals
+ALPHA0 = 100.0                     # strength of the informative Dirichlet prior (log-odds)
+REPLICATES = 2000
+BATCH_SIZE = 100                   # replicates per task
+CONFIDENCE = 0.95
+SEED = 1967
+
+
+def region_frequencies(Y, n_recipes):
+    """Share of the region's recipes that use each ingredient (R x V)."""
+    return Y / np.maximum(n_recipes, 1)[..., None]
+
+
+def log_odds_z(y, n, y_all, n_all, prior):
+    """
+    Log-odds ratio of an ingredient in a region vs the rest of the book, with
+    an informative Dirichlet prior, as a z-score (Monroe et al., 2008).
+    y: recipes in the region using the ingredient, n: all ingredient uses in
+    the region, y_all / n_all: the same for the whole book, prior: pseudo
+    count of the ingredient. Elementwise, so it takes a whole table or just
+    the gathered cells of a batch of bootstrap replicates.
+    """
+    a0 = ALPHA0
+    rest = y_all - y
+    n_rest = n_all - n
+    delta = (np.log(y + prior) - np.log(n + a0 - y - prior)
+             - np.log(rest + prior) + np.log(n_rest + a0 - rest - prior))
+    variance = 1.0 / (y + prior) + 1.0 / (rest + prior)
+    return delta / np.sqrt(variance)
+
+
+def tfidf(freq):
+    """Region frequency x smoothed inverse region frequency (regions that use the ingredient)."""
+    n_regions = freq.shape[0]
+    df = (freq > 0).sum(axis=0)
+    return freq * (np.log((1 + n_regions) / (1 + df)) + 1)
+
+
+# --- BOOTSTRAP WORKER ---
+# The matrix and group layout are handed to each worker once (initializer),
+# tasks then only carry a seed and a replicate count.
+_STATE = {}
+
+
+def _init_worker(X, members, reported, prior, cells):
+    _STATE.update(X=X, members=members, reported=reported, prior=prior, cells=cells)
+
+
+def _bootstrap_batch(seed, size):
+    """
+    `size` stratified bootstrap replicates: every group's recipes are resampled
+    with replacement within the group. A replicate is a multinomial weight per
+    recipe, so a group's counts for the whole batch are one (size x n_g) @
+    (n_g x V) product. Only the requested cells go through the log-odds, the
+    rest of the book enters through the batch totals. Returns (freq, z) as
+    (size x cells) arrays.
+    """
+    X, members, reported = _STATE["X"], _STATE["members"], _STATE["reported"]
+    rng = np.random.default_rng(seed)
+
+    Y = np.empty((size, len(members), X.shape[1]), dtype=np.float32)
+    for g, rows in enumerate(members):
+        weights = rng.multinomial(len(rows), np.full(len(rows), 1.0 / len(rows)), size=size)
+        Y[:, g] = weights.astype(np.float32) @ X[rows]
+
+    region_idx, ing_idx = _STATE["cells"]
+    groups = reported[region_idx]
+    y = Y[:, groups, ing_idx].astype(np.float64)
+    n = Y[:, groups].sum(axis=-1, dtype=np.float64)
+    y_all = Y[:, :, ing_idx].sum(axis=1, dtype=np.float64)
+    n_all = Y.sum(axis=(1, 2), dtype=np.float64)[:, None]
+
+    n_recipes = np.array([len(members[g]) for g in groups], dtype=np.float64)
+    z = log_odds_z(y, n, y_all, n_all, _STATE["prior"][ing_idx])
+    return y / n_recipes, z
+
+
+class RegionalFingerprint:
+    """
+    Per-region ingredient profiles over one dense recipe x ingredient matrix:
+    frequency vectors, TF-IDF and log-odds distinctiveness vs the rest of the
+    book, plus bootstrap confidence intervals for each region's top ingredients.
+    """
+
+    def __init__(self, df_recipes, df_ingredients, by=REGION_COLUMN,
+                 background=BACKGROUND_REGIONS, min_recipes=MIN_RECIPES):
+        recipe_ids, self.vocab, indptr, indices = recipe_ingredient_arrays(df_ingredients)
+        self.X = np.zeros((len(recipe_ids), len(self.vocab)), dtype=np.float32)
+        self.X[np.repeat(np.arange(len(recipe_ids)), np.diff(indptr)), indices] = 1.0
+
+        labels = (df_recipes.drop_duplicates("id").set_index("id")[by]
+                  .reindex(recipe_ids).fillna("Unknown").astype(str))
+        codes, self.groups = pd.factorize(labels, sort=True)
+        self.members = [np.flatnonzero(codes == g) for g in range(len(self.groups))]
+        self.n_recipes = np.array([len(rows) for rows in self.members], dtype=np.float64)
+
+        self.reported = np.array([
+            g for g, name in enumerate(self.groups)
+            if name not in set(background) and self.n_recipes[g] >= min_recipes
+        ], dtype=np.intp)
+        if len(self.reported) == 0:
+            raise ValueError(f"No {by} value has >= {min_recipes} recipes outside {list(background)}")
+        self.regions = list(self.groups[self.reported])
+        self.by = by
+
+        self.Y = np.stack([self.X[rows].sum(axis=0, dtype=np.float64) for rows in self.members])
+        self.prior = ALPHA0 * self.Y.sum(axis=0) / self.Y.sum()
+
+    def _point_z(self):
+        """Log-odds z of every (reported region, ingredient)."""
+        Y = self.Y[self.reported]
+        return log_odds_z(Y, Y.sum(axis=1, keepdims=True), self.Y.sum(axis=0), self.Y.sum(), self.prior)
+
+    def profiles(self):
+        """Region x ingredient frequency table (the regional fingerprint vectors)."""
+        freq = region_frequencies(self.Y[self.reported], self.n_recipes[self.reported])
+        return pd.DataFrame(freq, index=self.regions, columns=self.vocab)
+
+    def scores(self):
+        """Long-form point estimates: one row per (region, ingredient used in it)."""
+        freq = region_frequencies(self.Y[self.reported], self.n_recipes[self.reported])
+        z = self._point_z()
+        region_idx, ing_idx = np.nonzero(self.Y[self.reported])
+        df = pd.DataFrame({
+            "region": np.asarray(self.regions, dtype=object)[region_idx],
+            "ingredient": np.asarray(self.vocab, dtype=object)[ing_idx],
+            "n_recipes": self.n_recipes[self.reported][region_idx].astype(int),
+            "recipes_with": self.Y[self.reported][region_idx, ing_idx].astype(int),
+            "freq": freq[region_idx, ing_idx],
+            "tfidf": tfidf(freq)[region_idx, ing_idx],
+            "log_odds_z": z[region_idx, ing_idx],
+        })
+        return df.sort_values(["region", "log_odds_z"], ascending=[True, False], ignore_index=True)
+
+    def top_cells(self, top_k=TOP_K):
+        """(region positions, ingredient ids) of every region's top_k most distinctive ingredients."""
+        z = self._point_z()
+        top = np.argsort(-z, axis=1, kind="stable")[:, :top_k]
+        return np.repeat(np.arange(len(self.reported)), top.shape[1]), top.ravel()
+
+    def bootstrap(self, replicates=REPLICATES, top_k=TOP_K, workers=None,
+                  seed=SEED, batch_size=BATCH_SIZE, confidence=CONFIDENCE):
+        """
+        Top-k fingerprint per region with percentile bootstrap intervals for the
+        frequency and the log-odds z. Replicates are split into fixed batches,
+        each seeded from SeedSequence(seed).spawn, so the result depends only on
+        the seed, never on the worker count or scheduling.
+        """
+        cells = self.top_cells(top_k)
+        sizes = [min(batch_size, replicates - start) for start in range(0, replicates, batch_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        init_args = (self.X, self.members, self.reported, self.prior, cells)
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            _init_worker(*init_args)
+            results = list(map(_bootstrap_batch, seeds, sizes))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                results = list(pool.map(_bootstrap_batch, seeds, sizes))
+
+        freq = np.concatenate([r[0] for r in results])
+        z = np.concatenate([r[1] for r in results])
+        q = [(1 - confidence) / 2, (1 + confidence) / 2]
+        freq_lo, freq_hi = np.quantile(freq, q, axis=0)
+        z_lo, z_hi = np.quantile(z, q, axis=0)
+
+        point = self.scores().set_index(["region", "ingredient"])
+        region_idx, ing_idx = cells
+        keys = pd.MultiIndex.from_arrays([
+            np.asarray(self.regions, dtype=object)[region_idx],
+            np.asarray(self.vocab, dtype=object)[ing_idx],
+        ], names=["region", "ingredient"])
+        df = point.reindex(keys).reset_index()
+        # Top cells of small regions can be ingredients the region never uses
+        df["n_recipes"] = self.n_recipes[self.reported][region_idx].astype(int)
+        df[["recipes_with", "freq"]] = df[["recipes_with", "freq"]].fillna(0)
+        df["recipes_with"] = df["recipes_with"].astype(int)
+        # top_cells caps top_k at the vocabulary size
+        per_region = len(region_idx) // len(self.regions)
+        df = df.assign(freq_lo=freq_lo, freq_hi=freq_hi, z_lo=z_lo, z_hi=z_hi,
+                       rank=np.tile(np.arange(1, per_region + 1), len(self.regions)))
+        return df[["region", "rank", "ingredient", "n_recipes", "recipes_with",
+                   "freq", "freq_lo", "freq_hi", "tfidf", "log_odds_z", "z_lo", "z_hi"]]
+
+
+def load_fingerprint(by=REGION_COLUMN):
+    return RegionalFingerprint(pd.read_csv(RECIPES_CSV), pd.read_csv(INGREDIENTS_CSV), by=by)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regional ingredient fingerprints with bootstrap confidence intervals.")
+    parser.add_argument("--by", choices=["province_group", "region_clean"], default=REGION_COLUMN)
+    parser.add_argument("--region", help="only print this region")
+    parser.add_argument("--top", type=int, default=TOP_K)
+    parser.add_argument("--replicates", type=int, default=REPLICATES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--output", help="write the full table to this CSV")
+    args = parser.parse_args()
+
+    fingerprint = load_fingerprint(args.by)
+    print(f"🗺️ {len(fingerprint.regions)} regions ({args.by}), {len(fingerprint.vocab)} ingredients")
+
+    start = time.perf_counter()
+    result = fingerprint.bootstrap(args.replicates, args.top, args.workers, args.seed)
+    print(f"⏱️ {args.replicates} replicates in {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"💾 Saved: {args.output}")
+    shown = result[result["region"] == args.region] if args.region else result
+    with pd.option_context("display.float_format", "{:.3f}".format):
+        print(shown.to_string(index=False))